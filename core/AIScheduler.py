@@ -0,0 +1,132 @@
+import time
+from enum import Enum, auto
+from typing import Dict, Any, List, TYPE_CHECKING
+from tools.logger import setup_logger
+
+if TYPE_CHECKING:
+    from core.Enemy import Enemy
+
+logger = setup_logger(__name__, level='WARNING')
+
+AI_TICK_MS = 50            # Full rate thinking, 20 Hz
+AI_REDUCED_TICK_MS = 250   # Reduced rate thinking, 4 Hz
+LOD_FULL_DISTANCE = 1000   # Same as SEARCH_VISION_DISTANCE
+LOD_REDUCED_DISTANCE = 3000
+AI_FRAME_BUDGET_MS = 2.0
+MAX_ACCUMULATED_MS = 1000  # Clamp after long stalls so enemies do not burst-think
+STATS_HISTORY = 60
+
+
+class AILod(Enum):
+    FULL = auto()
+    REDUCED = auto()
+    DORMANT = auto()
+
+
+class AIScheduler:
+    """Fixed timestep scheduler for enemy AI with distance based level of detail.
+
+    Thinking (state machine and line of sight) runs at AI_TICK_MS near the player,
+    AI_REDUCED_TICK_MS far away and not at all for dormant enemies. Due enemies are
+    processed most-overdue first until the per-frame budget is spent; the rest keep
+    their accumulated time and are processed next frame. A tick consumes tick_ms of
+    the accumulator, the remainder carries over so the average rate holds when frame
+    times do not divide the tick. Movement still runs every frame for non dormant
+    enemies so motion stays smooth. State of enemies no longer in the manager is
+    dropped.
+    """
+
+    def __init__(self, enemy_manager, frame_budget_ms: float = AI_FRAME_BUDGET_MS):
+        self.enemy_manager = enemy_manager
+        self.frame_budget_ms = frame_budget_ms
+        self._accumulators: Dict[str, float] = {}
+        self._lods: Dict[str, AILod] = {}
+        self._frame_times: List[float] = []
+        self.stats: Dict[str, Any] = {
+            'ticked': 0,
+            'deferred': 0,
+            'full': 0,
+            'reduced': 0,
+            'dormant': 0,
+            'last_ms': 0.0,
+            'avg_ms': 0.0,
+            'max_ms': 0.0,
+        }
+
+    def get_lod(self, enemy: 'Enemy', player) -> AILod:
+        dx = enemy.coord_x.value - player.coord_x.value
+        dy = enemy.coord_y.value - player.coord_y.value
+        distance_sq = dx * dx + dy * dy
+        if distance_sq <= LOD_FULL_DISTANCE * LOD_FULL_DISTANCE:
+            return AILod.FULL
+        if distance_sq <= LOD_REDUCED_DISTANCE * LOD_REDUCED_DISTANCE:
+            return AILod.REDUCED
+        return AILod.DORMANT
+
+    def update(self, player, obstacles_np, dt: float) -> None:
+        start = time.perf_counter()
+        enemies = self.enemy_manager.enemies
+        lod_counts = {AILod.FULL: 0, AILod.REDUCED: 0, AILod.DORMANT: 0}
+        due = []
+        if len(self._accumulators) > len(enemies):
+            self._prune(enemies)
+        for enemy in enemies:
+            lod = self.get_lod(enemy, player)
+            lod_counts[lod] += 1
+            self._lods[enemy.enemy_id] = lod
+            if lod == AILod.DORMANT:
+                self._accumulators[enemy.enemy_id] = 0.0
+                continue
+            accumulated = min(self._accumulators.get(enemy.enemy_id, 0.0) + dt, MAX_ACCUMULATED_MS)
+            self._accumulators[enemy.enemy_id] = accumulated
+            tick_ms = AI_TICK_MS if lod == AILod.FULL else AI_REDUCED_TICK_MS
+            if accumulated >= tick_ms:
+                due.append((accumulated, tick_ms, enemy))
+        # Most overdue first
+        due.sort(key=lambda item: item[0], reverse=True)
+        ticked = 0
+        if due:
+            self.enemy_manager.resolve_vision(player, obstacles_np, [enemy for _, _, enemy in due])
+            budget_end = start + self.frame_budget_ms / 1000.0
+            for accumulated, tick_ms, enemy in due:
+                # Always tick at least one enemy so AI can not starve
+                if ticked and time.perf_counter() > budget_end:
+                    break
+                enemy.think(self.enemy_manager.cast_ray, player, obstacles_np)
+                self._accumulators[enemy.enemy_id] = accumulated - tick_ms
+                ticked += 1
+            for _, _, enemy in due:
+                enemy.player_visible = None
+        for enemy in enemies:
+            if self._lods[enemy.enemy_id] != AILod.DORMANT:
+                enemy.step_movement(dt)
+        self._record(start, ticked, len(due) - ticked, lod_counts)
+
+    def forget(self, enemy_id: str) -> None:
+        """Drop scheduling state of a removed enemy"""
+        self._accumulators.pop(enemy_id, None)
+        self._lods.pop(enemy_id, None)
+
+    def _prune(self, enemies: List['Enemy']) -> None:
+        alive = {enemy.enemy_id for enemy in enemies}
+        for enemy_id in [enemy_id for enemy_id in self._accumulators if enemy_id not in alive]:
+            self.forget(enemy_id)
+
+    def _record(self, start: float, ticked: int, deferred: int, lod_counts: Dict[AILod, int]) -> None:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._frame_times.append(elapsed_ms)
+        if len(self._frame_times) > STATS_HISTORY:
+            self._frame_times.pop(0)
+        self.stats['ticked'] = ticked
+        self.stats['deferred'] = deferred
+        self.stats['full'] = lod_counts[AILod.FULL]
+        self.stats['reduced'] = lod_counts[AILod.REDUCED]
+        self.stats['dormant'] = lod_counts[AILod.DORMANT]
+        self.stats['last_ms'] = elapsed_ms
+        self.stats['avg_ms'] = sum(self._frame_times) / len(self._frame_times)
+        self.stats['max_ms'] = max(self._frame_times)
+        if deferred:
+            logger.debug(f"AI budget exceeded, deferred {deferred} enemies")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
@@ -1,11 +1,16 @@
-from typing import Dict, Any, List, Optional, TYPE_CHECKING
+from typing import Dict, Any, Iterator, List, Optional, TYPE_CHECKING
+from contextlib import contextmanager
 from core.actions_protocol import ActionsProtocol, ActionResult, Position, LAYERS
+from core.CommandHistory import CommandHistory, Command
+from core.ContextTable import table_dict_from_snapshot
+from net.codec import JsonCodec, negotiate_codec, supported_codecs, message_to_dict, call_to_dict, call_to_operation
 import uuid
 import copy
 import os
 import time
 from pathlib import Path
 from tools.logger import setup_logger
+import tools.settings as settings
 if TYPE_CHECKING:
     from core.Context import Context
     from core.ContextTable import ContextTable
@@ -82,7 +87,7 @@ class Actions(ActionsProtocol):
     ═══════════════════════════════════════════════════════════════════════════════
     ADVANCED TABLE SERVER OPERATIONS
     ═══════════════════════════════════════════════════════════════════════════════
-    - sync_table_with_server(table_id) -> Force sync table with server
+    - sync_table_with_server(table_id, full=False) -> Force sync table with server
     - request_table_list_from_server() -> Request list of available tables from server
     - broadcast_table_action(action_type, table_id, action_data) -> Broadcast table action
     
@@ -118,12 +123,17 @@ class Actions(ActionsProtocol):
     #TODO- ask_for_asset_download(asset_id) -> Request asset download from server
     #TODO- ask_for_asset_list() -> Request asset list from server
     - ask_for_upload_file(file_path, filename, file_type) -> Request file upload to server
+    - wire_codec_offer() / negotiate_wire_codec(peer_codecs) -> Codec handshake, JSON when nothing in common
+    - handle_wire_codec(data) -> Peer picked a codec from our offer
+    - send_protocol(method, *args, **kwargs) -> Protocol send, encoded with the agreed codec
     ═══════════════════════════════════════════════════════════════════════════════
     BATCH & HISTORY OPERATIONS
     ═══════════════════════════════════════════════════════════════════════════════
+    - batch() -> Context manager, one server message and one history entry for the actions inside
     - batch_actions(actions) -> Execute multiple actions in sequence
-    - undo_action() -> Undo last action (basic implementation)
-    - redo_action() -> Redo last undone action (basic implementation)
+    - undo_action() -> Undo last action locally (drags on one sprite undo in one step)
+    - redo_action() -> Redo last undone action locally
+    - _apply_command(command) -> Apply recorded state without server sync or history
     
     ═══════════════════════════════════════════════════════════════════════════════
     I/O EVENT HANDLERS (New Architecture)
@@ -141,9 +151,14 @@ class Actions(ActionsProtocol):
     - handle_asset_download_response(data) -> Process asset download response from server
     - handle_asset_list_response(data) -> Process asset list response from server
     - handle_asset_upload_response(data) -> Process asset upload response from server
-    - handle_welcome_message(data) -> Process welcome message from server
+    - handle_welcome_message(data) -> Process welcome message from server, agrees the wire codec
     - _request_asset_download(asset_id) -> Request asset download from server    
     ═══════════════════════════════════════════════════════════════════════════════
+    TABLE SYNC HANDLERS
+    ═══════════════════════════════════════════════════════════════════════════════
+    - handle_table_sync_ack(data) -> Peer applied table_sync up to a revision
+    - handle_table_resync_request(data) -> Peer needs a full table snapshot
+    ═══════════════════════════════════════════════════════════════════════════════
     GUI & UI EVENT HANDLERS 
     ═══════════════════════════════════════════════════════════════════════════════
     add_chat_message(message: str) -> Add message to chat log
@@ -185,10 +200,26 @@ class Actions(ActionsProtocol):
     def __init__(self, context: 'Context'):
         """Initialize Actions with context and default settings"""
         self.context = context
-        self.action_history: List[Dict[str, Any]] = []
-        self.undo_stack: List[Dict[str, Any]] = []
-        self.redo_stack: List[Dict[str, Any]] = []
         self.max_history = 100
+        self.history = CommandHistory(self.max_history)
+        self._batch_sends: Optional[List[Dict[str, Any]]] = None  # Deferred server sends inside batch()
+        self.wire_codec = JsonCodec()  # Agreed at handshake, see negotiate_wire_codec
+        # Action types accepted by batch_actions
+        self._batch_method_map = {
+            'create_table': self.create_table,
+            'delete_table': self.delete_table,
+            'update_table': self.update_table,
+            'move_table': self.move_table,
+            'scale_table': self.scale_table,
+            'create_sprite': self.create_sprite,
+            'delete_sprite': self.delete_sprite,
+            'move_sprite': self.move_sprite,
+            'scale_sprite': self.scale_sprite,
+            'rotate_sprite': self.rotate_sprite,
+            'update_sprite': self.update_sprite,
+            'set_layer_visibility': self.set_layer_visibility,
+            'move_sprite_to_layer': self.move_sprite_to_layer
+        }
         self.layer_visibility = {layer: True for layer in LAYERS.keys()}
         self.AssetManager: Optional[ClientAssetManager] = None
         self.pending_upload_operations: Dict[str, str] = {}  # asset_id -> file_path
@@ -196,11 +227,7 @@ class Actions(ActionsProtocol):
 
     def _add_to_history(self, action: Dict[str, Any]):
         """Add action to history for undo/redo functionality"""
-        self.action_history.append(action)
-        if len(self.action_history) > self.max_history:
-            self.action_history.pop(0)
-        self.undo_stack.append(action)
-        self.redo_stack.clear()
+        self.history.record(action)
     
     def _get_table_by_id(self, table_id: str) -> Optional['ContextTable']:
         """Get table by ID (using table_id UUID)"""
@@ -215,11 +242,7 @@ class Actions(ActionsProtocol):
     
     def _find_sprite_in_table(self, table, sprite_id: str):
         """Find sprite directly in a table"""
-        for layer, sprite_list in table.dict_of_sprites_list.items():
-            for sprite_obj in sprite_list:
-                if hasattr(sprite_obj, 'sprite_id') and sprite_obj.sprite_id == sprite_id:
-                    return sprite_obj                
-        return None
+        return table.find_sprite(sprite_id)
 
     # ============================================================================
     # TABLE MANAGEMENT (CRUD OPERATIONS)
@@ -247,7 +270,8 @@ class Actions(ActionsProtocol):
                 'table_id': table.table_id,
                 'name': name,
                 'width': width,
-                'height': height
+                'height': height,
+                'table_data': {'table_id': table.table_id, 'table_name': name, 'width': width, 'height': height}
             }
             self._add_to_history(action)
             
@@ -272,14 +296,16 @@ class Actions(ActionsProtocol):
                     logger.error(f"Missing required field: {field}")
                     return ActionResult(False, f"Missing required field: {field}")
                     
-            # Create table using Context method
-            table = self.context.create_table_from_dict(table_dict)            
+            # Create table using Context method, sprites are part of this history entry
+            with self.history.suspended():
+                table = self.context.create_table_from_dict(table_dict)            
             if not table:
                 return ActionResult(False, f"Failed to create table {table_dict['table_name']}")          
 
             action = {
                 'type': 'create_table_from_dict',
-                'table_data': copy.deepcopy(table_dict)
+                'table_id': table.table_id,
+                'table_data': {**copy.deepcopy(table_dict), 'table_id': table.table_id}
             }
             self._add_to_history(action)
             
@@ -312,22 +338,28 @@ class Actions(ActionsProtocol):
             if not table:
                 return ActionResult(False, f"Table {table_id or table_name} not found")
 
-            # Perform save operation
-            data = table.save_to_dict()
-            for key, value in data.items():
-                print(f"Key: {key}, Value: {value}")
-            
-            
-            self.AssetManager.StorageManager.save_file_async(table_name+'.json', data, subdir="tables")
-            return ActionResult(True, f"Table {table.name} saved successfully")
+            # Snapshot here, serialize and write on the storage pool
+            operation_id = self.AssetManager.StorageManager.save_file_async(
+                table_name + '.json', table.snapshot(), subdir="tables", serializer=table_dict_from_snapshot)
+            autosave = getattr(self.context, 'TableAutosave', None)
+            if autosave:
+                autosave.track_save(operation_id, table)
+            return ActionResult(True, f"Table {table.name} saved successfully", {'operation_id': operation_id})
         except Exception as e:
             logger.error(f"Failed to save table {table_id or table_name}: {e}")
             return ActionResult(False, f"Failed to save table: {str(e)}")
 
     def load_table(self, path_to_table: str) -> ActionResult:
-        """Load a table from a file"""
+        """Load a table from a file, large files are streamed in over several frames"""
         try:
-            operation = self.AssetManager.StorageManager.load_file_async(path_to_table)
+            storage = self.AssetManager.StorageManager
+            loader = getattr(self.context, 'StreamingTableLoader', None)
+            file_path = storage.root_path / path_to_table
+            if loader and file_path.is_file() and file_path.stat().st_size >= settings.STREAM_LOAD_MIN_BYTES:
+                loader.load(file_path)
+                return ActionResult(True, f"Streaming table from {path_to_table}", {'streaming': True})
+
+            operation = storage.load_file_async(path_to_table)
             if not operation:
                 return ActionResult(False, f"Failed to load table from {path_to_table}") 
 
@@ -363,6 +395,7 @@ class Actions(ActionsProtocol):
                 if hasattr(table, key):
                     old_values[key] = getattr(table, key)
                     setattr(table, key, value)
+            table.mark_changed()
             
             # Send update to server if requested and protocol available
             if to_server and hasattr(self.context, 'protocol') and self.context.protocol:
@@ -371,7 +404,7 @@ class Actions(ActionsProtocol):
                         'table_id': table_id,
                         **kwargs
                     }
-                    self.context.protocol.send_update('table_update', update_data)
+                    self._send_to_server('send_update', 'table_update', update_data)
                     logger.debug(f"Sent table update to server for {table_id}")
                 except Exception as e:
                     logger.error(f"Failed to send table update to server: {e}")
@@ -396,19 +429,12 @@ class Actions(ActionsProtocol):
                 return ActionResult(False, f"Table {table_id} not found")
             
             # Store table data for undo
-            table_data = {
-                'name': table.name,
-                'width': table.width,
-                'height': table.height,
-                'scale': table.scale,
-                'x_moved': table.x_moved,
-                'y_moved': table.y_moved
-            }
+            table_data = table.save_to_dict()
             
             # Send delete to server if requested and protocol available
             if to_server and hasattr(self.context, 'protocol') and self.context.protocol:
                 try:
-                    self.context.protocol.table_delete(table_id)
+                    self._send_to_server('table_delete', table_id)
                     logger.debug(f"Sent table delete to server for {table_id}")
                 except Exception as e:
                     logger.error(f"Failed to send table delete to server: {e}")
@@ -417,7 +443,7 @@ class Actions(ActionsProtocol):
             self.context.cleanup_table(table)
             
             # Remove from list of tables
-            self.context.list_of_tables.remove(table)
+            self.context.remove_table(table)
             
             # Update current table if it was deleted
             if self.context.current_table == table:
@@ -491,7 +517,7 @@ class Actions(ActionsProtocol):
         
         try:
             if hasattr(self.context.protocol, 'send'):
-                self.context.protocol.send(msg.to_json())
+                self.context.protocol.send(self._encode_message(msg))
                 
             logger.info(f"Requested new table: {table_name}")
             return ActionResult(True, f"Requested table: {table_name}")
@@ -551,7 +577,7 @@ class Actions(ActionsProtocol):
                                 sprite.frect.h=kwargs['frect_h']
                             except Exception as e:
                                 logger.warning(f"Failed to set frect size for sprite {sprite_id}: {e}")
-                        sprite.reload_texture(texture, int(sprite.frect.w), int(sprite.frect.h))
+                        sprite.reload_texture(texture, *self.AssetManager.get_texture_size(provided_asset_id))
                         logger.debug(f"Sprite frect: {sprite.frect.w}x{sprite.frect.h}")
                     else:
                         logger.warning(f"Texture not found for asset {provided_asset_id}, loading from path")
@@ -561,8 +587,8 @@ class Actions(ActionsProtocol):
                     self.AssetManager.load_asset_for_sprite(sprite, image_path, to_server=to_server)
             if to_server:
                 logger.debug(f"Creating sprite {sprite_id} on server for table {table_id}")
-                self.context.protocol.sprite_create(table_id=table.table_id,
-                                            sprite_data=sprite.to_dict())
+                self._send_to_server('sprite_create', table_id=table.table_id,
+                                     sprite_data=sprite.to_dict())
             if not sprite:
                 return ActionResult(False, f"Failed to create sprite {sprite_id} with path {image_path}")
             
@@ -574,7 +600,8 @@ class Actions(ActionsProtocol):
                 'image_path': image_path,
                 'layer': layer,
                 'frect.w': sprite.frect.w,
-                'frect.h': sprite.frect.h
+                'frect.h': sprite.frect.h,
+                'sprite_data': sprite.to_dict()
             }
             self._add_to_history(action)
             
@@ -636,7 +663,7 @@ class Actions(ActionsProtocol):
                     texture = self.AssetManager.find_texture_by_asset_id(provided_asset_id)
                     if texture:
                         logger.info(f"Found cached texture for asset {provided_asset_id}")                        
-                        sprite.reload_texture(texture, int(sprite.frect.w), int(sprite.frect.h))
+                        sprite.reload_texture(texture, *self.AssetManager.get_texture_size(provided_asset_id))
                         logger.debug(f"Sprite frect: {sprite.frect.w}x{sprite.frect.h}")
                     else:
                         logger.warning(f"Texture not found for asset {provided_asset_id}, loading from path")
@@ -646,8 +673,8 @@ class Actions(ActionsProtocol):
                     self.AssetManager.load_asset_for_sprite(sprite, image_path, to_server=to_server)
             if to_server:
                 logger.debug(f"Creating sprite {sprite_id} on server for table {table_id}")
-                self.context.protocol.sprite_create(table_id=table.table_id,
-                                            sprite_data=sprite.to_dict())
+                self._send_to_server('sprite_create', table_id=table.table_id,
+                                     sprite_data=sprite.to_dict())
             if not sprite:
                 return ActionResult(False, f"Failed to create sprite {sprite_id} with path {image_path}")
             
@@ -659,7 +686,8 @@ class Actions(ActionsProtocol):
                 'image_path': image_path,
                 'layer': layer,
                 'frect.w': sprite.frect.w,
-                'frect.h': sprite.frect.h
+                'frect.h': sprite.frect.h,
+                'sprite_data': sprite.to_dict()
             }
             self._add_to_history(action)
             
@@ -732,6 +760,7 @@ class Actions(ActionsProtocol):
                 if hasattr(sprite, key):
                     old_values[key] = getattr(sprite, key)
                     setattr(sprite, key, value)
+            table.mark_sprite_changed(sprite)
             
             # Send update to server if requested and protocol available
             if to_server and hasattr(self.context, 'protocol') and self.context.protocol:
@@ -741,7 +770,7 @@ class Actions(ActionsProtocol):
                         'table_id': table_id,
                         **kwargs
                     }
-                    self.context.protocol.send_sprite_update('update', sprite_data)
+                    self._send_to_server('send_sprite_update', 'update', sprite_data)
                     logger.debug(f"Sent sprite update to server for {sprite_id}")
                 except Exception as e:
                     logger.error(f"Failed to send sprite update to server: {e}")
@@ -771,14 +800,7 @@ class Actions(ActionsProtocol):
                 return ActionResult(False, f"Sprite {sprite_id} not found")
             
             # Store sprite data for undo
-            sprite_data = {
-                'id': sprite_id,
-                'table_id': table_id,
-                'position': (sprite.coord_x.value, sprite.coord_y.value),
-                'texture_path': sprite.texture_path,
-                'layer': sprite.layer,
-                'scale': (sprite.scale_x, sprite.scale_y)
-            }
+            sprite_data = sprite.to_dict()
             
             # Remove sprite using Context method
             success = self.context.remove_sprite(sprite, table)
@@ -788,7 +810,7 @@ class Actions(ActionsProtocol):
             # Send delete to server if requested and protocol available
             if to_server and hasattr(self.context, 'protocol') and self.context.protocol:
                 try:
-                    self.context.protocol.sprite_delete(table_id, sprite_id)
+                    self._send_to_server('sprite_delete', table_id, sprite_id)
                     logger.debug(f"Sent sprite delete to server for {sprite_id}")
                 except Exception as e:
                     logger.error(f"Failed to send sprite delete to server: {e}")
@@ -818,13 +840,14 @@ class Actions(ActionsProtocol):
             old_position = (sprite.coord_x.value, sprite.coord_y.value)
             sprite.coord_x.value = position.x
             sprite.coord_y.value = position.y
+            table.mark_sprite_changed(sprite)
             
             # Send move to server if requested and protocol available
             if to_server and hasattr(self.context, 'protocol') and self.context.protocol:
                 try:
                     from_pos = {'x': old_position[0], 'y': old_position[1]}
                     to_pos = {'x': position.x, 'y': position.y}
-                    self.context.protocol.sprite_move(table_id, sprite_id, from_pos, to_pos)
+                    self._send_to_server('sprite_move', table_id, sprite_id, from_pos, to_pos)
                     logger.debug(f"Sent sprite move to server for {sprite_id}")
                 except Exception as e:
                     logger.error(f"Failed to send sprite move to server: {e}")
@@ -855,11 +878,12 @@ class Actions(ActionsProtocol):
             old_scale = (sprite.scale_x, sprite.scale_y)
             sprite.scale_x = scale_x
             sprite.scale_y = scale_y
+            table.mark_sprite_changed(sprite)
             
             # Send scale to server if requested and protocol available
             if to_server and hasattr(self.context, 'protocol') and self.context.protocol:
                 try:
-                    self.context.protocol.sprite_scale(table_id, sprite_id, scale_x, scale_y)
+                    self._send_to_server('sprite_scale', table_id, sprite_id, scale_x, scale_y)
                     logger.debug(f"Sent sprite scale to server for {sprite_id}")
                 except Exception as e:
                     logger.error(f"Failed to send sprite scale to server: {e}")
@@ -890,11 +914,12 @@ class Actions(ActionsProtocol):
             # Note: Sprite class doesn't have rotation attribute, so we'll add it
             old_rotation = getattr(sprite, 'rotation', 0.0)
             sprite.rotation = angle
+            table.mark_sprite_changed(sprite)
             
             # Send rotation to server if requested and protocol available
             if to_server and hasattr(self.context, 'protocol') and self.context.protocol:
                 try:
-                    self.context.protocol.sprite_rotate(table_id, sprite_id, angle)
+                    self._send_to_server('sprite_rotate', table_id, sprite_id, angle)
                     logger.debug(f"Sent sprite rotation to server for {sprite_id}")
                 except Exception as e:
                     logger.error(f"Failed to send sprite rotation to server: {e}")
@@ -934,6 +959,7 @@ class Actions(ActionsProtocol):
                 for sprite in table.dict_of_sprites_list[layer]:
                     if hasattr(sprite, 'visible'):
                         sprite.visible = visible
+                        table.mark_sprite_changed(sprite)
             
             action = {
                 'type': 'set_layer_visibility',
@@ -1000,14 +1026,12 @@ class Actions(ActionsProtocol):
             old_layer = sprite.layer
             
             # Remove from old layer
-            if old_layer in table.dict_of_sprites_list:
-                if sprite in table.dict_of_sprites_list[old_layer]:
-                    table.dict_of_sprites_list[old_layer].remove(sprite)
+            table.remove_sprite_from_layer(sprite)
             
             # Add to new layer
             sprite.layer = new_layer
             if new_layer in table.dict_of_sprites_list:
-                table.dict_of_sprites_list[new_layer].append(sprite)
+                table.add_sprite_to_layer(sprite, new_layer)
             
             # Update visibility based on new layer
             if hasattr(sprite, 'visible'):
@@ -1100,26 +1124,19 @@ class Actions(ActionsProtocol):
             return ActionResult(False, f"Failed to get table sprites: {str(e)}")
     
     def get_sprite_at_position(self, table_id: str, position: Position, layer: Optional[str] = None) -> ActionResult:
-        """Get sprite at specific position"""
+        """Get top-most sprite at specific position (table coordinates)"""
         try:
             table = self._get_table_by_id(table_id)
             if not table:
                 return ActionResult(False, f"Table {table_id} not found")
             
-            layers_to_check = [layer] if layer else table.dict_of_sprites_list.keys()
-            
-            for layer_name in layers_to_check:
-                if layer_name in table.dict_of_sprites_list:
-                    for sprite in table.dict_of_sprites_list[layer_name]:
-                        # Simple collision detection
-                        sprite_size = 32  # Default sprite size
-                        if (sprite.coord_x.value <= position.x <= sprite.coord_x.value + sprite_size and
-                            sprite.coord_y.value <= position.y <= sprite.coord_y.value + sprite_size):
-                            return ActionResult(True, f"Found sprite {sprite.sprite_id} at position", {
-                                'sprite_id': sprite.sprite_id,
-                                'position': Position(sprite.coord_x.value, sprite.coord_y.value),
-                                'layer': sprite.layer
-                            })
+            sprite = table.sprite_at(position.x, position.y, layers=[layer] if layer else None)
+            if sprite is not None:
+                return ActionResult(True, f"Found sprite {sprite.sprite_id} at position", {
+                    'sprite_id': sprite.sprite_id,
+                    'position': Position(sprite.coord_x.value, sprite.coord_y.value),
+                    'layer': sprite.layer
+                })
             
             return ActionResult(True, "No sprite found at position", {'sprite_id': None})
         except Exception as e:
@@ -1127,25 +1144,19 @@ class Actions(ActionsProtocol):
     
     def get_sprites_in_area(self, table_id: str, top_left: Position, bottom_right: Position, 
                            layer: Optional[str] = None) -> ActionResult:
-        """Get all sprites in a rectangular area"""
+        """Get all sprites overlapping a rectangular area, top-most first"""
         try:
             table = self._get_table_by_id(table_id)
             if not table:
                 return ActionResult(False, f"Table {table_id} not found")
             
             sprites_in_area = {}
-            layers_to_check = [layer] if layer else table.dict_of_sprites_list.keys()
-            
-            for layer_name in layers_to_check:
-                if layer_name in table.dict_of_sprites_list:
-                    for sprite in table.dict_of_sprites_list[layer_name]:
-                        # Check if sprite is within the rectangular area
-                        if (top_left.x <= sprite.coord_x.value <= bottom_right.x and
-                            top_left.y <= sprite.coord_y.value <= bottom_right.y):
-                            sprites_in_area[sprite.sprite_id] = {
-                                'position': Position(sprite.coord_x.value, sprite.coord_y.value),
-                                'layer': sprite.layer
-                            }
+            for sprite in table.sprites_in_rect(top_left.x, top_left.y, bottom_right.x, bottom_right.y,
+                                                layers=[layer] if layer else None):
+                sprites_in_area[sprite.sprite_id] = {
+                    'position': Position(sprite.coord_x.value, sprite.coord_y.value),
+                    'layer': sprite.layer
+                }
             
             return ActionResult(True, f"Found {len(sprites_in_area)} sprites in area", {
                 'sprites': sprites_in_area
@@ -1206,7 +1217,8 @@ class Actions(ActionsProtocol):
             logger.error(f"Failed to load file {file_path}: {e}")
             return ActionResult(False, f"Failed to load file: {str(e)}")
 
-    def handle_file_loaded(self, operation_id: str, filename: str, data: Any,to_server: bool, file_path: Optional[str] = None) -> ActionResult:
+    def handle_file_loaded(self, operation_id: str, filename: str, data: Any,to_server: bool, file_path: Optional[str] = None,
+                           decoded: Optional[Dict[str, Any]] = None) -> ActionResult:
         """Handle successful file load operation"""
         try:
             if data is None:
@@ -1221,7 +1233,7 @@ class Actions(ActionsProtocol):
                     return ActionResult(False, "AssetManager not initialized")
                 
                 logger.info(f"Loading image file: {filename}")
-                result = self.AssetManager.handle_file_loaded(operation_id, filename, data)
+                result = self.AssetManager.handle_file_loaded(operation_id, filename, data, decoded=decoded)
                 if result:
                     if to_server:
                         asset_id, xxhash = result
@@ -1266,6 +1278,9 @@ class Actions(ActionsProtocol):
         """Handle successful file save operation"""
         try:
             logger.info(f"File saved successfully: {filename}")
+            autosave = getattr(self.context, 'TableAutosave', None)
+            if autosave:
+                autosave.on_save_finished(operation_id, True)
             
             # Update any UI elements or caches that depend on this file
             if filename.endswith('.json'):
@@ -1311,6 +1326,9 @@ class Actions(ActionsProtocol):
         """Handle failed file operation"""
         try:
             logger.error(f"File operation failed - Type: {operation_type}, ID: {operation_id}, Error: {error_msg}")
+            autosave = getattr(self.context, 'TableAutosave', None)
+            if autosave and operation_type == 'save':
+                autosave.on_save_finished(operation_id, False)
             
             # Handle specific error types
             if "not found" in error_msg.lower():
@@ -1365,20 +1383,23 @@ class Actions(ActionsProtocol):
                 self.AssetManager._add_to_hash_lookup(asset_id, xxhash_value)
                 self.AssetManager._add_to_path_lookup(asset_id, external_path)
                 
-                # Save registry
-                self.AssetManager._save_registry()
-                
                 # Check if there's a sprite waiting for this import
                 sprite = self.AssetManager.dict_of_sprites.get(operation_id)
+                to_server = self.AssetManager.take_upload_request(operation_id)
+                waiting = self.AssetManager._finish_load_in_flight(operation_id)
                 if sprite and self.AssetManager.StorageManager:
                     # Load the imported file to create texture
                     subdir = operation.get('subdir', 'assets')
                     load_operation_id = self.AssetManager.StorageManager.load_file_async(
-                        filename, subdir=subdir, as_json=False
+                        filename, subdir=subdir, as_json=False, to_server=to_server,
+                        decoder=self.AssetManager.image_decoder(filename)
                     )
                     # Transfer sprite association to the load operation
                     self.AssetManager.dict_of_sprites[load_operation_id] = sprite
                     del self.AssetManager.dict_of_sprites[operation_id]
+                    self.AssetManager._loads_in_flight[target_path] = load_operation_id
+                    if waiting:
+                        self.AssetManager._waiting_sprites[load_operation_id] = waiting
                     logger.info(f"Initiated load for imported file, operation_id: {load_operation_id}")
             
             action = {
@@ -1425,39 +1446,134 @@ class Actions(ActionsProtocol):
             logger.error(f"Error requesting upload for file {filename}: {e}")
             return ActionResult(False, f"Error requesting upload for file: {str(e)}")
 
+    def wire_codec_offer(self) -> List[str]:
+        """Codec names to send in the handshake"""
+        return supported_codecs()
+
+    def negotiate_wire_codec(self, peer_codecs: Optional[List[str]]) -> ActionResult:
+        """Pick the message codec from the codecs the peer offered at handshake, JSON if none match"""
+        try:
+            self.wire_codec = negotiate_codec(peer_codecs)
+            logger.info(f"Wire codec: {self.wire_codec.name} (peer offered {peer_codecs})")
+            return ActionResult(True, f"Wire codec set to {self.wire_codec.name}", {'codec': self.wire_codec.name})
+        except Exception as e:
+            self.wire_codec = JsonCodec()
+            logger.error(f"Failed to negotiate wire codec: {e}")
+            return ActionResult(False, f"Failed to negotiate wire codec: {str(e)}")
+
+    def handle_wire_codec(self, data: dict):
+        """Handle 'wire_codec' from protocol, the codec the peer picked from our offer"""
+        self.negotiate_wire_codec([data.get('codec')])
+
+    def _announce_wire_codec(self):
+        """Tell the peer our codecs and the one in use. Sent as JSON, the peer switches after reading it"""
+        protocol = getattr(self.context, 'protocol', None)
+        if not protocol or not hasattr(protocol, 'send_update'):
+            return
+        try:
+            protocol.send_update('wire_codec', {'codec': self.wire_codec.name, 'codecs': self.wire_codec_offer()})
+        except Exception as e:
+            logger.error(f"Failed to announce wire codec: {e}")
+
+    def _encode_message(self, msg):
+        """Message (protocol Message or message dict) in the negotiated wire codec"""
+        if isinstance(msg, dict):
+            return self.wire_codec.encode(msg)
+        if self.wire_codec.name == JsonCodec.name:
+            return msg.to_json()
+        return self.wire_codec.encode(message_to_dict(msg))
+
+    def send_protocol(self, method: str, *args, **kwargs):
+        """Call a protocol send method. Once a binary codec is agreed, updates (table_sync, batch)
+        and sprite move/scale/rotate are encoded with it and go out through protocol.send"""
+        protocol = self.context.protocol
+        if self.wire_codec.name != JsonCodec.name and hasattr(protocol, 'send'):
+            message = call_to_dict(method, args, kwargs, getattr(protocol, 'client_id', None), time.time())
+            if message is not None:
+                protocol.send(self._encode_message(message))
+                return
+        getattr(protocol, method)(*args, **kwargs)
+
     # ============================================================================
     # BATCH & HISTORY OPERATIONS
     # ============================================================================
+    @contextmanager
+    def batch(self) -> Iterator['Actions']:
+        """Group actions: server sends go out as one 'batch' update and history
+        records the group as one undoable command. Nested batches join the outer one.
+        """
+        if self._batch_sends is not None:
+            yield self
+            return
+        self._batch_sends = []
+        self.history.begin_group()
+        try:
+            yield self
+        finally:
+            sends, self._batch_sends = self._batch_sends, None
+            self.history.end_group()
+            self._flush_batch_sends(sends)
+
+    def _send_to_server(self, method: str, *args, **kwargs):
+        """Call protocol send method, deferred to the batch message inside `with self.batch()`.
+        Sprite move, scale and rotate go through the MessageOutbox when there is one."""
+        if self._batch_sends is not None:
+            self._batch_sends.append({'method': method, 'args': list(args), 'kwargs': kwargs})
+            return
+        outbox = getattr(self.context, 'MessageOutbox', None)
+        if outbox:
+            if outbox.coalesces(method):
+                outbox.put(method, *args, **kwargs)
+                return
+            # Keep order with coalesced messages still waiting
+            outbox.flush()
+        self.send_protocol(method, *args, **kwargs)
+
+    def _flush_batch_sends(self, sends: List[Dict[str, Any]]):
+        protocol = getattr(self.context, 'protocol', None)
+        if not sends or not protocol:
+            return
+        try:
+            outbox = getattr(self.context, 'MessageOutbox', None)
+            if outbox:
+                outbox.flush()
+            if len(sends) == 1:
+                self.send_protocol(sends[0]['method'], *sends[0]['args'], **sends[0]['kwargs'])
+                return
+            operations = []
+            for send in sends:
+                operation = call_to_operation(send['method'], send['args'], send['kwargs'])
+                if operation is not None:
+                    operations.append(operation)
+                    continue
+                # No message form for this call, send what is queued so far then the call itself
+                self._send_batch(operations)
+                operations = []
+                self.send_protocol(send['method'], *send['args'], **send['kwargs'])
+            self._send_batch(operations)
+            logger.debug(f"Sent batch of {len(sends)} operations to server")
+        except Exception as e:
+            logger.error(f"Failed to send batch to server: {e}")
+
+    def _send_batch(self, operations: List[Dict[str, Any]]):
+        """Send operation messages as one 'batch' update"""
+        if operations:
+            self.send_protocol('send_update', 'batch', {'operations': operations})
+
     def batch_actions(self, actions: List[Dict[str, Any]]) -> ActionResult:
         """Execute multiple actions in a batch"""
         try:
             results = []
-            for action in actions:
-                action_type = action.get('type')
-                params = action.get('params', {})
-                
-                # Map action types to methods
-                method_map = {
-                    'create_table': self.create_table,
-                    'delete_table': self.delete_table,
-                    'update_table': self.update_table,
-                    'move_table': self.move_table,
-                    'scale_table': self.scale_table,
-                    'create_sprite': self.create_sprite,
-                    'delete_sprite': self.delete_sprite,
-                    'move_sprite': self.move_sprite,
-                    'scale_sprite': self.scale_sprite,
-                    'rotate_sprite': self.rotate_sprite,
-                    'update_sprite': self.update_sprite,
-                    'set_layer_visibility': self.set_layer_visibility,
-                    'move_sprite_to_layer': self.move_sprite_to_layer
-                }
-                
-                if action_type in method_map:
-                    result = method_map[action_type](**params)
-                    results.append(result)
-                else:
-                    results.append(ActionResult(False, f"Unknown action type: {action_type}"))
+            with self.batch():
+                for action in actions:
+                    action_type = action.get('type')
+                    params = action.get('params', {})
+                    
+                    if action_type in self._batch_method_map:
+                        result = self._batch_method_map[action_type](**params)
+                        results.append(result)
+                    else:
+                        results.append(ActionResult(False, f"Unknown action type: {action_type}"))
             
             success_count = sum(1 for r in results if r.success)
             return ActionResult(True, f"Batch completed: {success_count}/{len(results)} successful", 
@@ -1468,32 +1584,86 @@ class Actions(ActionsProtocol):
     def undo_action(self) -> ActionResult:
         """Undo the last action"""
         try:
-            if not self.undo_stack:
+            command = self.history.pop_undo()
+            if command is None:
                 return ActionResult(False, "No actions to undo")
             
-            action = self.undo_stack.pop()
-            self.redo_stack.append(action)
-            
-            # Implement undo logic based on action type
-            # This is a simplified version - full implementation would reverse each action
-            return ActionResult(True, f"Undid action: {action.get('type', 'unknown')}")
+            result = self._apply_command(command.inverted())
+            if not result.success:
+                # Keep the command, undo can be retried once the state allows it
+                self.history.push_undo(command)
+                return ActionResult(False, f"Failed to undo {command.type}: {result.message}")
+            self.history.push_redo(command)
+            return ActionResult(True, f"Undid action: {command.type}")
         except Exception as e:
             return ActionResult(False, f"Failed to undo action: {str(e)}")
     
     def redo_action(self) -> ActionResult:
         """Redo the last undone action"""
         try:
-            if not self.redo_stack:
+            command = self.history.pop_redo()
+            if command is None:
                 return ActionResult(False, "No actions to redo")
             
-            action = self.redo_stack.pop()
-            self.undo_stack.append(action)
-            
-            # Implement redo logic based on action type
-            return ActionResult(True, f"Redid action: {action.get('type', 'unknown')}")
+            result = self._apply_command(command)
+            if not result.success:
+                self.history.push_redo(command)
+                return ActionResult(False, f"Failed to redo {command.type}: {result.message}")
+            self.history.push_undo(command)
+            return ActionResult(True, f"Redid action: {command.type}")
         except Exception as e:
             return ActionResult(False, f"Failed to redo action: {str(e)}")
 
+    def _apply_command(self, command: Command) -> ActionResult:
+        """Set the new state of a command locally, without server sync and without recording history"""
+        state = command.new
+        table_id, sprite_id = command.table_id, command.sprite_id
+        appliers = {
+            'move_sprite': lambda: self.move_sprite(table_id, sprite_id, Position(*state), to_server=False),
+            'scale_sprite': lambda: self.scale_sprite(table_id, sprite_id, *state, to_server=False),
+            'rotate_sprite': lambda: self.rotate_sprite(table_id, sprite_id, state, to_server=False),
+            'update_sprite': lambda: self.update_sprite(table_id, sprite_id, to_server=False, **state),
+            'move_sprite_to_layer': lambda: self.move_sprite_to_layer(table_id, sprite_id, state),
+            'set_layer_visibility': lambda: self.set_layer_visibility(table_id, command.extra.get('layer'), state),
+            'update_table': lambda: self.update_table(table_id, to_server=False, **state),
+            'move_table': lambda: self.move_table(table_id, Position(*state)),
+            'scale_table': lambda: self.scale_table(table_id, state, state),
+            'create_sprite': lambda: self._apply_sprite_existence(table_id, sprite_id, state),
+            'delete_sprite': lambda: self._apply_sprite_existence(table_id, sprite_id, state),
+            'create_table': lambda: self._apply_table_existence(table_id, state),
+            'create_table_from_dict': lambda: self._apply_table_existence(table_id, state),
+            'delete_table': lambda: self._apply_table_existence(table_id, state),
+        }
+        if command.type == 'batch':
+            results = [self._apply_command(inner) for inner in command.extra['commands']]
+            failed = [r.message for r in results if not r.success]
+            if failed:
+                return ActionResult(False, f"{len(failed)}/{len(results)} batched actions failed: {failed[0]}")
+            return ActionResult(True, f"Applied {len(results)} batched actions")
+        if command.type not in appliers:
+            return ActionResult(False, f"Action {command.type} cannot be undone")
+        with self.history.suspended():
+            return appliers[command.type]()
+
+    def _apply_sprite_existence(self, table_id: str, sprite_id: str, sprite_data: Optional[Dict[str, Any]]) -> ActionResult:
+        if sprite_data is None:
+            return self.delete_sprite(table_id, sprite_id, to_server=False)
+        sprite_data = dict(sprite_data)
+        position = (sprite_data.get('coord_x', 0.0), sprite_data.get('coord_y', 0.0))
+        create = self.create_animated_sprite if 'frame_rects' in sprite_data else self.create_sprite
+        return create(table_id=table_id, image_path=sprite_data.get('texture_path'), position=position, **sprite_data)
+
+    def _apply_table_existence(self, table_id: str, table_data: Optional[Dict[str, Any]]) -> ActionResult:
+        if table_data is None:
+            return self.delete_table(table_id, to_server=False)
+        try:
+            table = self.context.create_table_from_dict(copy.deepcopy(table_data))
+        except Exception as e:
+            return ActionResult(False, f"Failed to restore table {table_data.get('table_name')}: {str(e)}")
+        if not table:
+            return ActionResult(False, f"Failed to restore table {table_data.get('table_name')}")
+        return ActionResult(True, f"Table {table.name} restored", {'table': table})
+
     # ============================================================================
     # I/O EVENT HANDLERS (New Architecture)
     # ============================================================================
@@ -1537,7 +1707,11 @@ class Actions(ActionsProtocol):
         if op_type == 'load' and 'data' in operation:
             # Pass the file path from storage completion data
             file_path = operation.get('file_path', '')
-            self.handle_file_loaded(op_id, operation['filename'], operation['data'], to_server=operation.get('to_server', False), file_path=file_path)
+            decoded = {key: operation[key] for key in ('surface', 'xxhash') if operation.get(key)}
+            # A sprite that joined this load may need the upload the load was not started with
+            to_server = operation.get('to_server', False) or bool(
+                self.AssetManager and self.AssetManager.take_upload_request(op_id))
+            self.handle_file_loaded(op_id, operation['filename'], operation['data'], to_server=to_server, file_path=file_path, decoded=decoded)
         elif op_type == 'save':
             self.handle_file_saved(op_id, operation['filename'])
         elif op_type == 'import':
@@ -1572,10 +1746,15 @@ class Actions(ActionsProtocol):
                     logger.error(f"Error caching downloaded asset {asset_id}: {e}")
             else:
                 logger.warning(f"Incomplete download operation data: asset_id={asset_id}, file_path={file_path}")
+            download_scheduler = getattr(self.context, 'DownloadScheduler', None)
+            if download_scheduler:
+                download_scheduler.on_download_complete(operation)
                 
         elif op_type == 'upload':
             # Handle completed upload
             self._handle_upload_completion(operation)
+        elif op_type == 'upload_progress':
+            self._handle_upload_progress(operation)
         else:
             logger.warning(f"Unknown download operation type: {op_type}")
 
@@ -1588,6 +1767,9 @@ class Actions(ActionsProtocol):
         original_file_path = metadata.get('original_file_path', '')
         logger.info(f"Upload completed for asset {asset_id} (operation {op_id})")
         logger.debug(f"Upload metadata: {metadata}")
+        if self.AssetManager:
+            self.AssetManager.update_upload_progress(op_id, operation.get('filename', ''),
+                                                     operation.get('size', 0), operation.get('size', 0), 'done')
         
         # Notify server of successful upload if protocol is available
         if hasattr(self.context, 'protocol') and self.context.protocol:
@@ -1596,6 +1778,14 @@ class Actions(ActionsProtocol):
             except Exception as e:
                 logger.error(f"Failed to confirm upload for asset {asset_id}: {e}")
 
+    def _handle_upload_progress(self, operation: dict):
+        """Track bytes sent for running uploads, shown by the storage panel"""
+        if self.AssetManager:
+            self.AssetManager.update_upload_progress(operation.get('operation_id', 'unknown'),
+                                                     operation.get('filename', ''),
+                                                     operation.get('bytes_sent', 0),
+                                                     operation.get('total_bytes', 0))
+
     def _handle_download_error(self, operation: dict):
         """Handle download-specific errors"""
         op_id = operation.get('operation_id', 'unknown')
@@ -1605,6 +1795,11 @@ class Actions(ActionsProtocol):
         asset_id = metadata.get('asset_id', 'unknown')
         
         logger.error(f"Download operation {op_id} failed for asset {asset_id}: {error}")
+        download_scheduler = getattr(self.context, 'DownloadScheduler', None)
+        if op_type == 'download' and download_scheduler:
+            download_scheduler.on_download_failed(operation)
+        if op_type == 'upload' and self.AssetManager:
+            self.AssetManager.update_upload_progress(op_id, operation.get('filename', ''), 0, 0, 'failed', error)
         
         # Could implement retry logic here if needed
         if 'network' in error.lower() or 'timeout' in error.lower():
@@ -1634,12 +1829,15 @@ class Actions(ActionsProtocol):
                 logger.error("Invalid asset download response: missing asset_id or download_url")
                 return
 
+            filename = data.get('filename', f"{asset_id}.asset")
+            download_scheduler = getattr(self.context, 'DownloadScheduler', None)
+            if download_scheduler:
+                # Scheduler starts it when a download slot is free
+                download_scheduler.on_download_url(asset_id, download_url, filename)
+                return
+
             # Use AssetManager's DownloadManager
             if self.AssetManager and self.AssetManager.DownloadManager:
-                filename = f"{asset_id}.asset"
-                if 'filename' in data:
-                    filename = data['filename']
-                    
                 operation_id = self.AssetManager.DownloadManager.download_file_async(
                     url=download_url,
                     filename=filename,
@@ -1741,6 +1939,10 @@ class Actions(ActionsProtocol):
             if hasattr(self.context, 'session_code'):
                 self.context.session_code = session_code
             
+            # Codec handshake: pick from the codecs the server offered, JSON if it offered none
+            self.negotiate_wire_codec(data.get('codecs'))
+            self._announce_wire_codec()
+            
             # Notify GUI if available
             # Note: Future integration point for GUI messaging system
             logger.info(f"Welcome message processed for user {username} in session {session_code}")
@@ -1749,8 +1951,13 @@ class Actions(ActionsProtocol):
         except Exception as e:
             logger.error(f"Error processing welcome message: {e}")
 
-    def _request_asset_download(self, asset_id: str):
+    def _request_asset_download(self, asset_id: str, xxhash: Optional[str] = None):
         """Request asset download from server via protocol"""
+        download_scheduler = getattr(self.context, 'DownloadScheduler', None)
+        if download_scheduler:
+            # Coalesces repeated requests for the same asset
+            download_scheduler.request(asset_id, xxhash)
+            return
         if hasattr(self.context, 'protocol') and self.context.protocol:
             try:
                 self.context.protocol.request_asset_download(asset_id)
@@ -1760,6 +1967,33 @@ class Actions(ActionsProtocol):
         else:
             logger.error("No protocol available to request asset download")
 
+    # ============================================================================
+    # TABLE SYNC HANDLERS
+    # ============================================================================
+    def handle_table_sync_ack(self, data: dict):
+        """Handle 'table_sync_ack' from protocol, sent by the peer after applying a table_sync"""
+        try:
+            table_id = data.get('table_id')
+            revision = data.get('revision')
+            if not table_id or not isinstance(revision, int):
+                logger.error(f"Invalid table sync ack: {data}")
+                return
+            self.context.handle_table_sync_ack(table_id, revision)
+        except Exception as e:
+            logger.error(f"Error handling table sync ack: {e}")
+
+    def handle_table_resync_request(self, data: dict):
+        """Handle 'table_resync' from protocol, the peer lost track of a table and gets a full snapshot"""
+        try:
+            table_id = data.get('table_id')
+            if not table_id:
+                logger.error(f"Invalid table resync request: {data}")
+                return
+            self.context.request_table_resync(table_id)
+            self.context.sync_table_with_network(table_id, full=True)
+        except Exception as e:
+            logger.error(f"Error handling table resync request: {e}")
+
     # ============================================================================
     # GUI & UI EVENT HANDLERS 
     # ============================================================================
@@ -1802,7 +2036,7 @@ class Actions(ActionsProtocol):
                             else:                     
                                 # Asset not found locally, request download
                                 logger.info(f"Asset {asset_id} not found locally, requesting download (xxHash: {asset_xxhash})")
-                                self._request_asset_download(asset_id)
+                                self._request_asset_download(asset_id, asset_xxhash)
                         else:
                             logger.warning("AssetManager not initialized, cannot check asset cache")
                     elif asset_id:
@@ -1918,6 +2152,9 @@ class Actions(ActionsProtocol):
             result = self.create_table_from_dict(table_data)
             if result.success:
                 logger.info(f"Table loaded from file: {table_data.get('table_name', 'unknown')}")
+                autosave = getattr(self.context, 'TableAutosave', None)
+                if autosave:
+                    autosave.mark_saved(result.data['table'])
                 return result.data['table']
             
             else:
@@ -1944,14 +2181,16 @@ class Actions(ActionsProtocol):
         """Update multiple sprites in a batch operation"""
         try:
             results = []
-            for update in sprite_updates:
-                sprite_id = update.pop('sprite_id', None)
-                if not sprite_id:
-                    results.append(ActionResult(False, "Missing sprite_id in update"))
-                    continue
-                
-                result = self.update_sprite(table_id, sprite_id, to_server=to_server, **update)
-                results.append(result)
+            with self.batch():
+                for update in sprite_updates:
+                    sprite_id = update.get('sprite_id')
+                    if not sprite_id:
+                        results.append(ActionResult(False, "Missing sprite_id in update"))
+                        continue
+                    
+                    values = {key: value for key, value in update.items() if key != 'sprite_id'}
+                    result = self.update_sprite(table_id, sprite_id, to_server=to_server, **values)
+                    results.append(result)
             
             success_count = sum(1 for r in results if r.success)
             return ActionResult(True, f"Batch sprite update: {success_count}/{len(results)} successful", 
@@ -2007,7 +2246,7 @@ class Actions(ActionsProtocol):
                     }, getattr(self.context.protocol, 'client_id', 'unknown'))
                     
                     if hasattr(self.context.protocol, 'send'):
-                        self.context.protocol.send(msg.to_json())
+                        self.context.protocol.send(self._encode_message(msg))
                         logger.debug(f"Requested sprite {sprite_id} from server")
                         return ActionResult(True, f"Requested sprite {sprite_id} from server")
                     else:
@@ -2049,8 +2288,8 @@ class Actions(ActionsProtocol):
     # ADVANCED TABLE SERVER OPERATIONS
     # ============================================================================
     
-    def sync_table_with_server(self, table_id: str) -> ActionResult:
-        """Force sync a table with the server"""
+    def sync_table_with_server(self, table_id: str, full: bool = False) -> ActionResult:
+        """Force sync a table with the server, full sends a complete snapshot"""
         try:
             table = self._get_table_by_id(table_id)
             if not table:
@@ -2058,19 +2297,11 @@ class Actions(ActionsProtocol):
             
             if hasattr(self.context, 'protocol') and self.context.protocol:
                 try:
-                    # Send complete table data to server
-                    table_data = {
-                        'table_id': table_id,
-                        'name': table.name,
-                        'width': table.width,
-                        'height': table.height,
-                        'position': {'x': table.x_moved, 'y': table.y_moved},
-                        'scale': table.scale,
-                        'show_grid': table.show_grid,
-                        'cell_side': table.cell_side
-                    }
-                    self.context.protocol.send_update('table_sync', table_data)
-                    logger.debug(f"Synced table {table_id} with server")
+                    # Sprites changed since the server's last acknowledged revision, everything when full
+                    table_data = self.context.table_sync_payload(table, full=full)
+                    self.send_protocol('send_update', 'table_sync', table_data)
+                    logger.debug(f"Synced table {table_id} with server: {len(table_data['sprites'])} sprites, "
+                                 f"{len(table_data['removed'])} removed, full={table_data['full']}")
                     return ActionResult(True, f"Table {table_id} synced with server")
                 except Exception as e:
                     logger.error(f"Failed to sync table with server: {e}")
@@ -2704,7 +2935,7 @@ class Actions(ActionsProtocol):
                 })
                 
                 if hasattr(self.context.protocol, 'send'):
-                    self.context.protocol.send(msg.to_json())
+                    self.context.protocol.send(self._encode_message(msg))
                     logger.debug(f"Sent fog update to server for {table_id}")
                 else:
                     return ActionResult(False, "Protocol send method not available")
@@ -0,0 +1,227 @@
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, Set, TYPE_CHECKING
+from core.WorkScheduler import PRIORITY_IDLE
+from tools.logger import setup_logger
+import tools.settings as settings
+
+if TYPE_CHECKING:
+    from core.ContextTable import ContextTable
+
+logger = setup_logger(__name__, level='WARNING')
+
+PREFETCH_TABLE_LIMIT = 3           # Likely next tables warmed ahead
+PREFETCH_MAX_IN_FLIGHT = 2         # Background decodes running at once
+SAVED_TABLE_RESCAN_SECONDS = 30.0
+TABLES_SUBDIR = "tables"
+
+
+@dataclass(frozen=True)
+class AssetRef:
+    texture_path: Optional[str]
+    asset_id: Optional[str]
+    xxhash: Optional[str]
+
+
+def refs_from_table_dict(table_data: Dict[str, Any]) -> List[AssetRef]:
+    """Asset references of a table dict, layers hold either sprite lists (saves) or id -> sprite dicts (server)"""
+    refs = []
+    for layer_entities in table_data.get('layers', {}).values():
+        entities = layer_entities.values() if isinstance(layer_entities, dict) else layer_entities
+        for entity in entities or []:
+            if not isinstance(entity, dict):
+                continue
+            ref = AssetRef(entity.get('texture_path') or None, entity.get('asset_id') or None,
+                           entity.get('asset_xxhash') or None)
+            if ref.texture_path or ref.asset_id:
+                refs.append(ref)
+    return refs
+
+
+def refs_from_table(table: 'ContextTable') -> List[AssetRef]:
+    refs = []
+    for sprite_list in table.dict_of_sprites_list.values():
+        for sprite in sprite_list:
+            texture_path = getattr(sprite, 'texture_path', None)
+            if isinstance(texture_path, bytes):
+                texture_path = texture_path.decode('utf-8', errors='replace')
+            ref = AssetRef(texture_path or None, getattr(sprite, 'asset_id', None), None)
+            if ref.texture_path or ref.asset_id:
+                refs.append(ref)
+    return refs
+
+
+class AssetPrefetcher:
+    """Warms caches for tables the GM is likely to switch to next.
+
+    Tables in Context.list_of_tables and saved tables in the storage 'tables'
+    folder are ranked by how recently they were shown and how close they are to
+    the current table in the table list. Their images are decoded in the
+    background into AssetManager's prefetched surfaces, assets missing on disk
+    are requested from the server at idle priority. Work is only started on
+    frames when no other completed I/O or texture upload is waiting.
+    """
+
+    def __init__(self, context, tables_dir: Optional[Path] = None):
+        self.context = context
+        self.tables_dir = Path(tables_dir or Path(settings.DEFAULT_STORAGE_PATH) / TABLES_SUBDIR)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        self._saved_tables: Dict[str, Tuple[float, List[AssetRef]]] = {}  # table name -> (mtime, refs)
+        self._scan_future: Optional[Future] = None
+        self._last_scan = 0.0
+        self._recent_tables: List[str] = []  # Table names, most recently shown first
+        self._last_table = None
+        self._queue: deque = deque()
+        self._dirty = True
+        self.stats: Dict[str, Any] = {
+            'tables': 0,
+            'queued': 0,
+            'decodes': 0,
+            'downloads': 0,
+        }
+
+    def note_table_switch(self, table: 'ContextTable') -> None:
+        """Current table changed, rank tables again"""
+        name = getattr(table, 'name', None)
+        if name:
+            if name in self._recent_tables:
+                self._recent_tables.remove(name)
+            self._recent_tables.insert(0, name)
+        self._last_table = table
+        self._dirty = True
+
+    def invalidate(self) -> None:
+        """Table list changed"""
+        self._dirty = True
+
+    # ========================================================================
+    # SAVED TABLES
+    # ========================================================================
+
+    def _scan_saved_tables(self, known: Dict[str, float]) -> Dict[str, Tuple[float, List[AssetRef]]]:
+        """Parse saved tables changed since last scan, runs on the prefetch worker"""
+        scanned = {}
+        if not self.tables_dir.exists():
+            return scanned
+        for path in self.tables_dir.glob('*.json'):
+            try:
+                mtime = path.stat().st_mtime
+                name = path.stem
+                if known.get(name) == mtime:
+                    continue
+                with open(path, 'r', encoding='utf-8') as f:
+                    table_data = json.load(f)
+                name = table_data.get('table_name') or name
+                scanned[name] = (mtime, refs_from_table_dict(table_data))
+            except Exception as e:
+                logger.debug(f"Skipping saved table {path}: {e}")
+        return scanned
+
+    def _poll_saved_tables(self) -> None:
+        if self._scan_future is not None:
+            if not self._scan_future.done():
+                return
+            try:
+                scanned = self._scan_future.result()
+                if scanned:
+                    self._saved_tables.update(scanned)
+                    self._dirty = True
+            except Exception as e:
+                logger.error(f"Saved table scan failed: {e}")
+            self._scan_future = None
+        now = time.monotonic()
+        if now - self._last_scan >= SAVED_TABLE_RESCAN_SECONDS:
+            self._last_scan = now
+            known = {name: mtime for name, (mtime, _) in self._saved_tables.items()}
+            self._scan_future = self._executor.submit(self._scan_saved_tables, known)
+
+    # ========================================================================
+    # RANKING
+    # ========================================================================
+
+    def _rank_tables(self) -> List[Tuple[str, List[AssetRef]]]:
+        """Likely next tables: recently shown first, then neighbours in the table list, then newest saves"""
+        current = getattr(self.context, 'current_table', None)
+        tables = list(getattr(self.context, 'list_of_tables', []))
+        current_index = tables.index(current) if current in tables else 0
+        live = []
+        for index, table in enumerate(tables):
+            if table is current:
+                continue
+            recent = self._recent_tables.index(table.name) if table.name in self._recent_tables else len(self._recent_tables)
+            live.append((recent, abs(index - current_index), table.name, refs_from_table(table)))
+        live.sort(key=lambda item: (item[0], item[1]))
+        ranked = [(name, refs) for _, _, name, refs in live]
+        live_names = {name for name, _ in ranked} | {getattr(current, 'name', None)}
+        saved = sorted(((mtime, name, refs) for name, (mtime, refs) in self._saved_tables.items()
+                        if name not in live_names), reverse=True)
+        ranked.extend((name, refs) for _, name, refs in saved)
+        return ranked[:PREFETCH_TABLE_LIMIT]
+
+    def _rebuild_queue(self) -> None:
+        current = getattr(self.context, 'current_table', None)
+        skip: Set[AssetRef] = set(refs_from_table(current)) if current is not None else set()
+        ranked = self._rank_tables()
+        self._queue.clear()
+        for _, refs in ranked:
+            for ref in refs:
+                if ref not in skip:
+                    skip.add(ref)
+                    self._queue.append(ref)
+        self.stats['tables'] = len(ranked)
+        self.stats['queued'] = len(self._queue)
+
+    # ========================================================================
+    # UPDATE
+    # ========================================================================
+
+    def update(self) -> None:
+        """Call once per frame, starts prefetch work only when I/O is idle"""
+        current = getattr(self.context, 'current_table', None)
+        if current is not self._last_table:
+            self.note_table_switch(current)
+        self._poll_saved_tables()
+        if self._dirty:
+            self._rebuild_queue()
+            self._dirty = False
+        asset_manager = getattr(self.context, 'AssetManager', None)
+        if not asset_manager or not self._queue or not self._is_idle(asset_manager):
+            return
+        while self._queue and asset_manager.get_prefetch_in_flight_count() < PREFETCH_MAX_IN_FLIGHT:
+            self._warm(asset_manager, self._queue.popleft())
+        self.stats['queued'] = len(self._queue)
+
+    def _is_idle(self, asset_manager) -> bool:
+        work_scheduler = getattr(self.context, 'WorkScheduler', None)
+        if work_scheduler and work_scheduler.stats['depth'] > 0:
+            return False
+        return asset_manager.get_pending_upload_count() == 0
+
+    def _warm(self, asset_manager, ref: AssetRef) -> None:
+        if ref.texture_path and self._is_local(ref.texture_path):
+            if asset_manager.prefetch_asset(ref.texture_path):
+                self.stats['decodes'] += 1
+            return
+        if not ref.asset_id:
+            return
+        cached = asset_manager.find_asset_by_xxhash(ref.xxhash) if ref.xxhash else None
+        if cached or asset_manager.is_asset_cached(ref.asset_id):
+            return
+        download_scheduler = getattr(self.context, 'DownloadScheduler', None)
+        if download_scheduler and getattr(self.context, 'protocol', None):
+            download_scheduler.request(ref.asset_id, ref.xxhash, priority=PRIORITY_IDLE)
+            self.stats['downloads'] += 1
+
+    def _is_local(self, texture_path: str) -> bool:
+        path = Path(texture_path)
+        return path.exists() or (Path(settings.DEFAULT_STORAGE_PATH) / path).exists()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
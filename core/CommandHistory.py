@@ -0,0 +1,173 @@
+"""
+Undo/redo command log for Actions.
+Every recorded action carries its old and new state, undo applies the old
+state and redo the new one, so a command inverts itself by swapping the two.
+"""
+
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional
+from tools.logger import setup_logger
+
+logger = setup_logger(__name__, level='WARNING')
+
+MOVE_COALESCE_SECONDS = 0.5  # move_sprite calls closer than this on one sprite are one drag
+
+# Action type -> (old state key, new state key) in the action dict
+STATE_KEYS = {
+    'move_sprite': ('old_position', 'new_position'),
+    'scale_sprite': ('old_scale', 'new_scale'),
+    'rotate_sprite': ('old_rotation', 'new_rotation'),
+    'update_sprite': ('old_values', 'new_values'),
+    'move_sprite_to_layer': ('old_layer', 'new_layer'),
+    'set_layer_visibility': ('old_visibility', 'new_visibility'),
+    'update_table': ('old_values', 'new_values'),
+    'move_table': ('old_position', 'new_position'),
+    'scale_table': ('old_scale', 'new_scale'),
+    # Existence: None is "does not exist", otherwise the data to recreate it
+    'create_sprite': (None, 'sprite_data'),
+    'delete_sprite': ('sprite_data', None),
+    'create_table': (None, 'table_data'),
+    'create_table_from_dict': (None, 'table_data'),
+    'delete_table': ('table_data', None),
+}
+
+
+@dataclass
+class Command:
+    """Recorded action with the state before and after it"""
+    type: str
+    table_id: Optional[str]
+    sprite_id: Optional[str]
+    old: Any
+    new: Any
+    extra: Dict[str, Any] = field(default_factory=dict)  # e.g. layer for set_layer_visibility
+    timestamp: float = field(default_factory=time.monotonic)
+
+    @classmethod
+    def from_action(cls, action: Dict[str, Any]) -> 'Command':
+        action_type = action.get('type', 'unknown')
+        old_key, new_key = STATE_KEYS.get(action_type, (None, None))
+        skip = {'type', 'table_id', 'sprite_id', old_key, new_key}
+        return cls(
+            type=action_type,
+            table_id=action.get('table_id'),
+            sprite_id=action.get('sprite_id'),
+            old=action.get(old_key) if old_key else None,
+            new=action.get(new_key) if new_key else None,
+            extra={k: v for k, v in action.items() if k not in skip},
+        )
+
+    @classmethod
+    def group(cls, commands: List['Command']) -> 'Command':
+        """One command for actions done together, applied in order"""
+        return cls('batch', None, None, None, None, {'commands': list(commands)})
+
+    @property
+    def undoable(self) -> bool:
+        return self.type in STATE_KEYS or self.type == 'batch'
+
+    def inverted(self) -> 'Command':
+        if self.type == 'batch':
+            return Command.group([command.inverted() for command in reversed(self.extra['commands'])])
+        return Command(self.type, self.table_id, self.sprite_id, self.new, self.old,
+                       self.extra, self.timestamp)
+
+
+class CommandHistory:
+    """Bounded undo/redo log.
+
+    Undo and redo stacks are deques with maxlen, so recording never shifts a
+    list. Actions that cannot be undone (file loads, uploads) are kept in the
+    log only. Consecutive move_sprite commands on the same sprite coalesce
+    into one entry, so a drag is undone in one step. Actions recorded between
+    begin_group and end_group are undone together.
+    """
+
+    def __init__(self, max_history: int = 100):
+        self.max_history = max_history
+        self.log: Deque[Command] = deque(maxlen=max_history)
+        self.undo_stack: Deque[Command] = deque(maxlen=max_history)
+        self.redo_stack: Deque[Command] = deque(maxlen=max_history)
+        self._suspended = 0
+        self._group: Optional[List[Command]] = None
+
+    @contextmanager
+    def suspended(self) -> Iterator[None]:
+        """Do not record actions inside the block, used while applying undo/redo"""
+        self._suspended += 1
+        try:
+            yield
+        finally:
+            self._suspended -= 1
+
+    @property
+    def is_suspended(self) -> bool:
+        return self._suspended > 0
+
+    def record(self, action: Dict[str, Any]) -> Optional[Command]:
+        if self._suspended:
+            return None
+        command = Command.from_action(action)
+        if self._group is not None:
+            self.log.append(command)
+            if command.undoable:
+                self._group.append(command)
+            return command
+        if self._coalesce(command):
+            return self.undo_stack[-1]
+        self.log.append(command)
+        if command.undoable:
+            self.undo_stack.append(command)
+            self.redo_stack.clear()
+        return command
+
+    def begin_group(self) -> None:
+        if self._group is None:
+            self._group = []
+
+    def end_group(self) -> Optional[Command]:
+        """Record the grouped actions as one undo entry"""
+        commands, self._group = self._group, None
+        if not commands:
+            return None
+        command = commands[0] if len(commands) == 1 else Command.group(commands)
+        self.undo_stack.append(command)
+        self.redo_stack.clear()
+        return command
+
+    def _coalesce(self, command: Command) -> bool:
+        if command.type != 'move_sprite' or not self.undo_stack:
+            return False
+        last = self.undo_stack[-1]
+        if (last.type != 'move_sprite' or last.sprite_id != command.sprite_id
+                or last.table_id != command.table_id
+                or command.timestamp - last.timestamp > MOVE_COALESCE_SECONDS):
+            return False
+        # Keep the position before the drag, take the latest one
+        last.new = command.new
+        last.timestamp = command.timestamp
+        self.redo_stack.clear()
+        return True
+
+    def pop_undo(self) -> Optional[Command]:
+        return self.undo_stack.pop() if self.undo_stack else None
+
+    def pop_redo(self) -> Optional[Command]:
+        return self.redo_stack.pop() if self.redo_stack else None
+
+    def push_undo(self, command: Command) -> None:
+        self.undo_stack.append(command)
+
+    def push_redo(self, command: Command) -> None:
+        self.redo_stack.append(command)
+
+    def clear(self) -> None:
+        self.log.clear()
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+
+    def recent(self, count: int = 10) -> List[Command]:
+        return list(self.log)[-count:]
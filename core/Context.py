@@ -95,6 +95,9 @@ class Context:
         # Tables management
         self.current_table: Optional[ContextTable] = None
         self.list_of_tables: List[ContextTable] = []       
+        self.tables_by_id: Dict[str, ContextTable] = {}  # table_id -> table, kept in sync with list_of_tables
+        self.last_table_load: Dict[str, Any] = {}  # Counts and timings of the last create_table_from_dict
+        self.table_sync_acks: Dict[str, int] = {}  # table_id -> table revision acknowledged by the peer
         # Managers
         self.LayoutManager: Optional['LayoutManager'] = None
         self.LightingManager: Optional['LightManager'] = None     
@@ -224,7 +227,7 @@ class Context:
                 return None
             
             # Add to table's sprite list
-            table.dict_of_sprites_list[layer].append(new_sprite)
+            table.add_sprite_to_layer(new_sprite, layer)
             
             # Set as selected sprite if none selected
             if table.selected_sprite is None:
@@ -303,7 +306,7 @@ class Context:
                 return None
             
             # Add to table's sprite list
-            table.dict_of_sprites_list[layer].append(new_sprite)
+            table.add_sprite_to_layer(new_sprite, layer)
             
             # Set as selected sprite if none selected
             if table.selected_sprite is None:
@@ -329,25 +332,16 @@ class Context:
                 logger.error("No current table and no table_identifier provided")
                 return None
         else:
-            # Try to find table by name first, then by table_id
-            table = next((t for t in self.list_of_tables if t.name == table_id), None)
-            if not table:
-                # Try finding by table_id (UUID)
-                table = next((t for t in self.list_of_tables if t.table_id == table_id), None)
+            # Try table_id (UUID) first, then table name
+            table = self._get_table_by_id(table_id) or self._get_table_by_name(table_id)
         
         if not table or not sprite_id:
             logger.error(f"Table '{table_id}' not found or sprite_id is None")
             return None
             
-        for layer, sprite_list in table.dict_of_sprites_list.items():
-            for sprite_obj in sprite_list:
-                if hasattr(sprite_obj, 'sprite_id') and sprite_obj.sprite_id == sprite_id:
-                    logger.debug(f"Found sprite {sprite_id} in layer {layer}")
-                    return sprite_obj
-                # Fallback for alternate id attribute
-                if hasattr(sprite_obj, 'id') and sprite_obj.id == sprite_id:
-                    logger.debug(f"Found sprite {sprite_id} (by id attr) in layer {layer}")
-                    return sprite_obj
+        sprite_obj = table.find_sprite(sprite_id)
+        if sprite_obj is not None:
+            return sprite_obj
         logger.warning(f"Sprite with ID '{sprite_id}' not found in table '{table.name if table else 'Unknown'}'")
         return None
     
@@ -359,29 +353,26 @@ class Context:
             return False
         
         try:
-            # Find and remove sprite from all layers
-            for layer, sprite_list in table.dict_of_sprites_list.items():
-                if sprite_to_remove in sprite_list:
-                    sprite_list.remove(sprite_to_remove)
-                    
-                    # Update selected sprite if it was removed
-                    if table.selected_sprite == sprite_to_remove:
-                        # Select another sprite or set to None
-                        table.selected_sprite = None
-                        for layer_sprites in table.dict_of_sprites_list.values():
-                            if layer_sprites:
-                                table.selected_sprite = layer_sprites[0]
-                                break
-                    
-                    # Clean up sprite resources
-                    if hasattr(sprite_to_remove, 'cleanup'):
-                        sprite_to_remove.cleanup()
-                    
-                    logger.info(f"Successfully removed sprite from layer {layer}")
-                    return True
+            layer = table.remove_sprite_from_layer(sprite_to_remove)
+            if layer is None:
+                logger.warning("Sprite not found in any layer")
+                return False
             
-            logger.warning("Sprite not found in any layer")
-            return False
+            # Update selected sprite if it was removed
+            if table.selected_sprite == sprite_to_remove:
+                # Select another sprite or set to None
+                table.selected_sprite = None
+                for layer_sprites in table.dict_of_sprites_list.values():
+                    if layer_sprites:
+                        table.selected_sprite = layer_sprites[0]
+                        break
+            
+            # Clean up sprite resources
+            if hasattr(sprite_to_remove, 'cleanup'):
+                sprite_to_remove.cleanup()
+            
+            logger.info(f"Successfully removed sprite from layer {layer}")
+            return True
             
         except Exception as e:
             logger.error(f"Error removing sprite: {e}")
@@ -399,6 +390,7 @@ class Context:
                     if hasattr(sprite_obj, 'cleanup'):
                         sprite_obj.cleanup()
                 sprite_list.clear()
+            table.sprite_index.clear()
             
             table.selected_sprite = None
             logger.info(f"Cleaned up table: {table.name}")
@@ -416,6 +408,7 @@ class Context:
                 table.table_id = str(uuid.uuid4())
                 
             self.list_of_tables.append(table)
+            self.tables_by_id[table.table_id] = table
             
             # Set as current table if it's the first one
             if not self.current_table:
@@ -429,80 +422,158 @@ class Context:
             return None
     
     def create_table_from_dict(self, dict_data):
-        """Create table from dictionary data"""
-    
-        logger.info(f"Creating table from dict: {dict_data}")   
-        # Get table info from dict data
-        table_name = dict_data.get('table_name')
-        table_id = dict_data.get('table_id')  # May be None for legacy saves
-        
-        # Create the table
+        """Create table from dictionary data.
+
+        Sprite data is validated up front, all sprites are built in one pass and
+        texture loads are grouped by asset, so each unique asset is loaded once.
+        Timings are kept in last_table_load.
+        """
+        started = time.perf_counter()
+        table = self._table_from_header(dict_data)
+
+        # Parse: keep valid sprite dicts, layers hold sprite lists (saves) or id -> sprite dicts (server)
+        specs = []
+        skipped = 0
+        for layer, sprites_data in dict_data.get('layers', {}).items():
+            if layer not in table.layers or not sprites_data:
+                continue
+            entities = sprites_data.values() if isinstance(sprites_data, dict) else sprites_data
+            for sprite_data in entities:
+                sprite_layer = self._sprite_layer(table, layer, sprite_data)
+                if sprite_layer is None:
+                    skipped += 1
+                    continue
+                specs.append((sprite_layer, sprite_data))
+        parsed = time.perf_counter()
+
+        # Build all sprites, group them by asset for texture loading
+        groups: Dict[str, List[Sprite]] = {}  # asset_id or texture path -> sprites
+        player_sprites = []
+        for layer, sprite_data in specs:
+            sprite = self._add_sprite_from_dict(table, layer, sprite_data)
+            if sprite is None:
+                skipped += 1
+                continue
+            if sprite.is_player:
+                player_sprites.append(sprite)
+            groups.setdefault(sprite.asset_id or sprite_data['texture_path'], []).append(sprite)
+        built = time.perf_counter()
+
+        texture_loads = self._bind_sprite_textures(groups)
+        bound = time.perf_counter()
+
+        # Snapshots of tables without a player carry 'player': None
+        if dict_data.get('player'):
+            self._attach_player(table, dict_data['player'], player_sprites)
+        self._register_table(table)
+
+        self.last_table_load = {
+            'sprites': len(table.sprite_index),
+            'skipped': skipped,
+            'unique_assets': len(groups),
+            'texture_loads': texture_loads,
+            'parse_ms': (parsed - started) * 1000,
+            'build_ms': (built - parsed) * 1000,
+            'bind_ms': (bound - built) * 1000,
+        }
+        logger.info(f"Created table '{table.name}' from dict: {self.last_table_load}")
+        self.current_table = table  # Set as current table
+        return table
+
+    def _table_from_header(self, dict_data: Dict[str, Any]) -> ContextTable:
+        """Empty table with the properties of a table dict, sprites are added by the caller"""
         table = ContextTable(
-            table_name=table_name,
-            width=dict_data.get('width', 1920), 
+            table_name=dict_data.get('table_name'),
+            width=dict_data.get('width', 1920),
             height=dict_data.get('height', 1080),
-            table_id=table_id
+            table_id=dict_data.get('table_id')  # May be None for legacy saves
         )
-        
-        self.list_of_tables.append(table)
-        
-        # Set as current table if it's the first one
-        if not self.current_table:
-            self.current_table = table
-            # Set table properties
         table.scale = dict_data.get('scale', 1.0)
         table.x_moved = dict_data.get('x_moved', 1.0)
         table.y_moved = dict_data.get('y_moved', 1.0)
         table.show_grid = dict_data.get('show_grid', True)
         table.cell_side = dict_data.get('cell_side', CELL_SIDE)
-                    # Add sprites from layers
-        layers_data = dict_data.get('layers', {})
-        player_sprites=[]
-        for layer, sprites_data in layers_data.items():
-            if layer in table.layers and len(sprites_data) > 0:  # Only add to valid layers
-                print(f"Adding sprites to layer: {layer}")
-                print(f"sprite data {sprites_data}")
-                
-                # if isinstance(sprites_data, list)  > 0:  # unpack list TODO - change
-                #     sprites_data = sprites_data[0]                
-                try:
-                    for sprite_data in sprites_data:
-                        if 'frame_rects' in sprite_data:
-                            sprite_action = self.Actions.create_animated_sprite(                            
-                                table_id=table.table_id,
-                                image_path = sprite_data.get('texture_path'),
-                                position = (sprite_data.get('coord_x'), sprite_data.get('coord_y')),
-                                **sprite_data
-                            )
-                        else:                                    
-                            sprite_action = self.Actions.create_sprite(
-                                table_id=table.table_id,
-                                image_path = sprite_data.get('texture_path'),
-                                position = (sprite_data.get('coord_x'), sprite_data.get('coord_y')),
-                                **sprite_data
-                            )
-                        print(f'must be sprite:{sprite_action.data["sprite"]}')
-                        print(f"is player? {sprite_action.data['sprite'].is_player}")
-                        if sprite_action.data['sprite'].is_player:
-                            player_sprites.append(sprite_action.data['sprite'])
-
-                        logger.debug(f"Result of creating sprite: {sprite_action}")
-                        if not sprite_action.success:
-                            logger.warning(f"Failed to create sprite from {sprite_data.get('texture_path')}") 
-                except Exception as e:
-                    logger.error(f"Error creating sprite from data {sprite_data}: {e}")
-                    continue                         
-        # Player construction
-        if 'player' in dict_data:
-            player_data = dict_data.get('player', {})
-            player = Player(player_data.get('name', 'John'), context=self)
-            player.from_dict(player_data, player_sprites)
-            self.player = player
-            table.player = player
-
-        logger.info(f"Successfully created table '{table.name}' from dict")
-        self.current_table = table  # Set as current table
         return table
+
+    def _sprite_layer(self, table: ContextTable, layer: str, sprite_data: Any) -> Optional[str]:
+        """Layer a sprite dict found under layer goes to, None when the data is invalid"""
+        if not isinstance(sprite_data, dict):
+            return None
+        sprite_layer = sprite_data.get('layer') or layer
+        if (sprite_layer not in table.dict_of_sprites_list or not sprite_data.get('texture_path')
+                or not isinstance(sprite_data.get('coord_x', 0.0), (int, float))
+                or not isinstance(sprite_data.get('coord_y', 0.0), (int, float))):
+            logger.warning(f"Skipping invalid sprite data in layer {layer}: {sprite_data}")
+            return None
+        return sprite_layer
+
+    def _add_sprite_from_dict(self, table: ContextTable, layer: str,
+                              sprite_data: Dict[str, Any]) -> Optional[Sprite]:
+        """Build a validated sprite dict and add it to table, texture is bound later"""
+        try:
+            sprite = self._build_sprite(layer, sprite_data)
+        except Exception as e:
+            logger.error(f"Error creating sprite from data {sprite_data}: {e}")
+            return None
+        table.add_sprite_to_layer(sprite, layer)
+        if table.selected_sprite is None:
+            table.selected_sprite = sprite
+        return sprite
+
+    def _bind_sprite_textures(self, groups: Dict[str, List[Sprite]]) -> int:
+        """Bind textures, one load per unique asset. Returns number of loads started"""
+        texture_loads = 0
+        if not self.AssetManager:
+            return texture_loads
+        for sprites in groups.values():
+            texture_path = sprites[0].texture_path
+            if isinstance(texture_path, bytes):
+                texture_path = texture_path.decode()
+            texture_loads += self.AssetManager.load_asset_for_sprites(sprites, texture_path,
+                                                                      sprites[0].asset_id)
+        return texture_loads
+
+    def _register_table(self, table: ContextTable) -> None:
+        self.list_of_tables.append(table)
+        self.tables_by_id[table.table_id] = table
+        if getattr(self, 'AssetPrefetcher', None):
+            self.AssetPrefetcher.invalidate()
+
+    def _attach_player(self, table: ContextTable, player_data: Dict[str, Any],
+                       player_sprites: List[Sprite]) -> None:
+        player = Player(player_data.get('name', 'John'), context=self)
+        player.from_dict(player_data, player_sprites)
+        self.player = player
+        table.player = player
+
+    def _build_sprite(self, layer: str, sprite_data: Dict[str, Any]) -> Sprite:
+        """Sprite from saved sprite data, texture is bound later"""
+        texture_path = sprite_data['texture_path']
+        if isinstance(texture_path, str):
+            texture_path = texture_path.encode()
+        kwargs = dict(
+            scale_x=sprite_data.get('scale_x', 1),
+            scale_y=sprite_data.get('scale_y', 1),
+            character=sprite_data.get('character'),
+            moving=sprite_data.get('moving', False),
+            speed=sprite_data.get('speed'),
+            collidable=sprite_data.get('collidable', False),
+            coord_x=sprite_data.get('coord_x', 0.0),
+            coord_y=sprite_data.get('coord_y', 0.0),
+            sprite_id=sprite_data.get('sprite_id'),
+            layer=layer,
+            context=self,
+            visible=sprite_data.get('visible', True),
+            asset_id=sprite_data.get('asset_id'),
+            is_player=sprite_data.get('is_player', False),
+        )
+        if 'frame_rects' in sprite_data:
+            return AnimatedSprite(self.renderer, texture_path,
+                                  atlas_path=sprite_data.get('atlas_path'),
+                                  frame_duration=sprite_data.get('frame_duration', 100),
+                                  rotation=sprite_data.get('rotation', 0.0),
+                                  **kwargs)
+        return Sprite(self.renderer, texture_path, **kwargs)
             
  
 
@@ -533,10 +604,22 @@ class Context:
     
     def _get_table_by_id(self, table_id: str):
         """Helper to get table by table_id (UUID)"""
+        table = self.tables_by_id.get(table_id)
+        if table is not None:
+            return table
+        # Table appended to list_of_tables directly
         for table in self.list_of_tables:
             if table.table_id == table_id:
+                self.tables_by_id[table_id] = table
                 return table
         return None
+
+    def remove_table(self, table: ContextTable):
+        """Remove table from list_of_tables and the table_id map"""
+        if table in self.list_of_tables:
+            self.list_of_tables.remove(table)
+        if self.tables_by_id.get(table.table_id) is table:
+            del self.tables_by_id[table.table_id]
     
     # ============================================================================
     # NETWORK INTEGRATION METHODS
@@ -688,8 +771,12 @@ class Context:
             logger.error(f"Error validating network permission for {action}: {e}")
             return True  # Default to allowing action if error occurs
     
-    def sync_table_with_network(self, table_id: str):
-        """Synchronize table state with network"""
+    def sync_table_with_network(self, table_id: str, full: bool = False):
+        """Synchronize table state with network.
+
+        Sends sprites changed since the revision the peer acknowledged, a full
+        snapshot when there is no acknowledged revision (join, resync) or full is set.
+        """
         try:
             if not self.is_network_connected() and not self.is_network_host():
                 return
@@ -700,35 +787,14 @@ class Context:
                 return
             
             # Get table data for synchronization
-            table_data = {
-                'table_id': table_id,
-                'name': table.name,
-                'width': table.width,
-                'height': table.height,
-                'position': {'x': table.x_moved, 'y': table.y_moved},
-                'scale': table.scale,
-                'show_grid': table.show_grid,
-                'sprites': {}
-            }
-            
-            # Include sprite data
-            for layer, sprites in table.dict_of_sprites_list.items():
-                for sprite in sprites:
-                    if hasattr(sprite, 'sprite_id'):
-                        table_data['sprites'][sprite.sprite_id] = {
-                            'layer': layer,
-                            'position': {'x': sprite.coord_x.value, 'y': sprite.coord_y.value},
-                            'scale': {'x': sprite.scale_x, 'y': sprite.scale_y},
-                            'rotation': getattr(sprite, 'rotation', 0.0),
-                            'texture_path': sprite.texture_path,
-                            'visible': getattr(sprite, 'visible', True)
-                        }
+            table_data = self.table_sync_payload(table, full=full)
             
             # Send sync data
             if hasattr(self, 'protocol') and self.protocol:
                 if hasattr(self.protocol, 'send_update'):
-                    self.protocol.send_update('table_sync', table_data)
-                    logger.debug(f"Synchronized table {table_id} with network")
+                    self.Actions.send_protocol('send_update', 'table_sync', table_data)
+                    logger.debug(f"Synchronized table {table_id} with network: {len(table_data['sprites'])} sprites, "
+                                 f"{len(table_data['removed'])} removed, full={table_data['full']}")
                 else:
                     logger.warning("Protocol does not support send_update method")
             else:
@@ -736,6 +802,24 @@ class Context:
                 
         except Exception as e:
             logger.error(f"Error syncing table with network: {e}")
+
+    def table_sync_payload(self, table: ContextTable, full: bool = False) -> Dict[str, Any]:
+        """'table_sync' data for table, delta against the acknowledged revision when there is one"""
+        since = None if full else self.table_sync_acks.get(table.table_id)
+        return table.sync_payload(since)
+
+    def handle_table_sync_ack(self, table_id: str, revision: int):
+        """Peer applied table_sync up to revision, later syncs send only newer changes"""
+        if revision <= self.table_sync_acks.get(table_id, -1):
+            return
+        self.table_sync_acks[table_id] = revision
+        table = self._get_table_by_id(table_id)
+        if table:
+            table.forget_removed(revision)
+
+    def request_table_resync(self, table_id: str):
+        """Peer lost track of the table, next sync sends a full snapshot"""
+        self.table_sync_acks.pop(table_id, None)
     
     def handle_network_disconnect(self):
         """Handle network disconnection cleanup"""
@@ -744,6 +828,9 @@ class Context:
             
             # Reset network state
             self.net_client_started = False
+            self.table_sync_acks.clear()  # Rejoin starts with full snapshots
+            if getattr(self, 'MessageOutbox', None):
+                self.MessageOutbox.clear()
             if hasattr(self, 'protocol') and self.protocol:
                 if hasattr(self.protocol, 'is_connected'):
                     self.protocol.is_connected = False
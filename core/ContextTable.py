@@ -1,9 +1,12 @@
 import uuid
+import numpy as np
 from core.Sprite import Sprite
 from tools.logger import setup_logger
 logger = setup_logger(__name__)
 
 CELL_SIDE: int = 20
+# Removed sprite ids kept for delta sync, a peer further behind gets a full snapshot
+MAX_REMOVED_SPRITES: int = 4096
 
 class ContextTable:
     def __init__(self, table_name: str, width: int, height: int, scale: float = 1.0, table_id: str | None = None):
@@ -15,6 +18,15 @@ class ContextTable:
         self.height = height
         self.layers = ['map','tokens', 'dungeon_master','projectiles','light', 'height', 'obstacles', 'fog_of_war']
         self.dict_of_sprites_list = {layer: [] for layer in self.layers}
+        # sprite_id -> (layer, sprite), kept in sync by add/remove helpers below
+        self.sprite_index: dict[str, tuple[str, Sprite]] = {}
+        # layer -> (layer revision, sprites, (N, 4) min_x, min_y, max_x, max_y table space AABBs)
+        self._hit_cache: dict[str, tuple[int, list, np.ndarray]] = {}
+        self._layer_revisions: dict[str, int] = {}  # layer -> table revision of its last sprite change
+        # Delta sync: bumped on every sprite change, sprites keep the revision of their last change
+        self.revision: int = 0
+        self.removed_sprites: dict[str, int] = {}  # sprite_id -> revision it was removed at
+        self.removed_floor = 0  # Removals up to this revision were dropped from removed_sprites
         
         # Fog of war rectangles storage
         self.fog_rectangles = {'hide': [], 'reveal': []}
@@ -41,6 +53,241 @@ class ContextTable:
         self.show_grid = True
         self.cell_side = CELL_SIDE
 
+    # ========================================================================
+    # SPRITE INDEX
+    # ========================================================================
+
+    def add_sprite_to_layer(self, sprite: Sprite, layer: str):
+        """Append sprite to a layer and index it by sprite_id."""
+        self.dict_of_sprites_list[layer].append(sprite)
+        self.sprite_index[sprite.sprite_id] = (layer, sprite)
+        self.removed_sprites.pop(sprite.sprite_id, None)
+        self.mark_sprite_changed(sprite)
+
+    def remove_sprite_from_layer(self, sprite: Sprite) -> str | None:
+        """Remove sprite from its layer. Returns the layer it was in.
+
+        The layer comes from the index; layers are ordered draw lists, so the
+        sprite is deleted by position, last sprite first (recent spawns).
+        """
+        entry = self.sprite_index.get(getattr(sprite, 'sprite_id', None))
+        if entry and entry[1] is sprite:
+            layer = entry[0]
+        else:
+            layer = next((name for name, sprites in self.dict_of_sprites_list.items() if sprite in sprites), None)
+        if layer is None:
+            return None
+        sprites = self.dict_of_sprites_list[layer]
+        if sprites and sprites[-1] is sprite:
+            sprites.pop()
+        else:
+            del sprites[sprites.index(sprite)]
+        if entry and entry[1] is sprite:
+            del self.sprite_index[sprite.sprite_id]
+            self._mark_sprite_removed(sprite.sprite_id)
+        self._touch_layer(layer)
+        return layer
+
+    def remove_sprites(self, sprites) -> int:
+        """Remove many sprites with one pass over each layer they are in. Returns number removed."""
+        removed = {}  # id(sprite) -> sprite
+        layers = set()
+        for sprite in sprites:
+            entry = self.sprite_index.get(getattr(sprite, 'sprite_id', None))
+            if entry and entry[1] is sprite:
+                del self.sprite_index[sprite.sprite_id]
+                self._mark_sprite_removed(sprite.sprite_id)
+                removed[id(sprite)] = sprite
+                layers.add(entry[0])
+            elif self.remove_sprite_from_layer(sprite) is not None:
+                removed[id(sprite)] = sprite
+        for layer in layers:
+            self.dict_of_sprites_list[layer][:] = [s for s in self.dict_of_sprites_list[layer]
+                                                   if id(s) not in removed]
+            self._touch_layer(layer)
+        return len(removed)
+
+    def clear_layer(self, layer: str):
+        """Remove all sprites of a layer, sprites are not cleaned up."""
+        for sprite in self.dict_of_sprites_list.get(layer, ()):
+            entry = self.sprite_index.get(getattr(sprite, 'sprite_id', None))
+            if entry and entry[1] is sprite:
+                del self.sprite_index[sprite.sprite_id]
+                self._mark_sprite_removed(sprite.sprite_id)
+        if layer in self.dict_of_sprites_list:
+            self.dict_of_sprites_list[layer].clear()
+        self._touch_layer(layer)
+
+    def find_sprite(self, sprite_id: str) -> Sprite | None:
+        """Sprite by id, O(1)."""
+        entry = self.sprite_index.get(sprite_id)
+        return entry[1] if entry else None
+
+    def find_sprite_layer(self, sprite_id: str) -> str | None:
+        entry = self.sprite_index.get(sprite_id)
+        return entry[0] if entry else None
+
+    def reindex_sprites(self):
+        """Rebuild the index after layer lists were changed directly."""
+        self.sprite_index = {sprite.sprite_id: (layer, sprite)
+                             for layer, sprites in self.dict_of_sprites_list.items()
+                             for sprite in sprites if hasattr(sprite, 'sprite_id')}
+
+    # ========================================================================
+    # SYNC REVISIONS
+    # ========================================================================
+
+    def mark_changed(self):
+        """Table properties changed, e.g. scale or grid."""
+        self.revision += 1
+
+    def mark_sprite_changed(self, sprite: Sprite):
+        """Sprite was added or its properties changed, it goes into the next delta sync."""
+        self.revision += 1
+        sprite.revision = self.revision
+        entry = self.sprite_index.get(sprite.sprite_id)
+        if entry and entry[1] is sprite:
+            self._layer_revisions[entry[0]] = self.revision
+
+    def _touch_layer(self, layer: str):
+        """Layer contents changed, its hit test AABBs are rebuilt on the next query."""
+        self._layer_revisions[layer] = self.revision
+        self._hit_cache.pop(layer, None)
+
+    def _mark_sprite_removed(self, sprite_id: str):
+        self.revision += 1
+        self.removed_sprites.pop(sprite_id, None)  # Keep the dict in removal order
+        self.removed_sprites[sprite_id] = self.revision
+        while len(self.removed_sprites) > MAX_REMOVED_SPRITES:
+            # Peers behind the oldest kept removal get a full snapshot instead
+            self.removed_floor = self.removed_sprites.pop(next(iter(self.removed_sprites)))
+
+    def changes_since(self, revision: int) -> tuple[list[tuple[str, Sprite]], list[str]]:
+        """(layer, sprite) changed and sprite ids removed after revision."""
+        changed = [(layer, sprite) for layer, sprite in self.sprite_index.values()
+                   if getattr(sprite, 'revision', 0) > revision]
+        removed = [sprite_id for sprite_id, removed_at in self.removed_sprites.items() if removed_at > revision]
+        return changed, removed
+
+    def forget_removed(self, revision: int):
+        """Peer acknowledged revision, removals up to it no longer need to be sent."""
+        self.removed_floor = max(self.removed_floor, revision)
+        self.removed_sprites = {sprite_id: removed_at for sprite_id, removed_at in self.removed_sprites.items()
+                                if removed_at > revision}
+
+    @staticmethod
+    def _sprite_sync_data(layer: str, sprite: Sprite) -> dict:
+        texture_path = sprite.texture_path
+        if isinstance(texture_path, bytes):
+            texture_path = texture_path.decode('utf-8', errors='replace')
+        return {
+            'layer': layer,
+            'position': {'x': sprite.coord_x.value, 'y': sprite.coord_y.value},
+            'scale': {'x': sprite.scale_x, 'y': sprite.scale_y},
+            'rotation': getattr(sprite, 'rotation', 0.0),
+            'texture_path': texture_path,
+            'visible': getattr(sprite, 'visible', True)
+        }
+
+    def sync_payload(self, since: int | None = None) -> dict:
+        """Table state for 'table_sync'. Full snapshot when since is None,
+        otherwise only sprites changed or removed after revision since."""
+        if since is None or since > self.revision or since < self.removed_floor:
+            # Peer revision from another session of this table or older than the kept removals, start over
+            since = None
+            changed = [(layer, sprite) for layer, sprite in self.sprite_index.values()]
+            removed = []
+        else:
+            changed, removed = self.changes_since(since)
+        return {
+            'table_id': self.table_id,
+            'name': self.name,
+            'width': self.width,
+            'height': self.height,
+            'position': {'x': self.x_moved, 'y': self.y_moved},
+            'scale': self.scale,
+            'show_grid': self.show_grid,
+            'cell_side': self.cell_side,
+            'full': since is None,
+            'base_revision': since,
+            'revision': self.revision,
+            'sprites': {sprite.sprite_id: self._sprite_sync_data(layer, sprite) for layer, sprite in changed},
+            'removed': removed
+        }
+
+    # ========================================================================
+    # HIT TESTING
+    # ========================================================================
+
+    def invalidate_hit_cache(self, layers=None):
+        """Sprites were changed without mark_sprite_changed, AABBs of layers (all by default)
+        are rebuilt on the next query."""
+        if layers is None:
+            self._hit_cache.clear()
+        else:
+            for layer in layers:
+                self._hit_cache.pop(layer, None)
+
+    def _layer_aabbs(self, layer: str) -> tuple[list, np.ndarray]:
+        """AABBs of a layer, cached until a sprite of the layer is changed, added or removed"""
+        sprites = self.dict_of_sprites_list.get(layer, [])
+        cached = self._hit_cache.get(layer)
+        revision = self._layer_revisions.get(layer, 0)
+        if cached is not None and cached[0] == revision and len(cached[1]) == len(sprites):
+            return cached[1], cached[2]
+        snapshot = list(sprites)
+        aabbs = np.empty((len(snapshot), 4), dtype=np.float64)
+        for i, sprite in enumerate(snapshot):
+            x = sprite.coord_x.value
+            y = sprite.coord_y.value
+            aabbs[i] = (x, y, x + sprite.original_w * sprite.scale_x, y + sprite.original_h * sprite.scale_y)
+        self._hit_cache[layer] = (revision, snapshot, aabbs)
+        return snapshot, aabbs
+
+    def _layers_top_down(self, layers=None) -> list[str]:
+        """Layers in reverse render order, top-most first."""
+        layers = self.layers if layers is None else [layer for layer in self.layers if layer in layers]
+        return list(reversed(layers))
+
+    @staticmethod
+    def _point_hits(aabbs: np.ndarray, x: float, y: float) -> np.ndarray:
+        return np.nonzero((aabbs[:, 0] <= x) & (x <= aabbs[:, 2]) &
+                          (aabbs[:, 1] <= y) & (y <= aabbs[:, 3]))[0]
+
+    def sprites_at(self, x: float, y: float, layers=None) -> list[Sprite]:
+        """Sprites containing table point (x, y), top-most first."""
+        found = []
+        for layer in self._layers_top_down(layers):
+            sprites, aabbs = self._layer_aabbs(layer)
+            if sprites:
+                # Later sprites in a layer are drawn over earlier ones
+                found.extend(sprites[i] for i in self._point_hits(aabbs, x, y)[::-1])
+        return found
+
+    def sprite_at(self, x: float, y: float, layers=None) -> Sprite | None:
+        """Top-most sprite at table point (x, y)."""
+        for layer in self._layers_top_down(layers):
+            sprites, aabbs = self._layer_aabbs(layer)
+            if sprites:
+                hits = self._point_hits(aabbs, x, y)
+                if len(hits):
+                    return sprites[hits[-1]]
+        return None
+
+    def sprites_in_rect(self, x1: float, y1: float, x2: float, y2: float, layers=None) -> list[Sprite]:
+        """Sprites overlapping the table space rectangle, top-most first."""
+        min_x, max_x = min(x1, x2), max(x1, x2)
+        min_y, max_y = min(y1, y2), max(y1, y2)
+        found = []
+        for layer in self._layers_top_down(layers):
+            sprites, aabbs = self._layer_aabbs(layer)
+            if not sprites:
+                continue
+            hits = np.nonzero((aabbs[:, 0] <= max_x) & (aabbs[:, 2] >= min_x) &
+                              (aabbs[:, 1] <= max_y) & (aabbs[:, 3] >= min_y))[0]
+            found.extend(sprites[i] for i in hits[::-1])
+        return found
+
     def set_screen_area(self, x: int, y: int, width: int, height: int):
         """Set the screen area allocated to this table."""
         self.screen_area = (x, y, width, height)
@@ -144,9 +391,10 @@ class ContextTable:
         self.y_moved = max(-1000, min(0, self.y_moved + dy))
         # Note: removed _context reference for now    
         
-    def save_to_dict(self):
-        """Save table to dictionary format"""
-        data = {
+    def snapshot(self) -> dict:
+        """Copy of the table state for saving: header values and a state tuple per sprite.
+        Cheap to take on the main thread, table_dict_from_snapshot builds the save dict from it."""
+        return {
             'table_id': self.table_id,
             'table_name': self.table_name,
             'name': self.name,  # Legacy compatibility
@@ -158,11 +406,15 @@ class ContextTable:
             'show_grid': self.show_grid,
             'cell_side': self.cell_side,
             'player': self.player.to_dict() if hasattr(self, 'player') else None,
-            'layers': {layer: [sprite.to_dict() for sprite in sprites] 
-                       for layer, sprites in self.dict_of_sprites_list.items()}        
+            'revision': self.revision,
+            'layers': {layer: [(sprite.SNAPSHOT_FIELDS, sprite.snapshot()) for sprite in sprites]
+                       for layer, sprites in self.dict_of_sprites_list.items()}
         }
+
+    def save_to_dict(self):
+        """Save table to dictionary format"""
+        data = table_dict_from_snapshot(self.snapshot())
         logger.info(f"Saved table as json")
-        #print(data)
         return data
     
     def constrain_sprite_to_bounds(self, sprite):
@@ -188,3 +440,11 @@ class ContextTable:
                 sprite.coord_x.value + sprite_width_table > self.width or 
                 sprite.coord_y.value < 0 or 
                 sprite.coord_y.value + sprite_height_table > self.height)
+
+
+def table_dict_from_snapshot(snapshot: dict) -> dict:
+    """Save dict of a ContextTable.snapshot(), runs on the storage worker"""
+    data = {key: value for key, value in snapshot.items() if key not in ('layers', 'revision')}
+    data['layers'] = {layer: [dict(zip(fields, values)) for fields, values in sprites]
+                      for layer, sprites in snapshot['layers'].items()}
+    return data
@@ -0,0 +1,277 @@
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Set
+from core.WorkScheduler import PRIORITY_VISIBLE, PRIORITY_NORMAL, PRIORITY_BACKGROUND, is_sprite_on_screen
+from tools.logger import setup_logger
+import tools.settings as settings
+
+logger = setup_logger(__name__, level='WARNING')
+
+URL_REQUEST_TIMEOUT = 30.0     # Seconds to wait for the server download URL before giving up
+ADAPT_INTERVAL_SECONDS = 2.0   # Throughput window for concurrency tuning
+ADAPT_THRESHOLD = 0.1          # Relative throughput change that counts as better or worse
+
+
+@dataclass
+class AssetDownload:
+    asset_id: str
+    xxhash: Optional[str]
+    future: Future
+    base_priority: Optional[int] = None  # Caller priority, None to derive it from the viewport only
+    state: str = 'requested'  # requested -> queued (URL known) -> downloading
+    url: Optional[str] = None
+    filename: Optional[str] = None
+    operation_id: Optional[str] = None
+    requested_at: float = field(default_factory=time.monotonic)
+    started_at: float = 0.0
+    waiters: int = 1
+
+
+class DownloadScheduler:
+    """Schedules asset downloads by priority with one download per asset.
+
+    Requests for an asset_id or xxhash that is already requested share its
+    Future. Once the server sends the download URL the asset is queued; free
+    download slots go to assets with sprites on screen first, then to assets
+    used on the current table, then the rest. The number of slots is tuned from
+    measured throughput while the queue is backed up.
+    """
+
+    def __init__(self, context, min_concurrency: int = settings.MIN_DOWNLOAD_CONCURRENCY,
+                 max_concurrency: int = settings.MAX_DOWNLOAD_CONCURRENCY):
+        self.context = context
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.concurrency = max(min_concurrency, min(3, max_concurrency))
+        self._downloads: Dict[str, AssetDownload] = {}  # asset_id -> download
+        self._by_xxhash: Dict[str, str] = {}  # xxhash -> asset_id
+        self._by_operation: Dict[str, str] = {}  # DownloadManager operation ID -> asset_id
+        # Concurrency tuning
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+        self._window_saturated = False
+        self._last_throughput = 0.0
+        self._direction = 1
+        self.stats: Dict[str, Any] = {
+            'requested': 0,
+            'coalesced': 0,
+            'completed': 0,
+            'failed': 0,
+            'timed_out': 0,
+            'throughput_bps': 0.0,
+        }
+
+    # ========================================================================
+    # REQUESTS
+    # ========================================================================
+
+    def request(self, asset_id: str, xxhash: Optional[str] = None,
+                priority: Optional[int] = None) -> Future:
+        """Request asset download, returns Future resolved with the downloaded file path"""
+        existing_id = asset_id if asset_id in self._downloads else self._by_xxhash.get(xxhash or '')
+        if existing_id:
+            download = self._downloads[existing_id]
+            download.waiters += 1
+            if priority is not None:
+                download.base_priority = priority if download.base_priority is None else min(download.base_priority, priority)
+            self.stats['coalesced'] += 1
+            logger.debug(f"Download of {asset_id} joined in-flight request for {existing_id}")
+            return download.future
+        download = AssetDownload(asset_id, xxhash, Future(), priority)
+        self._downloads[asset_id] = download
+        if xxhash:
+            self._by_xxhash[xxhash] = asset_id
+        self.stats['requested'] += 1
+        self._send_url_request(download)
+        return download.future
+
+    def set_priority(self, asset_id: str, priority: int) -> None:
+        download = self._downloads.get(asset_id)
+        if download:
+            download.base_priority = priority
+
+    def is_pending(self, asset_id: str) -> bool:
+        return asset_id in self._downloads
+
+    def _send_url_request(self, download: AssetDownload) -> None:
+        protocol = getattr(self.context, 'protocol', None)
+        if not protocol:
+            logger.error("No protocol available to request asset download")
+            self._finish(download, error="No protocol available")
+            return
+        try:
+            protocol.request_asset_download(download.asset_id)
+            logger.info(f"Requested download URL for asset {download.asset_id}")
+        except Exception as e:
+            logger.error(f"Error requesting asset download for {download.asset_id}: {e}")
+            self._finish(download, error=str(e))
+
+    def on_download_url(self, asset_id: str, url: str, filename: Optional[str] = None) -> None:
+        """Server sent the URL, queue the download"""
+        download = self._downloads.get(asset_id)
+        if download is None:
+            # URL requested outside the scheduler
+            download = AssetDownload(asset_id, None, Future())
+            self._downloads[asset_id] = download
+        if download.state == 'downloading':
+            return
+        download.url = url
+        download.filename = filename or f"{asset_id}.asset"
+        download.state = 'queued'
+
+    # ========================================================================
+    # SCHEDULING
+    # ========================================================================
+
+    def update(self) -> None:
+        """Start queued downloads on free slots, call once per frame"""
+        now = time.monotonic()
+        for download in [d for d in self._downloads.values() if d.state == 'requested']:
+            if now - download.requested_at > URL_REQUEST_TIMEOUT:
+                self.stats['timed_out'] += 1
+                self._finish(download, error="Timed out waiting for download URL")
+        queued = [d for d in self._downloads.values() if d.state == 'queued']
+        free = self.concurrency - self.in_flight_count()
+        if queued and free > 0:
+            priorities = self._priorities(queued)
+            queued.sort(key=lambda d: (priorities[d.asset_id], d.requested_at))
+            for download in queued[:free]:
+                self._start(download)
+        elif queued:
+            self._window_saturated = True
+        self._adapt(now)
+
+    def _priorities(self, queued: List[AssetDownload]) -> Dict[str, int]:
+        """Effective priority, raised for assets of sprites on screen or on the current table"""
+        wanted = {d.asset_id for d in queued}
+        on_screen: Set[str] = set()
+        on_table: Set[str] = set()
+        table = getattr(self.context, 'current_table', None)
+        if table is not None:
+            for sprite_list in table.dict_of_sprites_list.values():
+                for sprite in sprite_list:
+                    asset_id = getattr(sprite, 'asset_id', None)
+                    if asset_id not in wanted:
+                        continue
+                    on_table.add(asset_id)
+                    if asset_id not in on_screen and is_sprite_on_screen(sprite, table):
+                        on_screen.add(asset_id)
+        priorities = {}
+        for download in queued:
+            base = download.base_priority
+            if download.asset_id in on_screen:
+                priority = PRIORITY_VISIBLE
+            elif download.asset_id in on_table:
+                priority = PRIORITY_NORMAL
+            else:
+                # Off table, idle requests stay below background
+                priority = PRIORITY_BACKGROUND if base is None else max(PRIORITY_BACKGROUND, base)
+            priorities[download.asset_id] = priority if base is None else min(priority, base)
+        return priorities
+
+    def _start(self, download: AssetDownload) -> None:
+        asset_manager = getattr(self.context, 'AssetManager', None)
+        download_manager = getattr(asset_manager, 'DownloadManager', None) if asset_manager else None
+        if not download_manager:
+            logger.error("AssetManager or DownloadManager not available for asset download")
+            self._finish(download, error="DownloadManager not available")
+            return
+        download.operation_id = download_manager.download_file_async(
+            url=download.url,
+            filename=download.filename,
+            subdir="",
+            metadata={
+                'asset_id': download.asset_id,
+                'source': 'server_download',
+                'type': 'asset'
+            },
+            expected_hash=download.xxhash
+        )
+        download.state = 'downloading'
+        download.started_at = time.monotonic()
+        self._by_operation[download.operation_id] = download.asset_id
+        logger.info(f"Started asset download {download.asset_id} with operation {download.operation_id}")
+
+    def in_flight_count(self) -> int:
+        return sum(1 for d in self._downloads.values() if d.state == 'downloading')
+
+    # ========================================================================
+    # COMPLETION
+    # ========================================================================
+
+    def on_download_complete(self, operation: Dict[str, Any]) -> None:
+        download = self._pop_operation(operation)
+        if download is None:
+            return
+        self._window_bytes += operation.get('size', 0)
+        self.stats['completed'] += 1
+        self._finish(download, result=operation.get('file_path'))
+
+    def on_download_failed(self, operation: Dict[str, Any]) -> None:
+        download = self._pop_operation(operation)
+        if download is None:
+            return
+        self.stats['failed'] += 1
+        self._finish(download, error=operation.get('error', 'Unknown error'))
+
+    def _pop_operation(self, operation: Dict[str, Any]) -> Optional[AssetDownload]:
+        asset_id = self._by_operation.pop(operation.get('operation_id'), None)
+        if asset_id is None:
+            asset_id = operation.get('metadata', {}).get('asset_id')
+        return self._downloads.get(asset_id) if asset_id else None
+
+    def _finish(self, download: AssetDownload, result: Optional[str] = None,
+                error: Optional[str] = None) -> None:
+        self._downloads.pop(download.asset_id, None)
+        if download.xxhash and self._by_xxhash.get(download.xxhash) == download.asset_id:
+            del self._by_xxhash[download.xxhash]
+        if download.operation_id:
+            self._by_operation.pop(download.operation_id, None)
+        if download.future.done():
+            return
+        if error is None:
+            download.future.set_result(result)
+        else:
+            download.future.set_exception(IOError(f"Download of asset {download.asset_id} failed: {error}"))
+
+    # ========================================================================
+    # CONCURRENCY
+    # ========================================================================
+
+    def _adapt(self, now: float) -> None:
+        """Hill climb the slot count on throughput, only while downloads are queued"""
+        elapsed = now - self._window_start
+        if elapsed < ADAPT_INTERVAL_SECONDS:
+            return
+        throughput = self._window_bytes / elapsed
+        self.stats['throughput_bps'] = throughput
+        if self._window_saturated and throughput > 0:
+            if throughput < self._last_throughput * (1 - ADAPT_THRESHOLD):
+                self._direction = -self._direction
+                self._step_concurrency()
+            elif throughput > self._last_throughput * (1 + ADAPT_THRESHOLD):
+                self._step_concurrency()
+            self._last_throughput = throughput
+        self._window_start = now
+        self._window_bytes = 0
+        self._window_saturated = False
+
+    def _step_concurrency(self) -> None:
+        concurrency = max(self.min_concurrency, min(self.max_concurrency, self.concurrency + self._direction))
+        if concurrency == self.concurrency:
+            # Hit a bound, probe the other way next time
+            self._direction = -self._direction
+            return
+        logger.debug(f"Download concurrency {self.concurrency} -> {concurrency}")
+        self.concurrency = concurrency
+
+    def get_stats(self) -> Dict[str, Any]:
+        states = [d.state for d in self._downloads.values()]
+        return {
+            **self.stats,
+            'concurrency': self.concurrency,
+            'awaiting_url': states.count('requested'),
+            'queued': states.count('queued'),
+            'downloading': states.count('downloading'),
+        }
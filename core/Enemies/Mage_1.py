@@ -1,13 +1,16 @@
 from os import path
 from core.Enemy import Enemy
-from core.actions_protocol import Position
 import sdl3
 import random
-import uuid
 import math
 
 SPEED = 0.01
 SHOOT_CD = 1400
+PROJECTILE_SCALE = 0.5
+PROJECTILE_FRAME_DURATION = 100
+PROJECTILE_SPEED = 0.5
+PROJECTILE_FRICTION = 1.005
+PROJECTILE_LIFETIME = 5000
 class Mage_1(Enemy):
     def __init__(self, coord_x=0, coord_y=0):
         super().__init__(name="Mage_1", coord_x=coord_x, coord_y=coord_y, health=80, damage=15)
@@ -85,48 +88,31 @@ class Mage_1(Enemy):
             sdl3.Mix_PlayChannel(-1, sound, 0)  
             self.create_projectile(projectile)  # TODO refactor to proper system
     
+    def projectile_type(self, projectile_name):
+        """Name of the ProjectileManager type for one of the mage projectiles"""
+        return f"{self.name}_{projectile_name}"
+
+    def register_projectiles(self, projectile_manager):
+        """Register the mage projectiles as pooled projectile types, once per manager"""
+        for projectile_name, paths in self.dict_of_list_of_projectiles.items():
+            projectile_manager.register_type(
+                self.projectile_type(projectile_name), paths[0], paths[1],
+                scale_x=PROJECTILE_SCALE, scale_y=PROJECTILE_SCALE, frame_duration=PROJECTILE_FRAME_DURATION,
+                speed=PROJECTILE_SPEED, friction=PROJECTILE_FRICTION, lifetime=PROJECTILE_LIFETIME)
+
     def create_projectile(self, projectile_name):
-        """TODO: make proper system for projectiles"""
-        if projectile_name in self.dict_of_list_of_projectiles:
-            dx, dy = self.angle_to_player(self.context.player)
-            paths = self.dict_of_list_of_projectiles[projectile_name]
-            projectile_sprite_path = paths[0]
-            projectile_atlas_path = paths[1]
-            projectile_collision_image_path = paths[2]
-            projectile_collision_atlas_path = paths[3]
-            projectile_position = Position(self.coord_x.value, self.coord_y.value)
-            result = self.context.Actions.create_animated_sprite(
-                    table_id=self.context.current_table.table_id,
-                    sprite_id=uuid.uuid4().hex,
-                    position=projectile_position,
-                    image_path=projectile_sprite_path,
-                    frame_duration=100,
-                    scale_x=0.5,
-                    scale_y=0.5,
-                    rotation=math.atan2(dy, dx),
-                    moving=True,
-                    speed=0.5,
-                    collidable=True,
-                    layer='projectiles',
-                    atlas_path=projectile_atlas_path,
-            )
-            if result.success:
-                sprite = result.data['sprite']
-                sprite.on_collision= {
-                    'image_path': projectile_collision_image_path,
-                    'atlas_path': projectile_collision_atlas_path,
-                    'sound': self.sounds[projectile_name][1]
-                }
-                sprite.is_enemy = True
-                sprite.enemy_type = self.name
-                sprite.set_position(self.coord_x.value, self.coord_y.value)
-                sprite.speed_friction = 1.005  # Apply friction
-                sprite.is_player = True
-                sprite.set_die_timer(5000)
-                # Calculate direction using table coordinates
-                length = (dx ** 2 + dy ** 2) ** 0.5            
-                if length > 0:
-                    vx = dx / length
-                    vy = dy / length
-                    sprite.set_speed(vx * sprite.speed, vy * sprite.speed)
-            
\ No newline at end of file
+        """Spawn a projectile toward the player into the ProjectileManager pool"""
+        projectile_manager = getattr(self.context, 'ProjectileManager', None)
+        if projectile_name not in self.dict_of_list_of_projectiles or not projectile_manager:
+            return
+        dx, dy = self.angle_to_player(self.context.player)
+        length = (dx ** 2 + dy ** 2) ** 0.5
+        if length <= 0:
+            return
+        projectile_manager.spawn(
+            self.projectile_type(projectile_name),
+            self.coord_x.value, self.coord_y.value,
+            dx / length, dy / length,
+            rotation=math.degrees(math.atan2(dy, dx)),
+            owner_is_player=False,
+        )
@@ -56,6 +56,8 @@ class Enemy:
         self.last_known_player_position: Optional[Position] = None
         self.last_foot_sound_time = 0.0
         self.context = None
+        # Result of batched line of sight query for current tick, None - not computed
+        self.player_visible: Optional[bool] = None
         
         # Timers
         self.last_attack_time = 0.0
@@ -110,8 +112,11 @@ class Enemy:
 
     def try_find_player(self, cast_ray,  player, obstacles_np) -> bool:
        """Cast ray to player and check obstacles"""
-       #TODO implement proper system for rays and checks in group, for now dirty hack
-       finded = cast_ray(self.sprite.frect, player.sprite.frect, obstacles_np, self.vision_distance)
+       # EnemyManager resolves all enemies' rays in one batch before update
+       if self.player_visible is not None:
+           finded = self.player_visible
+       else:
+           finded = cast_ray(self.sprite.frect, player.sprite.frect, obstacles_np, self.vision_distance)
        logger.debug(f"Enemy {self.name} trying to find player: {finded}")
        if finded:
            self.last_known_player_position = Position(player.coord_x.value, player.coord_y.value)
@@ -144,6 +149,16 @@ class Enemy:
         return (dx ** 2 + dy ** 2) ** 0.5
 
     def update(self, cast_ray,player,dt, obstacles_np):
+        """Think and move in one call, AIScheduler calls think and step_movement separately"""
+        self.think(cast_ray, player, obstacles_np)
+        self.step_movement(dt)
+
+    def step_movement(self, dt):
+        """Per frame movement, independent from the AI tick rate"""
+        if self.state in (EnemyState.SEARCHING, EnemyState.CHASING):
+            self.move(dt)
+
+    def think(self, cast_ray, player, obstacles_np):
         logger.debug(f"Updating enemy {self.name} at position ({self.coord_x.value}, {self.coord_y.value}) with health {self.health} in state {self.state}")
         if hasattr(self, 'is_flipped') and self.last_known_player_position is not None:
             if self.coord_x.value < self.last_known_player_position.x:
@@ -166,7 +181,8 @@ class Enemy:
                     else:
                         self.set_state(EnemyState.SEARCHING)
                 case EnemyState.SEARCHING:
-                    self.move(dt)
+                    # Keep following the path to last known position
+                    self.set_direction()
                     if self.try_find_player(cast_ray, player=player, obstacles_np=obstacles_np):
                         self.set_state(EnemyState.CHASING)
                     elif  sdl3.SDL_GetTicks() - self.timer_for_searching > TIME_FOR_SEARCHING:
@@ -177,7 +193,6 @@ class Enemy:
                     # Logic for patrolling
                     pass
                 case EnemyState.CHASING:
-                    self.move(dt)
                     if self.try_find_player(cast_ray,  player=player, obstacles_np=obstacles_np):
                         self.set_direction()
                         distance = self.distance_to_player_sprite(player)
@@ -202,18 +217,28 @@ class Enemy:
 
     def set_direction(self) -> float:
         """
-        Returns normalized direction vector (dx, dy) from enemy to last known player position.
-        If last_known_player_position is None, returns (0.0, 0.0).
+        Sets normalized speed (dx, dy) from enemy toward last known player position,
+        steering around obstacles through PathfindingManager when available.
+        Returns distance to target, 0.0 if last_known_player_position is None.
         """
         if self.last_known_player_position is None:
             return 0.0
         dx = self.last_known_player_position.x - self.coord_x.value
         dy = self.last_known_player_position.y - self.coord_y.value
         length = (dx ** 2 + dy ** 2) ** 0.5
-        if length < 1e-6:
-            dx,dy = (0.0, 0.0)
-        self.speed_x = dx / length
-        self.speed_y = dy / length
+        pathfinding = getattr(self.context, 'PathfindingManager', None) if self.context else None
+        if pathfinding:
+            # Steer sprite center, target is player top-left like coord_x/coord_y
+            half_w = self.sprite.original_w * self.sprite.scale_x / 2
+            half_h = self.sprite.original_h * self.sprite.scale_y / 2
+            self.speed_x, self.speed_y = pathfinding.get_direction(
+                self.coord_x.value + half_w, self.coord_y.value + half_h,
+                self.last_known_player_position.x + half_w, self.last_known_player_position.y + half_h)
+        elif length < 1e-6:
+            self.speed_x, self.speed_y = (0.0, 0.0)
+        else:
+            self.speed_x = dx / length
+            self.speed_y = dy / length
         logger.debug(f"Enemy {self.name} set direction to ({self.speed_x}, {self.speed_y}) towards last known player position ({self.last_known_player_position.x}, {self.last_known_player_position.y})")
         return length
 
@@ -1,8 +1,10 @@
 from venv import logger
 from core.Enemy import Enemy
+from core.AIScheduler import AIScheduler
 from core.Enemies.Mage_1 import Mage_1
 from core.Enemies.Minotaur import Minotaur
 import os
+import numpy as np
 from tools.logger import setup_logger
 import sdl3
 logger = setup_logger(__name__)
@@ -18,6 +20,10 @@ class EnemyManager:
         self.player = None
         # interface for cast ray:
         self.cast_ray = None
+        # interface for batched line of sight (K queries -> K bools):
+        self.check_vision_batch = None
+        self.centers_from_frects = None
+        self.scheduler = AIScheduler(self)
         self.context = None
         
 
@@ -32,17 +38,41 @@ class EnemyManager:
             self.enemies.append(enemy_object)
             logger.info(f"Added enemy: {enemy_object}")
             enemy_object.context = self.context
+            projectile_manager = getattr(self.context, 'ProjectileManager', None)
+            if projectile_manager and hasattr(enemy_object, 'register_projectiles'):
+                enemy_object.register_projectiles(projectile_manager)
         else:
             logger.error(f"Failed to add enemy: {enemy}")
             raise ValueError(f"Enemy type '{enemy}' is not recognized.")
+
+    def register_projectiles(self, projectile_manager) -> None:
+        """Register projectile types of enemies with ranged attacks"""
+        for enemy in self.enemies:
+            if hasattr(enemy, 'register_projectiles'):
+                enemy.register_projectiles(projectile_manager)
+
     def prepare_enemies(self):
         for enemy in self.enemies:
             enemy.prepare()
 
     def update(self, player, obstacles_np, dt):
         if not self.context.is_gm:
-            for enemy in self.enemies:
-                enemy.update(self.cast_ray, player, dt, obstacles_np)
+            self.scheduler.update(player, obstacles_np, dt)
+
+    def resolve_vision(self, player, obstacles_np, enemies=None):
+        """Collect line of sight queries of all enemies and answer them in one batch"""
+        enemies = self.enemies if enemies is None else enemies
+        if not self.check_vision_batch or not enemies or not getattr(player, 'sprite', None):
+            return
+        querying = [enemy for enemy in enemies if getattr(enemy, 'sprite', None) is not None]
+        if not querying:
+            return
+        from_points = self.centers_from_frects([enemy.sprite.frect for enemy in querying])
+        to_points = np.broadcast_to(self.centers_from_frects([player.sprite.frect]), from_points.shape)
+        distances = np.array([enemy.vision_distance for enemy in querying], dtype=np.float64)
+        visible = self.check_vision_batch(from_points, to_points, obstacles_np, distances)
+        for enemy, is_visible in zip(querying, visible.tolist()):
+            enemy.player_visible = is_visible
 
     def create_enemy(self, enemy_type) -> Enemy | None:
         if enemy_class := self.ENEMY_TYPE_MAP.get(enemy_type):
@@ -0,0 +1,103 @@
+import json
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from tools.logger import setup_logger
+import tools.settings as settings
+
+logger = setup_logger(__name__, level='WARNING')
+
+# Protocol method -> leading args kept from the first queued message (table_id, sprite_id and
+# for moves the start position), the remaining args are taken from the latest one
+COALESCED_METHODS = {
+    'sprite_move': 3,
+    'sprite_scale': 2,
+    'sprite_rotate': 2,
+}
+
+
+class MessageOutbox:
+    """Coalesces high frequency sprite messages before they reach the protocol.
+
+    Move, scale and rotate sends for the same sprite are kept in one slot that
+    is overwritten with the latest value, the slots are sent at flush_hz.
+    Everything else goes out directly, after pending slots are flushed so the
+    server sees messages in order.
+    """
+
+    def __init__(self, context, flush_hz: float = settings.OUTBOX_FLUSH_HZ):
+        self.context = context
+        self.flush_interval = 1.0 / flush_hz if flush_hz > 0 else 0.0
+        self._pending: Dict[Tuple[str, Any, Any], Dict[str, Any]] = {}
+        self._last_flush = time.monotonic()
+        self.stats: Dict[str, Any] = {
+            'queued': 0,
+            'sent': 0,
+            'suppressed': 0,
+            'bytes_saved': 0,
+            'flushes': 0,
+        }
+
+    @staticmethod
+    def coalesces(method: str) -> bool:
+        return method in COALESCED_METHODS
+
+    @staticmethod
+    def _message_size(message: Dict[str, Any]) -> int:
+        return len(json.dumps(message, default=str))
+
+    def put(self, method: str, *args, **kwargs) -> None:
+        """Queue a coalesced protocol call, replaces a pending one for the same sprite"""
+        message = {'method': method, 'args': list(args), 'kwargs': kwargs}
+        key = (method, args[0] if args else None, args[1] if len(args) > 1 else None)
+        self.stats['queued'] += 1
+        pending = self._pending.get(key)
+        if pending is None:
+            self._pending[key] = message
+            return
+        keep = COALESCED_METHODS[method]
+        message['args'] = pending['args'][:keep] + message['args'][keep:]
+        self._pending[key] = message
+        self.stats['suppressed'] += 1
+        self.stats['bytes_saved'] += self._message_size(pending)
+
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def update(self, now: Optional[float] = None) -> None:
+        """Flush when the interval has passed, call once per frame"""
+        now = time.monotonic() if now is None else now
+        if self._pending and now - self._last_flush >= self.flush_interval:
+            self.flush()
+            self._last_flush = now
+
+    def flush(self) -> int:
+        """Send all pending messages now, returns number sent"""
+        if not self._pending:
+            return 0
+        messages: List[Dict[str, Any]] = list(self._pending.values())
+        self._pending.clear()
+        protocol = getattr(self.context, 'protocol', None)
+        if not protocol:
+            logger.warning(f"No protocol available, dropped {len(messages)} outgoing messages")
+            return 0
+        actions = getattr(self.context, 'Actions', None)
+        sent = 0
+        for message in messages:
+            try:
+                if actions:  # Encoded with the negotiated wire codec
+                    actions.send_protocol(message['method'], *message['args'], **message['kwargs'])
+                else:
+                    getattr(protocol, message['method'])(*message['args'], **message['kwargs'])
+                sent += 1
+            except Exception as e:
+                logger.error(f"Failed to send {message['method']}: {e}")
+        self.stats['sent'] += sent
+        self.stats['flushes'] += 1
+        logger.debug(f"Outbox flushed {sent} messages")
+        return sent
+
+    def clear(self) -> None:
+        self._pending.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'pending': len(self._pending)}
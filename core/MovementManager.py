@@ -56,16 +56,22 @@ class MovementManager:
         self.player.physics_step(delta_time, acceleration_friction, speed_friction)
         #print(f'player name: {self.player.name} speed {self.player.speed_x}, {self.player.speed_y}, acceleration {self.player.acceleration_x}, {self.player.acceleration_y}')
         # Move all sprites
+        expired = []
         for layer, sprite_list in self.table.dict_of_sprites_list.items():
             for sprite in sprite_list:
                 if sprite.moving:
                     sprite.move(delta_time)
+                    if sprite.dx or sprite.dy:
+                        self.table.mark_sprite_changed(sprite)
                 # Only update die timer here
                 if sprite.die_timer is not None:
                     sprite.die_timer -= delta_time
                     if sprite.die_timer <= 0:
-                        #sprite.die() # no need - textures cached
-                        self.table.dict_of_sprites_list[sprite.layer].remove(sprite)
+                        sprite.die()  # Releases texture reference, texture stays cached
+                        expired.append(sprite)
+        if expired:
+            # One pass per layer, keeps the sprite index and delta sync removals current
+            self.table.remove_sprites(expired)
         # Efficient batch collision checking (all sprites except player)
         for layer_a, targets in self.COLLISION_MATRIX.items():
             sprites_a = [s for s in self.table.dict_of_sprites_list.get(layer_a, []) if getattr(s, 'collidable', True)]
@@ -118,6 +124,7 @@ class MovementManager:
                             sa.coord_y.value = b_max_y[j]
                             logger.debug(f"Clamped {sa.sprite_id} below {sb.sprite_id}")
                             sa.dy *= -0.5
+                    self.table.mark_sprite_changed(sa)
         
         # Efficient player collision check (against all obstacles)
         player = self.table.player
@@ -179,4 +186,7 @@ class MovementManager:
                     sprite.frect.y = ctypes.c_float(screen_y)
                     sprite.frect.w = ctypes.c_float(sprite.original_w * sprite.scale_x * self.table.table_scale)
                     sprite.frect.h = ctypes.c_float(sprite.original_h * sprite.scale_y * self.table.table_scale)
+        # Hit test AABBs are rebuilt only for layers with a changed sprite
+        if player.sprite and [player.coord_x.value, player.coord_y.value] != player_last_coord:
+            self.table.mark_sprite_changed(player.sprite)
         # measure time print(f'time for collision check: {time.time() - start:.6f} seconds')
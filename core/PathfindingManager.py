@@ -0,0 +1,377 @@
+import heapq
+import math
+import time
+import numpy as np
+from collections import OrderedDict
+from typing import Optional, Dict, List, Tuple, Any, TYPE_CHECKING
+from tools.logger import setup_logger
+
+if TYPE_CHECKING:
+    from core.ContextTable import ContextTable
+
+logger = setup_logger(__name__, level='WARNING')
+
+NAV_GRID_MARGIN = 1000          # Extra table units around the table, enemies may start outside it
+NAV_OBSTACLE_LAYERS = ['obstacles']
+PATH_CACHE_SIZE = 256
+MAX_ASTAR_EXPANSIONS = 20000
+FLOW_FIELD_RADIUS = 48          # Cells around goal covered by one flow field
+FLOW_FIELD_CACHE_SIZE = 8
+FLOW_FIELD_PENDING = 2        # Goals being built at once, older ones are dropped when the goal moves on
+FLOW_FIELD_BUDGET_MS = 1.0      # Relaxation time per frame spent on pending flow fields
+SQRT2 = math.sqrt(2.0)
+# (d_row, d_col, cost)
+NEIGHBORS = [(-1, 0, 1.0), (1, 0, 1.0), (0, -1, 1.0), (0, 1, 1.0),
+             (-1, -1, SQRT2), (-1, 1, SQRT2), (1, -1, SQRT2), (1, 1, SQRT2)]
+
+Cell = Tuple[int, int]  # (row, col)
+
+
+class FlowField:
+    """Directions toward one goal cell for every cell in a window around it"""
+
+    def __init__(self, goal: Cell, row0: int, col0: int, distance: np.ndarray,
+                 dir_x: np.ndarray, dir_y: np.ndarray):
+        self.goal = goal
+        self.row0 = row0
+        self.col0 = col0
+        self.distance = distance
+        self.dir_x = dir_x
+        self.dir_y = dir_y
+
+    def direction_at(self, cell: Cell) -> Optional[Tuple[float, float]]:
+        r = cell[0] - self.row0
+        c = cell[1] - self.col0
+        if r < 0 or c < 0 or r >= self.distance.shape[0] or c >= self.distance.shape[1]:
+            return None
+        if not np.isfinite(self.distance[r, c]):
+            return None
+        return float(self.dir_x[r, c]), float(self.dir_y[r, c])
+
+
+class FlowFieldBuild:
+    """Flow field toward one goal whose distances are still being relaxed"""
+
+    def __init__(self, goal: Cell, row0: int, col0: int, allowed: List[np.ndarray], distance: np.ndarray):
+        self.goal = goal
+        self.row0 = row0
+        self.col0 = col0
+        self.allowed = allowed
+        self.distance = distance
+        self.passes = 0
+
+
+class PathfindingManager:
+    """Navigation grid built from the obstacle layer with A* and flow field queries.
+
+    The grid stores how many obstacles cover each cell, so obstacles that move,
+    appear or disappear only touch their own cells. Every change bumps
+    obstacle_version which invalidates cached paths and flow fields.
+    Flow fields are built over several frames by update() within
+    FLOW_FIELD_BUDGET_MS, queries fall back to cached A* paths meanwhile.
+    """
+
+    def __init__(self, context=None):
+        self.context = context
+        self.table: Optional['ContextTable'] = None
+        self.cell_side: int = 20
+        self.origin_x: float = 0.0
+        self.origin_y: float = 0.0
+        self.rows: int = 0
+        self.cols: int = 0
+        self.coverage: np.ndarray = np.zeros((0, 0), dtype=np.int16)
+        self.blocked: np.ndarray = np.zeros((0, 0), dtype=bool)
+        self.obstacle_version: int = 0
+        self._obstacle_cells: Dict[str, Tuple[int, int, int, int]] = {}  # sprite_id -> r0, r1, c0, c1
+        self._path_cache: OrderedDict = OrderedDict()
+        self._flow_cache: OrderedDict = OrderedDict()
+        self._flow_builds: OrderedDict = OrderedDict()  # goal -> FlowFieldBuild, newest last
+        self._cache_version: int = -1
+        self.stats: Dict[str, int] = {'path_hits': 0, 'path_misses': 0, 'flow_hits': 0, 'flow_misses': 0,
+                                      'flow_passes': 0}
+
+    # ========================================================================
+    # GRID
+    # ========================================================================
+
+    def build(self, table: 'ContextTable') -> None:
+        """Full rebuild of the navigation grid for a table"""
+        self.table = table
+        self.cell_side = max(int(getattr(table, 'cell_side', 20)), 1)
+        self.origin_x = -NAV_GRID_MARGIN
+        self.origin_y = -NAV_GRID_MARGIN
+        self.cols = int(math.ceil((table.width + 2 * NAV_GRID_MARGIN) / self.cell_side))
+        self.rows = int(math.ceil((table.height + 2 * NAV_GRID_MARGIN) / self.cell_side))
+        self.coverage = np.zeros((self.rows, self.cols), dtype=np.int16)
+        self.blocked = np.zeros((self.rows, self.cols), dtype=bool)
+        self._obstacle_cells.clear()
+        self.obstacle_version += 1
+        self.sync(table)
+        logger.info(f"Built navigation grid {self.cols}x{self.rows} for table {table.table_name}")
+
+    def sync(self, table: 'ContextTable') -> None:
+        """Incrementally apply obstacle changes, cheap when nothing moved"""
+        if table is not self.table or self.cell_side != getattr(table, 'cell_side', self.cell_side):
+            self.build(table)
+            return
+        current: Dict[str, Tuple[int, int, int, int]] = {}
+        for layer in NAV_OBSTACLE_LAYERS:
+            for sprite in table.dict_of_sprites_list.get(layer, []):
+                if not getattr(sprite, 'collidable', False):
+                    continue
+                cells = self._sprite_cells(sprite)
+                if cells:
+                    current[sprite.sprite_id] = cells
+        if current == self._obstacle_cells:
+            return
+        for sprite_id, cells in self._obstacle_cells.items():
+            if current.get(sprite_id) != cells:
+                self._apply(cells, -1)
+        for sprite_id, cells in current.items():
+            if self._obstacle_cells.get(sprite_id) != cells:
+                self._apply(cells, 1)
+        self._obstacle_cells = current
+        self.obstacle_version += 1
+        logger.debug(f"Navigation grid updated, version {self.obstacle_version}")
+
+    def _sprite_cells(self, sprite) -> Optional[Tuple[int, int, int, int]]:
+        w = sprite.original_w * sprite.scale_x
+        h = sprite.original_h * sprite.scale_y
+        if w <= 0 or h <= 0:
+            return None
+        c0 = int((sprite.coord_x.value - self.origin_x) // self.cell_side)
+        r0 = int((sprite.coord_y.value - self.origin_y) // self.cell_side)
+        c1 = int(math.ceil((sprite.coord_x.value + w - self.origin_x) / self.cell_side))
+        r1 = int(math.ceil((sprite.coord_y.value + h - self.origin_y) / self.cell_side))
+        r0, c0 = max(r0, 0), max(c0, 0)
+        r1, c1 = min(r1, self.rows), min(c1, self.cols)
+        if r0 >= r1 or c0 >= c1:
+            return None
+        return r0, r1, c0, c1
+
+    def _apply(self, cells: Tuple[int, int, int, int], delta: int) -> None:
+        r0, r1, c0, c1 = cells
+        self.coverage[r0:r1, c0:c1] += delta
+        self.blocked[r0:r1, c0:c1] = self.coverage[r0:r1, c0:c1] > 0
+
+    def to_cell(self, x: float, y: float) -> Optional[Cell]:
+        c = int((x - self.origin_x) // self.cell_side)
+        r = int((y - self.origin_y) // self.cell_side)
+        if 0 <= r < self.rows and 0 <= c < self.cols:
+            return r, c
+        return None
+
+    def cell_center(self, cell: Cell) -> Tuple[float, float]:
+        return (self.origin_x + (cell[1] + 0.5) * self.cell_side,
+                self.origin_y + (cell[0] + 0.5) * self.cell_side)
+
+    def _check_cache_version(self) -> None:
+        if self._cache_version != self.obstacle_version:
+            self._path_cache.clear()
+            self._flow_cache.clear()
+            self._flow_builds.clear()
+            self._cache_version = self.obstacle_version
+
+    # ========================================================================
+    # A*
+    # ========================================================================
+
+    def find_path(self, start: Cell, goal: Cell) -> Optional[List[Cell]]:
+        """A* path of cells from start to goal, cached per (start, goal) and obstacle version"""
+        self._check_cache_version()
+        key = (start, goal)
+        if key in self._path_cache:
+            self._path_cache.move_to_end(key)
+            self.stats['path_hits'] += 1
+            return self._path_cache[key]
+        self.stats['path_misses'] += 1
+        path = self._astar(start, goal)
+        self._path_cache[key] = path
+        if len(self._path_cache) > PATH_CACHE_SIZE:
+            self._path_cache.popitem(last=False)
+        return path
+
+    def _walkable(self, r: int, c: int) -> bool:
+        return 0 <= r < self.rows and 0 <= c < self.cols and not self.blocked[r, c]
+
+    def _astar(self, start: Cell, goal: Cell) -> Optional[List[Cell]]:
+        if not self._walkable(*goal):
+            return None
+        blocked = self.blocked
+
+        def heuristic(cell: Cell) -> float:
+            dr = abs(cell[0] - goal[0])
+            dc = abs(cell[1] - goal[1])
+            return (dr + dc) + (SQRT2 - 2) * min(dr, dc)
+
+        open_heap = [(heuristic(start), 0.0, start)]
+        g_score = {start: 0.0}
+        came_from: Dict[Cell, Cell] = {}
+        expansions = 0
+        while open_heap:
+            _, g, cell = heapq.heappop(open_heap)
+            if cell == goal:
+                path = [cell]
+                while cell in came_from:
+                    cell = came_from[cell]
+                    path.append(cell)
+                path.reverse()
+                return path
+            if g > g_score.get(cell, math.inf):
+                continue
+            expansions += 1
+            if expansions > MAX_ASTAR_EXPANSIONS:
+                logger.debug(f"A* gave up after {expansions} expansions from {start} to {goal}")
+                return None
+            r, c = cell
+            for dr, dc, cost in NEIGHBORS:
+                nr, nc = r + dr, c + dc
+                if not (0 <= nr < self.rows and 0 <= nc < self.cols) or blocked[nr, nc]:
+                    continue
+                # No corner cutting
+                if dr and dc and (blocked[r, nc] or blocked[nr, c]):
+                    continue
+                ng = g + cost
+                neighbor = (nr, nc)
+                if ng < g_score.get(neighbor, math.inf):
+                    g_score[neighbor] = ng
+                    came_from[neighbor] = cell
+                    heapq.heappush(open_heap, (ng + heuristic(neighbor), ng, neighbor))
+        return None
+
+    # ========================================================================
+    # FLOW FIELD
+    # ========================================================================
+
+    def get_flow_field(self, goal: Cell) -> Optional[FlowField]:
+        """Flow field toward goal cell, shared by every agent chasing the same goal.
+        None while the field is still being built by update()."""
+        self._check_cache_version()
+        if goal in self._flow_cache:
+            self._flow_cache.move_to_end(goal)
+            self.stats['flow_hits'] += 1
+            return self._flow_cache[goal]
+        if goal not in self._flow_builds:
+            self.stats['flow_misses'] += 1
+            self._flow_builds[goal] = self._start_flow_field(goal)
+            if len(self._flow_builds) > FLOW_FIELD_PENDING:
+                self._flow_builds.popitem(last=False)
+        return None
+
+    def update(self, budget_ms: float = FLOW_FIELD_BUDGET_MS) -> None:
+        """Advance pending flow field builds within budget_ms, newest goal first. Call once per frame"""
+        self._check_cache_version()
+        if not self._flow_builds:
+            return
+        deadline = time.perf_counter() + budget_ms / 1000.0
+        # At least one pass per frame so builds can not starve
+        while self._flow_builds:
+            goal = next(reversed(self._flow_builds))
+            build = self._flow_builds[goal]
+            if self._relax(build):
+                del self._flow_builds[goal]
+                self._flow_cache[goal] = self._finish_flow_field(build)
+                if len(self._flow_cache) > FLOW_FIELD_CACHE_SIZE:
+                    self._flow_cache.popitem(last=False)
+            if time.perf_counter() >= deadline:
+                break
+
+    def _build_flow_field(self, goal: Cell) -> FlowField:
+        """Whole flow field at once, outside any frame budget"""
+        build = self._start_flow_field(goal)
+        while not self._relax(build):
+            pass
+        return self._finish_flow_field(build)
+
+    def _start_flow_field(self, goal: Cell) -> FlowFieldBuild:
+        """Window, allowed moves and initial distances of a flow field around goal"""
+        row0 = max(goal[0] - FLOW_FIELD_RADIUS, 0)
+        col0 = max(goal[1] - FLOW_FIELD_RADIUS, 0)
+        row1 = min(goal[0] + FLOW_FIELD_RADIUS + 1, self.rows)
+        col1 = min(goal[1] + FLOW_FIELD_RADIUS + 1, self.cols)
+        walk = ~self.blocked[row0:row1, col0:col1]
+        h, w = walk.shape
+        walk_p = np.pad(walk, 1, constant_values=False)
+        # Move allowed from cell to neighbor: neighbor walkable and no corner cutting
+        allowed = []
+        for dr, dc, cost in NEIGHBORS:
+            mask = walk & walk_p[1 + dr:1 + dr + h, 1 + dc:1 + dc + w]
+            if dr and dc:
+                mask &= walk_p[1 + dr:1 + dr + h, 1:1 + w] & walk_p[1:1 + h, 1 + dc:1 + dc + w]
+            allowed.append(mask)
+        distance = np.full((h, w), np.inf)
+        distance[goal[0] - row0, goal[1] - col0] = 0.0
+        return FlowFieldBuild(goal, row0, col0, allowed, distance)
+
+    def _relax(self, build: FlowFieldBuild) -> bool:
+        """One vectorized wavefront pass (Dijkstra by relaxation), True when distances are final"""
+        h, w = build.distance.shape
+        dist_p = np.pad(build.distance, 1, constant_values=np.inf)
+        relaxed = build.distance
+        for (dr, dc, cost), mask in zip(NEIGHBORS, build.allowed):
+            candidate = dist_p[1 + dr:1 + dr + h, 1 + dc:1 + dc + w] + cost
+            relaxed = np.minimum(relaxed, np.where(mask, candidate, np.inf))
+        build.passes += 1
+        self.stats['flow_passes'] += 1
+        if np.array_equal(relaxed, build.distance):
+            return True
+        build.distance = relaxed
+        return build.passes >= 4 * FLOW_FIELD_RADIUS
+
+    def _finish_flow_field(self, build: FlowFieldBuild) -> FlowField:
+        """Direction to the cheapest neighbor of every cell"""
+        distance = build.distance
+        h, w = distance.shape
+        dist_p = np.pad(distance, 1, constant_values=np.inf)
+        stacked = np.stack([np.where(mask, dist_p[1 + dr:1 + dr + h, 1 + dc:1 + dc + w], np.inf)
+                            for (dr, dc, _), mask in zip(NEIGHBORS, build.allowed)])
+        best = np.argmin(stacked, axis=0)
+        offsets = np.array([(dc, dr) for dr, dc, _ in NEIGHBORS], dtype=np.float64)
+        offsets /= np.hypot(offsets[:, 0], offsets[:, 1])[:, None]
+        dir_x = offsets[best, 0]
+        dir_y = offsets[best, 1]
+        goal_local = (build.goal[0] - build.row0, build.goal[1] - build.col0)
+        dir_x[goal_local] = 0.0
+        dir_y[goal_local] = 0.0
+        return FlowField(build.goal, build.row0, build.col0, distance, dir_x, dir_y)
+
+    # ========================================================================
+    # QUERIES
+    # ========================================================================
+
+    def get_direction(self, from_x: float, from_y: float, to_x: float, to_y: float,
+                      use_flow_field: bool = True) -> Tuple[float, float]:
+        """Normalized steering direction from a point toward a target around obstacles.
+        Falls back to straight line when the grid can not help."""
+        dx, dy = to_x - from_x, to_y - from_y
+        length = math.hypot(dx, dy)
+        straight = (dx / length, dy / length) if length > 1e-6 else (0.0, 0.0)
+        if self.table is None:
+            return straight
+        start = self.to_cell(from_x, from_y)
+        goal = self.to_cell(to_x, to_y)
+        if start is None or goal is None or start == goal:
+            return straight
+        if use_flow_field:
+            field = self.get_flow_field(goal)
+            direction = field.direction_at(start) if field else None
+            if direction is not None:
+                return direction
+        path = self.find_path(start, goal)
+        if not path or len(path) < 2:
+            return straight
+        next_x, next_y = self.cell_center(path[1])
+        dx, dy = next_x - from_x, next_y - from_y
+        length = math.hypot(dx, dy)
+        return (dx / length, dy / length) if length > 1e-6 else straight
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'grid': (self.cols, self.rows),
+            'obstacle_version': self.obstacle_version,
+            'blocked_cells': int(self.blocked.sum()) if self.blocked.size else 0,
+            'cached_paths': len(self._path_cache),
+            'cached_flow_fields': len(self._flow_cache),
+            'pending_flow_fields': len(self._flow_builds),
+            **self.stats,
+        }
@@ -1,13 +1,12 @@
 import math
 import sdl3
-import uuid
 import random
 from typing import Optional, TYPE_CHECKING
 from ctypes import c_float, byref
 from venv import logger
 from enum import Enum, auto
 from core.Sprite import AnimatedSprite
-from core.actions_protocol import Position
+from core.ProjectileManager import PLAYER_BULLET_TYPE
 if TYPE_CHECKING:
     from core.Sprite import Sprite, AnimatedSprite
 ACCELERATION_COEF = 0.1
@@ -246,6 +245,11 @@ class Player():
             self.create_bullet() # TODO refactor to proper system    
 
     def create_bullet(self):
+        # Bullets live in the projectile pool, not as table sprites
+        projectile_manager = getattr(self.context, 'ProjectileManager', None)
+        if not projectile_manager:
+            logger.warning("No ProjectileManager, bullet not fired")
+            return
         x, y = c_float(), c_float()
         sdl3.SDL_GetMouseState(byref(x), byref(y))
         logger.info(f"Mouse pos {x.value}, {y.value}")
@@ -253,39 +257,19 @@ class Player():
         # Convert mouse screen coordinates to table coordinates
         if hasattr(table, 'screen_to_table'):
             target_table_x, target_table_y = table.screen_to_table(x.value, y.value)
-        table_id = table.table_id if hasattr(table, 'table_id') else table.name
-        bullet_sprite_path = self.sprite_bullet_dict['sprite_path']
-        bullet_atlas_path = self.sprite_bullet_dict['atlas_path']
-        bullet_position = Position(self.coord_x.value, self.coord_y.value)
-        result = self.context.Actions.create_animated_sprite(
-                table_id=table_id,
-                sprite_id=uuid.uuid4().hex,
-                position=bullet_position,
-                image_path=bullet_sprite_path,
-                frame_duration=142,
-                scale_x=2,
-                scale_y=2,
-                rotation=self.weapon_angle+90,
-                moving=True,
-                speed=3,
-                collidable=True,
-                layer='projectiles',
-                atlas_path=bullet_atlas_path,                              
-        )        
-        sprite = result.data['sprite']
-        sprite.set_position(self.coord_x.value, self.coord_y.value)
-        sprite.speed_friction = 0.999  # Apply friction
-        sprite.is_player = True
-        sprite.set_die_timer(1000)
         # Calculate direction using table coordinates
         dx = target_table_x - self.coord_x.value
         dy = target_table_y - self.coord_y.value
         length = (dx ** 2 + dy ** 2) ** 0.5
-        
-        if length > 0:
-            vx = dx / length
-            vy = dy / length
-            sprite.set_speed(vx * sprite.speed, vy * sprite.speed)
+        if length <= 0:
+            return
+        projectile_manager.spawn(
+                self.sprite_bullet_dict.get('projectile_type', PLAYER_BULLET_TYPE),
+                self.coord_x.value, self.coord_y.value,
+                dx / length, dy / length,
+                rotation=self.weapon_angle+90,
+                owner_is_player=True,
+        )
     
     def to_dict(self):
         """Convert player to dictionary format."""
@@ -0,0 +1,254 @@
+import ctypes
+import sdl3
+import numpy as np
+from dataclasses import dataclass
+from typing import Optional, Dict, List, Any, TYPE_CHECKING
+from core.Sprite import AnimatedSprite, AtlasFrames
+from tools.logger import setup_logger
+
+if TYPE_CHECKING:
+    from core.ContextTable import ContextTable
+
+logger = setup_logger(__name__, level='WARNING')
+
+MAX_PROJECTILES = 1024
+COLLISION_LAYERS = ['tokens', 'obstacles']
+BOUNCE_FACTOR = -0.5
+PLAYER_BULLET_TYPE = 'pistol_bullet'
+
+
+@dataclass
+class ProjectileType:
+    """Shared data for one kind of projectile (bullet, fireball...)"""
+    type_id: int
+    name: str
+    template: AnimatedSprite  # Holds texture and atlas frames, never added to a table
+    atlas: AtlasFrames
+    scale_x: float = 1.0
+    scale_y: float = 1.0
+    frame_duration: float = 100
+    speed: float = 1.0
+    friction: float = 1.0
+    lifetime: float = 1000
+    collidable: bool = True
+    center_point: Optional[sdl3.SDL_FPoint] = None
+
+
+class ProjectileManager:
+    """Pool of live projectiles stored as struct-of-arrays.
+
+    Projectiles are not Sprites: spawning writes a slot in preallocated NumPy
+    arrays, dying swaps the last live slot into the freed one, and rendering
+    reuses preallocated SDL_FRect buffers with the shared atlas frames of the
+    projectile type. Sustained fire does not allocate per bullet.
+    """
+
+    def __init__(self, context, capacity: int = MAX_PROJECTILES):
+        self.context = context
+        self.capacity = capacity
+        self.count = 0
+        self.table: Optional['ContextTable'] = None
+        # Struct of arrays
+        self.pos_x = np.zeros(capacity, dtype=np.float64)
+        self.pos_y = np.zeros(capacity, dtype=np.float64)
+        self.vel_x = np.zeros(capacity, dtype=np.float64)
+        self.vel_y = np.zeros(capacity, dtype=np.float64)
+        self.lifetime = np.zeros(capacity, dtype=np.float64)
+        self.age = np.zeros(capacity, dtype=np.float64)
+        self.rotation = np.zeros(capacity, dtype=np.float64)
+        self.type_ids = np.zeros(capacity, dtype=np.int32)
+        self.owner_is_player = np.zeros(capacity, dtype=bool)
+        # Per type lookup arrays, indexed by type_id
+        self.types: List[ProjectileType] = []
+        self.types_by_name: Dict[str, ProjectileType] = {}
+        self._type_friction = np.ones(0, dtype=np.float64)
+        self._type_w = np.zeros(0, dtype=np.float64)
+        self._type_h = np.zeros(0, dtype=np.float64)
+        self._type_frame_duration = np.ones(0, dtype=np.float64)
+        self._type_frame_count = np.ones(0, dtype=np.int64)
+        self._type_collidable = np.zeros(0, dtype=bool)
+        # Render buffers
+        self._dst_frects = (sdl3.SDL_FRect * capacity)()
+        self.dropped = 0
+
+    # ========================================================================
+    # TYPES
+    # ========================================================================
+
+    def register_type(self, name: str, sprite_path: str, atlas_path: str, scale_x: float = 1.0,
+                      scale_y: float = 1.0, frame_duration: float = 100, speed: float = 1.0,
+                      friction: float = 1.0, lifetime: float = 1000, collidable: bool = True) -> Optional[ProjectileType]:
+        """Register a projectile type, its texture is loaded once through AssetManager"""
+        if name in self.types_by_name:
+            return self.types_by_name[name]
+        try:
+            template = AnimatedSprite(self.context.renderer, sprite_path.encode(), atlas_path=atlas_path,
+                                      scale_x=scale_x, scale_y=scale_y, frame_duration=frame_duration,
+                                      layer='projectiles', context=self.context, visible=False)
+            if getattr(self.context, 'AssetManager', None):
+                self.context.AssetManager.load_asset_for_sprite(template, sprite_path)
+            frame_w = float(template.atlas.rects[0, 2]) if len(template.atlas) else 0.0
+            frame_h = float(template.atlas.rects[0, 3]) if len(template.atlas) else 0.0
+            projectile_type = ProjectileType(len(self.types), name, template, template.atlas,
+                                             scale_x, scale_y, frame_duration, speed, friction,
+                                             lifetime, collidable, sdl3.SDL_FPoint())
+            self.types.append(projectile_type)
+            self.types_by_name[name] = projectile_type
+            self._type_friction = np.append(self._type_friction, friction)
+            self._type_w = np.append(self._type_w, frame_w * scale_x)
+            self._type_h = np.append(self._type_h, frame_h * scale_y)
+            self._type_frame_duration = np.append(self._type_frame_duration, max(float(frame_duration), 1.0))
+            self._type_frame_count = np.append(self._type_frame_count, max(len(template.atlas), 1))
+            self._type_collidable = np.append(self._type_collidable, collidable)
+            logger.info(f"Registered projectile type {name} with {len(template.atlas)} frames")
+            return projectile_type
+        except Exception as e:
+            logger.error(f"Failed to register projectile type {name}: {e}")
+            return None
+
+    # ========================================================================
+    # POOL
+    # ========================================================================
+
+    def spawn(self, type_name: str, x: float, y: float, dir_x: float, dir_y: float,
+              rotation: float = 0.0, owner_is_player: bool = False) -> int:
+        """Spawn projectile moving along (dir_x, dir_y) at the type speed. Returns slot or -1"""
+        projectile_type = self.types_by_name.get(type_name)
+        if projectile_type is None:
+            logger.error(f"Unknown projectile type: {type_name}")
+            return -1
+        if self.count >= self.capacity:
+            self.dropped += 1
+            logger.debug(f"Projectile pool full ({self.capacity}), dropping {type_name}")
+            return -1
+        i = self.count
+        self.pos_x[i] = x
+        self.pos_y[i] = y
+        self.vel_x[i] = dir_x * projectile_type.speed
+        self.vel_y[i] = dir_y * projectile_type.speed
+        self.lifetime[i] = projectile_type.lifetime
+        self.age[i] = 0.0
+        self.rotation[i] = rotation
+        self.type_ids[i] = projectile_type.type_id
+        self.owner_is_player[i] = owner_is_player
+        self.count += 1
+        return i
+
+    def _swap_remove(self, i: int) -> None:
+        last = self.count - 1
+        if i != last:
+            for array in (self.pos_x, self.pos_y, self.vel_x, self.vel_y, self.lifetime,
+                          self.age, self.rotation, self.type_ids, self.owner_is_player):
+                array[i] = array[last]
+        self.count = last
+
+    def clear(self) -> None:
+        self.count = 0
+
+    def update(self, delta_time: float, table: 'ContextTable') -> None:
+        """Move, age, collide and expire all live projectiles"""
+        if table is not self.table:
+            # Projectiles live in table coordinates, drop them on table switch
+            self.table = table
+            self.clear()
+        n = self.count
+        if n == 0:
+            return
+        type_ids = self.type_ids[:n]
+        pos_x = self.pos_x[:n]
+        pos_y = self.pos_y[:n]
+        vel_x = self.vel_x[:n]
+        vel_y = self.vel_y[:n]
+        pos_x += vel_x * delta_time
+        pos_y += vel_y * delta_time
+        friction = self._type_friction[type_ids]
+        vel_x *= friction
+        vel_y *= friction
+        self.age[:n] += delta_time
+        self.lifetime[:n] -= delta_time
+        self._collide(table, n)
+        dead = np.flatnonzero(self.lifetime[:n] <= 0)
+        # Descending order keeps the indices of not yet removed slots valid
+        for i in dead[::-1]:
+            self._swap_remove(int(i))
+
+    def _collide(self, table: 'ContextTable', n: int) -> None:
+        """Clamp and bounce projectiles off collidable sprites, like MovementManager did"""
+        obstacles = [s for layer in COLLISION_LAYERS for s in table.dict_of_sprites_list.get(layer, [])
+                     if s.collidable and not s.is_player]
+        if not obstacles:
+            return
+        b = np.array([(s.coord_x.value, s.coord_y.value,
+                       s.coord_x.value + s.original_w * s.scale_x,
+                       s.coord_y.value + s.original_h * s.scale_y) for s in obstacles])
+        type_ids = self.type_ids[:n]
+        a_min_x = self.pos_x[:n]
+        a_min_y = self.pos_y[:n]
+        w = self._type_w[type_ids]
+        h = self._type_h[type_ids]
+        a_max_x = a_min_x + w
+        a_max_y = a_min_y + h
+        collide = ((a_max_x[:, None] > b[:, 0]) & (b[:, 2] > a_min_x[:, None]) &
+                   (a_max_y[:, None] > b[:, 1]) & (b[:, 3] > a_min_y[:, None]))
+        collide &= self._type_collidable[type_ids][:, None]
+        hit = collide.any(axis=1)
+        if not hit.any():
+            return
+        idx = np.flatnonzero(hit)
+        j = collide[idx].argmax(axis=1)  # First obstacle hit per projectile
+        overlap_x = np.minimum(a_max_x[idx], b[j, 2]) - np.maximum(a_min_x[idx], b[j, 0])
+        overlap_y = np.minimum(a_max_y[idx], b[j, 3]) - np.maximum(a_min_y[idx], b[j, 1])
+        clamp_x = overlap_x < overlap_y
+        ix, jx = idx[clamp_x], j[clamp_x]
+        iy, jy = idx[~clamp_x], j[~clamp_x]
+        self.pos_x[ix] = np.where(a_min_x[ix] < b[jx, 0], b[jx, 0] - w[ix], b[jx, 2])
+        self.vel_x[ix] *= BOUNCE_FACTOR
+        self.pos_y[iy] = np.where(a_min_y[iy] < b[jy, 1], b[jy, 1] - h[iy], b[jy, 3])
+        self.vel_y[iy] *= BOUNCE_FACTOR
+
+    # ========================================================================
+    # RENDER
+    # ========================================================================
+
+    def render(self, renderer, table: 'ContextTable', is_selected_layer: bool = True) -> None:
+        """Render all live projectiles from their shared atlas frames"""
+        n = self.count
+        if n == 0 or table is None:
+            return
+        type_ids = self.type_ids[:n]
+        screen_x, screen_y = table.table_to_screen(self.pos_x[:n], self.pos_y[:n])
+        w = self._type_w[type_ids] * table.table_scale
+        h = self._type_h[type_ids] * table.table_scale
+        frames = (self.age[:n] // self._type_frame_duration[type_ids]).astype(np.int64)
+        frames %= self._type_frame_count[type_ids]
+        alpha = ctypes.c_ubyte(255 if is_selected_layer else 128)
+        for projectile_type in self.types:
+            if projectile_type.template.texture:
+                sdl3.SDL_SetTextureAlphaMod(projectile_type.template.texture, alpha)
+        dst_frects = self._dst_frects
+        for i, (type_id, x, y, fw, fh, frame, rotation) in enumerate(zip(
+                type_ids.tolist(), screen_x.tolist(), screen_y.tolist(), w.tolist(), h.tolist(),
+                frames.tolist(), self.rotation[:n].tolist())):
+            projectile_type = self.types[type_id]
+            texture = projectile_type.template.texture
+            if not texture:
+                continue
+            dst = dst_frects[i]
+            dst.x = x
+            dst.y = y
+            dst.w = fw
+            dst.h = fh
+            center_point = projectile_type.center_point
+            center_point.x = fw / 2
+            center_point.y = fh / 2
+            sdl3.SDL_RenderTextureRotated(renderer, texture, projectile_type.atlas.frects[frame],
+                                          ctypes.byref(dst), rotation, ctypes.byref(center_point),
+                                          sdl3.SDL_FLIP_NONE)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'live': self.count,
+            'capacity': self.capacity,
+            'types': len(self.types),
+            'dropped': self.dropped,
+        }
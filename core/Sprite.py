@@ -3,9 +3,12 @@ from tools.logger import setup_logger
 from typing import Optional, Union, Dict, Any, TYPE_CHECKING
 import sdl3
 import uuid
-import time
 import json
 import re
+import weakref
+import numpy as np
+from dataclasses import dataclass
+from core.TextureCache import texture_cache, texture_address
 
 # Import types for type checking
 if TYPE_CHECKING:     
@@ -14,6 +17,151 @@ if TYPE_CHECKING:
 
 logger = setup_logger(__name__)
 
+ANIMATION_CLOCK_CAPACITY = 256  # Initial number of animation slots, grows by doubling
+
+
+@dataclass(frozen=True)
+class AtlasFrames:
+    """Parsed sprite atlas shared by every AnimatedSprite using it.
+
+    rects is a read-only (N, 4) float32 array of x, y, w, h; frects holds the
+    matching SDL_FRect source rectangles. Neither must be modified by callers.
+    """
+    atlas_path: str
+    rects: np.ndarray
+    frects: tuple
+
+    def __len__(self) -> int:
+        return len(self.frects)
+
+
+_atlas_cache: Dict[str, AtlasFrames] = {}
+
+
+def _frame_sort_key(key: str) -> int:
+    match = re.search(r'(\d+)\.png$', key)
+    return int(match.group(1)) if match else 0
+
+
+def load_atlas_frames(atlas_path: str) -> AtlasFrames:
+    """Return frames for an atlas JSON, parsing the file only the first time"""
+    cached = _atlas_cache.get(atlas_path)
+    if cached is not None:
+        return cached
+    #TODO - integrate with storage manager
+    with open(atlas_path, 'r') as f:
+        atlas = json.load(f)
+    frames = atlas['frames']
+    keys = sorted(frames.keys(), key=_frame_sort_key)
+    rects = np.array([[frames[key]['frame']['x'], frames[key]['frame']['y'],
+                       frames[key]['frame']['w'], frames[key]['frame']['h']] for key in keys],
+                     dtype=np.float32).reshape(-1, 4)
+    rects.flags.writeable = False
+    frects = []
+    for x, y, w, h in rects.tolist():
+        frect = sdl3.SDL_FRect()
+        frect.x = x
+        frect.y = y
+        frect.w = w
+        frect.h = h
+        frects.append(frect)
+    atlas_frames = AtlasFrames(atlas_path, rects, tuple(frects))
+    _atlas_cache[atlas_path] = atlas_frames
+    logger.debug(f"Parsed atlas {atlas_path} with {len(atlas_frames)} frames")
+    return atlas_frames
+
+
+def clear_atlas_cache() -> None:
+    """Drop parsed atlases, e.g. after atlas files were edited on disk"""
+    _atlas_cache.clear()
+
+
+class AnimationClock:
+    """One clock for all animated sprites, advanced once per frame.
+
+    Each AnimatedSprite owns a slot in struct-of-arrays storage (elapsed time,
+    frame duration, frame count, current frame). tick() advances every slot in a
+    single NumPy step instead of each sprite polling the wall clock on render.
+    """
+
+    def __init__(self, capacity: int = ANIMATION_CLOCK_CAPACITY) -> None:
+        self.now: float = 0.0  # ms since clock start
+        self._elapsed = np.zeros(capacity, dtype=np.float64)
+        self._durations = np.ones(capacity, dtype=np.float64)
+        self._frame_counts = np.ones(capacity, dtype=np.int64)
+        self._frames = np.zeros(capacity, dtype=np.int64)
+        self._active = np.zeros(capacity, dtype=bool)
+        self._free_slots = list(range(capacity - 1, -1, -1))
+        self._high_water = 0  # Slots at or above this index have never been used
+
+    def _grow(self) -> None:
+        old = len(self._elapsed)
+        new = old * 2
+        self._elapsed = np.resize(self._elapsed, new)
+        self._durations = np.resize(self._durations, new)
+        self._frame_counts = np.resize(self._frame_counts, new)
+        self._frames = np.resize(self._frames, new)
+        self._active = np.concatenate([self._active, np.zeros(new - old, dtype=bool)])
+        self._free_slots = list(range(new - 1, old - 1, -1)) + self._free_slots
+
+    def register(self, frame_duration: float, frame_count: int) -> int:
+        """Allocate a slot for an animation, returns slot index"""
+        if not self._free_slots:
+            self._grow()
+        slot = self._free_slots.pop()
+        self._elapsed[slot] = 0.0
+        self._durations[slot] = max(float(frame_duration), 1.0)
+        self._frame_counts[slot] = max(int(frame_count), 1)
+        self._frames[slot] = 0
+        self._active[slot] = True
+        self._high_water = max(self._high_water, slot + 1)
+        return slot
+
+    def unregister(self, slot: int) -> None:
+        if 0 <= slot < len(self._active) and self._active[slot]:
+            self._active[slot] = False
+            self._free_slots.append(slot)
+
+    def set_animation(self, slot: int, frame_duration: float, frame_count: int) -> None:
+        self._durations[slot] = max(float(frame_duration), 1.0)
+        self._frame_counts[slot] = max(int(frame_count), 1)
+        self._frames[slot] %= self._frame_counts[slot]
+
+    def get_frame(self, slot: int) -> int:
+        return int(self._frames[slot])
+
+    def set_frame(self, slot: int, frame: int) -> None:
+        self._frames[slot] = int(frame) % self._frame_counts[slot]
+        self._elapsed[slot] = 0.0
+
+    def get_elapsed(self, slot: int) -> float:
+        return float(self._elapsed[slot])
+
+    def tick(self, delta_time: float) -> None:
+        """Advance all registered animations by delta_time ms"""
+        self.now += delta_time
+        n = self._high_water
+        if n == 0 or delta_time <= 0:
+            return
+        active = self._active[:n]
+        elapsed = self._elapsed[:n]
+        durations = self._durations[:n]
+        elapsed += np.where(active, delta_time, 0.0)
+        steps = np.floor_divide(elapsed, durations)
+        elapsed -= steps * durations
+        frames = self._frames[:n]
+        frames += steps.astype(np.int64)
+        np.remainder(frames, self._frame_counts[:n], out=frames)
+
+    @property
+    def active_count(self) -> int:
+        return int(np.count_nonzero(self._active[:self._high_water]))
+
+
+# Shared clock, ticked from SDL_AppIterate
+animation_clock = AnimationClock()
+
+
 class Sprite:
     """A sprite represents a visual entity on the game table with position, texture, and game logic."""
     
@@ -79,6 +227,7 @@ class Sprite:
         else:
             self.name: Optional[str] = None
         self.is_player: bool = is_player  # Default to not a player sprite
+        self.revision: int = 0  # Table revision of the last change, see ContextTable.mark_sprite_changed
         # Initialize movement properties
         self.dx: float = 0.0
         self.dy: float = 0.0
@@ -180,21 +329,28 @@ class Sprite:
         """Clean up sprite resources"""
         try:
             if hasattr(self, 'texture') and self.texture:
-                #sdl3.SDL_DestroyTexture(self.texture)# we cache textures
+                # Textures are owned by texture_cache, only drop our reference
+                texture_cache.release(self.texture)
                 self.texture = None
                 logger.debug(f"Cleaned up texture for sprite: {self.texture_path}")
         except Exception as e:
             logger.error(f"Error cleaning up sprite texture: {e}")
 
+    def _swap_texture(self, texture: Any) -> None:
+        """Point sprite to new texture, shared textures are refcounted by texture_cache"""
+        old_texture = self.texture
+        if texture_address(old_texture) == texture_address(texture):
+            self.texture = texture
+            return
+        if texture:
+            texture_cache.retain(texture)
+        self.texture = texture
+        if old_texture:
+            texture_cache.release(old_texture)
+
     def reload_texture(self, texture: Any, w: int, h: int) -> bool:  # texture: SDL_Texture
         """Reload texture"""     
-        old_texture = self.texture        
-        self.texture = texture
-        if old_texture and self.texture:
-            try:
-                sdl3.SDL_DestroyTexture(old_texture)
-            except Exception as e:
-                logger.error(f"Error destroying old texture: {e}")
+        self._swap_texture(texture)
             
         if self.texture:            
             self.rect.w = w
@@ -210,32 +366,29 @@ class Sprite:
         """Check if this sprite has an associated R2 asset"""
         return self.asset_id is not None
 
+    # Keys of to_dict, in order. snapshot() returns the values, so a save can build the dict later
+    SNAPSHOT_FIELDS = ('sprite_id', 'texture_path', 'coord_x', 'coord_y', 'scale_x', 'scale_y',
+                       'frect_w', 'frect_h', 'character', 'moving', 'speed', 'collidable', 'layer',
+                       'compendium_entity', 'entity_type', 'asset_id', 'visibility', 'rotation',
+                       'die_timer', 'is_player', 'visible')
+
+    def _texture_path_str(self) -> str:
+        if isinstance(self.texture_path, bytes):
+            return self.texture_path.decode('utf-8')
+        return self.texture_path
+
+    def snapshot(self) -> tuple:
+        """Current state as a tuple of plain values, safe to serialize on another thread"""
+        return (self.sprite_id, self._texture_path_str(), self.coord_x.value, self.coord_y.value,
+                self.scale_x, self.scale_y, self.original_w, self.original_h, self.character,
+                self.moving, self.speed, self.collidable, self.layer,
+                self.compendium_entity.to_dict() if self.compendium_entity else None,
+                self.entity_type, self.asset_id, self.visible, self.rotation, self.die_timer,
+                self.is_player, self.visible)
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert sprite to dictionary representation"""
-        return {
-            'sprite_id': self.sprite_id,
-            'texture_path': self.texture_path.decode('utf-8'),
-            'coord_x': self.coord_x.value,
-            'coord_y': self.coord_y.value,
-            'scale_x': self.scale_x,
-            'scale_y': self.scale_y,
-            'frect_w': self.original_w,
-            'frect_h': self.original_h,
-            'character': self.character,
-            'moving': self.moving,
-            'speed': self.speed,
-            'collidable': self.collidable,
-            'layer': self.layer,
-            'compendium_entity': self.compendium_entity.to_dict() if self.compendium_entity else None,
-            'entity_type': self.entity_type,
-            'asset_id': self.asset_id,
-            'visibility': self.visible,
-            'rotation': self.rotation,
-            'die_timer': self.die_timer,
-            'asset_id': self.asset_id,
-            'is_player': self.is_player,
-            'visible': self.visible
-        }
+        return dict(zip(self.SNAPSHOT_FIELDS, self.snapshot()))
 
 class AnimatedSprite(Sprite):
     """A sprite that supports animation with frames."""
@@ -253,11 +406,14 @@ class AnimatedSprite(Sprite):
         super().__init__(renderer, sheet_path, scale_x=scale_x, scale_y=scale_y, is_player=is_player, **kwargs)
         self.sheet_path = sheet_path
         self.frame_rects = frame_rects  # List of rectangles for each frame
-        self.frame_duration = frame_duration
-        self.current_frame = 0
-        self.last_frame_time = int(time.time() * 1000)  # ms
+        self._frame_duration = frame_duration
         self.sheet_texture = None  # Will be loaded externally or via set_texture
         self.atlas_path = atlas_path
+        self.atlas: Optional[AtlasFrames] = None
+        self.frame_frects: tuple = ()
+        self._clock_slot: int = animation_clock.register(frame_duration, 1)
+        # Release the clock slot when the sprite is garbage collected
+        self._clock_finalizer = weakref.finalize(self, animation_clock.unregister, self._clock_slot)
         if atlas_path:
             self.init_animation()
             # Set frect size from first frame if available
@@ -269,48 +425,40 @@ class AnimatedSprite(Sprite):
 
 
     def init_animation(self):
-        """Init sprite atlas"""
-        #TODO - integrate with storage manager
-        with open(self.atlas_path, 'r') as f:
-            atlas = json.load(f)
-        frames = atlas['frames']
-        frame_frects = []      
-      
-        def frame_sort_key(key):
-            match = re.search(r'(\d+)\.png$', key)
-            return int(match.group(1)) if match else 0
-
-        for key in sorted(frames.keys(), key=frame_sort_key):
-            frame = frames[key]['frame']
-            print(f"Loading frame {key}: {frame} with {frame['w']}x{frame['h']} and x y {frame['x']} {frame['y']}")
-            frect = sdl3.SDL_FRect()
-            frect.x = frame['x']
-            frect.y = frame['y']
-            frect.w = frame['w'] 
-            frect.h = frame['h']
-            frect.original_w = float(frect.w)
-            frect.original_h = float(frect.h)
-            frame_frects.append(frect)
-        
-        self.frame_frects = frame_frects
+        """Init sprite atlas from the shared atlas cache"""
+        self.atlas = load_atlas_frames(self.atlas_path)
+        self.frame_frects = self.atlas.frects
+        animation_clock.set_animation(self._clock_slot, self._frame_duration, len(self.frame_frects))
+
+    @property
+    def frame_duration(self) -> float:
+        return self._frame_duration
+
+    @frame_duration.setter
+    def frame_duration(self, value: float) -> None:
+        self._frame_duration = value
+        animation_clock.set_animation(self._clock_slot, value, len(self.frame_frects))
+
+    @property
+    def current_frame(self) -> int:
+        return animation_clock.get_frame(self._clock_slot)
+
+    @current_frame.setter
+    def current_frame(self, value: int) -> None:
+        animation_clock.set_frame(self._clock_slot, value)
+
+    @property
+    def last_frame_time(self) -> float:
+        """Clock time (ms) when the current frame started"""
+        return animation_clock.now - animation_clock.get_elapsed(self._clock_slot)
 
     def update_animation(self):
-        """Update the current frame based on elapsed time."""
-        now = int(time.time() * 1000)        
-        if now - self.last_frame_time > self.frame_duration:
-           
-            self.current_frame = (self.current_frame + 1) % len(self.frame_frects)
-            self.last_frame_time = now
+        """Frames are advanced by the shared animation_clock, nothing to do per sprite."""
+        pass
 
     def reload_texture(self, texture: Any, w: int, h: int)-> bool:  # texture: SDL_Texture
         """Reload texture for animated sprite"""     
-        old_texture = self.texture        
-        self.texture = texture
-        if old_texture and self.texture:
-            try:
-                sdl3.SDL_DestroyTexture(old_texture)
-            except Exception as e:
-                logger.error(f"Error destroying old texture: {e}")        
+        self._swap_texture(texture)
 
         w = int(self.frame_frects[0].w)
         h = int(self.frame_frects[0].h)
@@ -323,39 +471,18 @@ class AnimatedSprite(Sprite):
             self.original_h = float(h)
         return True
 
+    SNAPSHOT_FIELDS = Sprite.SNAPSHOT_FIELDS[:-2] + (
+        'sheet_path', 'frame_rects', 'frame_duration', 'current_frame', 'last_frame_time',
+        'sheet_texture', 'atlas_path', 'is_player', 'visible')
+
+    def snapshot(self) -> tuple:
+        return Sprite.snapshot(self)[:-2] + (
+            self.sheet_path, list(self.frame_rects), self.frame_duration, self.current_frame,
+            self.last_frame_time, self.sheet_texture, self.atlas_path, self.is_player, self.visible)
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert animated sprite to dictionary representation"""
-        return {
-            'sprite_id': self.sprite_id,
-            'texture_path': self.texture_path.decode('utf-8'),
-            'coord_x': self.coord_x.value,
-            'coord_y': self.coord_y.value,
-            'scale_x': self.scale_x,
-            'scale_y': self.scale_y,
-            'frect_w': self.original_w,
-            'frect_h': self.original_h,
-            'character': self.character,
-            'moving': self.moving,
-            'speed': self.speed,
-            'collidable': self.collidable,
-            'layer': self.layer,
-            'compendium_entity': self.compendium_entity.to_dict() if self.compendium_entity else None,
-            'entity_type': self.entity_type,
-            'asset_id': self.asset_id,
-            'visibility': self.visible,
-            'rotation': self.rotation,
-            'die_timer': self.die_timer,
-            'asset_id': self.asset_id,
-            'sheet_path': self.sheet_path,
-            'frame_rects': self.frame_rects,
-            'frame_duration': self.frame_duration,
-            'current_frame': self.current_frame,
-            'last_frame_time': self.last_frame_time,
-            'sheet_texture': self.sheet_texture,
-            'atlas_path': self.atlas_path,
-            'is_player': self.is_player,
-            'visible': self.visible
-        }
+        return dict(zip(self.SNAPSHOT_FIELDS, self.snapshot()))
 
     def get_current_frame_frect(self):        
         return self.frame_frects[self.current_frame]
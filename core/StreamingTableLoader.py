@@ -0,0 +1,235 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set, Union, TYPE_CHECKING
+from storage.json_stream import iter_json_file
+from tools.logger import setup_logger
+import tools.settings as settings
+
+if TYPE_CHECKING:
+    from core.ContextTable import ContextTable
+    from core.Sprite import Sprite
+
+logger = setup_logger(__name__, level='WARNING')
+
+STREAM_BATCH_SIZE = 256     # Sprite dicts handed to the main thread at once
+STREAM_QUEUE_BATCHES = 16   # Parsed batches waiting, bounds memory when the main thread is behind
+STREAM_PUT_TIMEOUT = 0.1    # Worker rechecks cancellation this often while the queue is full
+
+
+@dataclass
+class StreamingLoad:
+    """One table file being streamed in"""
+    path: Path
+    events: queue.Queue = field(default_factory=lambda: queue.Queue(maxsize=STREAM_QUEUE_BATCHES))
+    cancelled: threading.Event = field(default_factory=threading.Event)
+    future: Optional[Future] = None
+    table: Optional['ContextTable'] = None
+    header: Dict[str, Any] = field(default_factory=dict)
+    batch: List[tuple] = field(default_factory=list)  # Entries of the current batch not added yet
+    player_sprites: List['Sprite'] = field(default_factory=list)
+    started: float = field(default_factory=time.perf_counter)
+    first_sprite_ms: Optional[float] = None
+    sprites: int = 0
+    skipped: int = 0
+    texture_loads: int = 0
+
+
+class StreamingTableLoader:
+    """Loads large table files over several frames.
+
+    A worker thread parses the file incrementally (storage.json_stream) and
+    hands batches of sprite dicts to the main thread through a bounded queue,
+    so neither the file text nor the whole decoded document is held in memory.
+    update() creates the table from the header and adds sprites within
+    budget_ms per frame, binding textures for each frame's sprites grouped by
+    asset. The table is shown as soon as it exists and fills in as it loads.
+    Tables that are still loading, or whose load failed or was cancelled, are
+    incomplete and TableAutosave never writes them over their file.
+    """
+
+    def __init__(self, context, budget_ms: float = settings.STREAM_LOAD_BUDGET_MS):
+        self.context = context
+        self.budget_ms = budget_ms
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="table-stream")
+        self._loads: List[StreamingLoad] = []  # Active load first, the rest wait for it
+        self.last_load: Dict[str, Any] = {}
+        self._incomplete: Set[str] = set()  # IDs of tables missing sprites of their file
+        self.stats: Dict[str, Any] = {
+            'loads': 0,
+            'failed': 0,
+            'sprites': 0,
+        }
+
+    def load(self, file_path: Union[str, Path]) -> StreamingLoad:
+        """Start streaming a table file, loads run one after another"""
+        load = StreamingLoad(Path(file_path))
+        self._loads.append(load)
+        if len(self._loads) == 1:
+            self._start(load)
+        return load
+
+    def is_loading(self) -> bool:
+        return bool(self._loads)
+
+    def is_incomplete(self, table: 'ContextTable') -> bool:
+        """Table is (partially) streamed from a file that has more sprites than it"""
+        return table.table_id in self._incomplete
+
+    def cancel(self) -> None:
+        """Stop all loads, sprites already added stay on their table"""
+        for load in self._loads:
+            load.cancelled.set()
+        self._loads.clear()
+
+    def _start(self, load: StreamingLoad) -> None:
+        load.started = time.perf_counter()
+        load.future = self._executor.submit(self._parse, load)
+
+    def _put(self, load: StreamingLoad, item: tuple) -> bool:
+        while not load.cancelled.is_set():
+            try:
+                load.events.put(item, timeout=STREAM_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _parse(self, load: StreamingLoad) -> None:
+        """Worker thread: parse the file into header and sprite batch events"""
+        batch = []
+        try:
+            for event in iter_json_file(load.path, 'layers', nested=True):
+                if event[0] == 'header':
+                    if batch and not self._put(load, ('sprites', batch)):
+                        return
+                    batch = []
+                    if not self._put(load, event):
+                        return
+                    continue
+                _, layer, _, sprite_data = event
+                batch.append((layer, sprite_data))
+                if len(batch) >= STREAM_BATCH_SIZE:
+                    if not self._put(load, ('sprites', batch)):
+                        return
+                    batch = []
+            if batch and not self._put(load, ('sprites', batch)):
+                return
+            self._put(load, ('done', None))
+        except Exception as e:
+            self._put(load, ('error', str(e)))
+
+    def update(self) -> None:
+        """Add parsed sprites of the active load within the frame budget, call once per frame"""
+        if not self._loads:
+            return
+        load = self._loads[0]
+        deadline = time.perf_counter() + self.budget_ms / 1000.0
+        groups: Dict[str, List['Sprite']] = {}  # asset_id or texture path -> sprites added this frame
+        finished = False
+        while True:
+            if load.batch:
+                self._add_sprites(load, groups, deadline)
+                if load.batch:
+                    break  # Out of time
+            if time.perf_counter() >= deadline:
+                break
+            try:
+                kind, payload = load.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'header':
+                self._apply_header(load, payload)
+            elif kind == 'sprites':
+                load.batch = payload
+            elif kind == 'done':
+                finished = True
+                break
+            else:
+                self._fail(load, payload)
+                return
+        if groups:
+            load.texture_loads += self.context._bind_sprite_textures(groups)
+        if finished:
+            self._finish(load)
+
+    def _apply_header(self, load: StreamingLoad, header: Dict[str, Any]) -> None:
+        load.header.update(header)
+        if load.table is not None:
+            return
+        table = self.context._table_from_header(load.header)
+        load.table = table
+        self._incomplete.add(table.table_id)
+        self.context._register_table(table)
+        self.context.current_table = table
+
+    def _add_sprites(self, load: StreamingLoad, groups: Dict[str, List['Sprite']], deadline: float) -> None:
+        table = load.table
+        if table is None:  # Layers before any other key, start with default properties
+            self._apply_header(load, {})
+            table = load.table
+        index = 0
+        for layer, sprite_data in load.batch:
+            index += 1
+            sprite_layer = self.context._sprite_layer(table, layer, sprite_data) if layer in table.layers else None
+            sprite = self.context._add_sprite_from_dict(table, sprite_layer, sprite_data) if sprite_layer else None
+            if sprite is None:
+                load.skipped += 1
+            else:
+                load.sprites += 1
+                if load.first_sprite_ms is None:
+                    load.first_sprite_ms = (time.perf_counter() - load.started) * 1000
+                if sprite.is_player:
+                    load.player_sprites.append(sprite)
+                groups.setdefault(sprite.asset_id or sprite_data['texture_path'], []).append(sprite)
+            if time.perf_counter() >= deadline:
+                break
+        del load.batch[:index]
+
+    def _finish(self, load: StreamingLoad) -> None:
+        self._loads.pop(0)
+        table = load.table
+        if table is None:
+            self._apply_header(load, {})
+            table = load.table
+        if 'player' in load.header:
+            self.context._attach_player(table, load.header.get('player') or {}, load.player_sprites)
+        self._incomplete.discard(table.table_id)
+        autosave = getattr(self.context, 'TableAutosave', None)
+        if autosave:
+            autosave.mark_saved(table)
+        self.stats['loads'] += 1
+        self.stats['sprites'] += load.sprites
+        self.last_load = {
+            'table': table.name,
+            'sprites': load.sprites,
+            'skipped': load.skipped,
+            'texture_loads': load.texture_loads,
+            'first_sprite_ms': load.first_sprite_ms,
+            'total_ms': (time.perf_counter() - load.started) * 1000,
+        }
+        logger.info(f"Streamed table '{table.name}' from {load.path}: {self.last_load}")
+        self._start_next()
+
+    def _fail(self, load: StreamingLoad, error: str) -> None:
+        self._loads.pop(0)
+        self.stats['failed'] += 1
+        logger.error(f"Failed to stream table from {load.path} after {load.sprites} sprites: {error}")
+        self._start_next()
+
+    def _start_next(self) -> None:
+        if self._loads:
+            self._start(self._loads[0])
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {**self.stats, 'queued': len(self._loads)}
+        if self._loads:
+            stats['loading_sprites'] = self._loads[0].sprites
+        return stats
+
+    def close(self) -> None:
+        self.cancel()
+        self._executor.shutdown(wait=False)
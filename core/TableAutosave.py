@@ -0,0 +1,77 @@
+import time
+from typing import Dict, Any, Optional, Tuple, TYPE_CHECKING
+from tools.logger import setup_logger
+import tools.settings as settings
+
+if TYPE_CHECKING:
+    from core.ContextTable import ContextTable
+
+logger = setup_logger(__name__, level='WARNING')
+
+
+class TableAutosave:
+    """Saves tables in the background when they changed.
+
+    Every interval_seconds each table whose revision moved since its last
+    successful save is saved through Actions.save_table: the snapshot is taken
+    on the main thread, serialized and written atomically on the storage pool.
+    A table is not saved again while its previous save is still in flight,
+    tables StreamingTableLoader has not fully loaded are never saved.
+    """
+
+    def __init__(self, context, interval_seconds: float = settings.AUTOSAVE_INTERVAL_SECONDS):
+        self.context = context
+        self.interval_seconds = interval_seconds
+        self._saved_revisions: Dict[str, int] = {}  # table_id -> revision on disk
+        self._in_flight: Dict[str, Tuple[str, int]] = {}  # operation ID -> (table_id, revision)
+        self._last_run = time.monotonic()
+        self.stats: Dict[str, Any] = {
+            'saves': 0,
+            'skipped_unchanged': 0,
+            'failed': 0,
+        }
+
+    def is_dirty(self, table: 'ContextTable') -> bool:
+        return self._saved_revisions.get(table.table_id) != table.revision
+
+    def mark_saved(self, table: 'ContextTable') -> None:
+        """Table matches its file, e.g. right after loading it"""
+        self._saved_revisions[table.table_id] = table.revision
+
+    def track_save(self, operation_id: str, table: 'ContextTable') -> None:
+        """Save of table started with the snapshot taken at its current revision"""
+        self._in_flight[operation_id] = (table.table_id, table.revision)
+
+    def on_save_finished(self, operation_id: str, success: bool) -> None:
+        entry = self._in_flight.pop(operation_id, None)
+        if entry is None:
+            return
+        table_id, revision = entry
+        if success:
+            self._saved_revisions[table_id] = revision
+            self.stats['saves'] += 1
+        else:
+            self.stats['failed'] += 1
+
+    def update(self, now: Optional[float] = None) -> None:
+        """Save changed tables when the interval has passed, call once per frame"""
+        if self.interval_seconds <= 0:
+            return
+        now = time.monotonic() if now is None else now
+        if now - self._last_run < self.interval_seconds:
+            return
+        self._last_run = now
+        saving = {table_id for table_id, _ in self._in_flight.values()}
+        loader = getattr(self.context, 'StreamingTableLoader', None)
+        for table in list(getattr(self.context, 'list_of_tables', [])):
+            if table.table_id in saving or (loader and loader.is_incomplete(table)):
+                continue
+            if not self.is_dirty(table):
+                self.stats['skipped_unchanged'] += 1
+                continue
+            result = self.context.Actions.save_table(table.table_id, table.name)
+            if not result.success:
+                logger.error(f"Autosave of table {table.name} failed: {result.message}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'in_flight': len(self._in_flight)}
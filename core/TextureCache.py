@@ -0,0 +1,142 @@
+import ctypes
+import time
+import sdl3
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Dict, Any
+from tools.logger import setup_logger
+import tools.settings as settings
+
+logger = setup_logger(__name__, level='WARNING')
+
+BYTES_PER_PIXEL = 4  # Textures are uploaded from RGBA32 surfaces
+
+
+@dataclass
+class TextureEntry:
+    key: str
+    texture: Any  # SDL_Texture
+    width: int
+    height: int
+    byte_size: int
+    refcount: int = 0
+    last_used: float = 0.0
+
+
+def texture_address(texture: Any) -> Optional[int]:
+    """Stable identity of an SDL_Texture pointer"""
+    if not texture:
+        return None
+    return ctypes.cast(texture, ctypes.c_void_p).value
+
+
+class TextureCache:
+    """Textures keyed by content hash with sprite reference counting.
+
+    Sprites retain the texture they draw and release it when they switch texture
+    or are cleaned up. Unreferenced textures stay cached for reuse and are
+    destroyed least recently used first once total bytes exceed the budget.
+    Only the cache destroys textures it owns.
+    """
+
+    def __init__(self, budget_bytes: int = settings.MAX_TEXTURE_CACHE_SIZE_MB * 1024 * 1024):
+        self.budget_bytes = budget_bytes
+        self.total_bytes = 0
+        self._entries: OrderedDict = OrderedDict()  # key -> TextureEntry, LRU order
+        self._by_address: Dict[int, TextureEntry] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'evicted_bytes': 0}
+
+    def get(self, key: str) -> Optional[Any]:
+        """Texture for content hash or None, marks it recently used"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        entry.last_used = time.monotonic()
+        self._entries.move_to_end(key)
+        return entry.texture
+
+    def get_entry(self, key: str) -> Optional[TextureEntry]:
+        return self._entries.get(key)
+
+    def add(self, key: str, texture: Any, width: int, height: int) -> Any:
+        """Take ownership of a texture. If key is already cached the new texture is
+        destroyed and the cached one returned."""
+        existing = self._entries.get(key)
+        if existing is not None:
+            if texture_address(existing.texture) != texture_address(texture):
+                sdl3.SDL_DestroyTexture(texture)
+            self._entries.move_to_end(key)
+            return existing.texture
+        entry = TextureEntry(key, texture, width, height, width * height * BYTES_PER_PIXEL,
+                             last_used=time.monotonic())
+        self._entries[key] = entry
+        self._by_address[texture_address(texture)] = entry
+        self.total_bytes += entry.byte_size
+        # The caller has not retained the new texture yet, it must survive this pass
+        self.evict(keep=key)
+        return texture
+
+    def retain(self, texture: Any) -> None:
+        entry = self._by_address.get(texture_address(texture))
+        if entry is not None:
+            entry.refcount += 1
+            entry.last_used = time.monotonic()
+            self._entries.move_to_end(entry.key)
+
+    def release(self, texture: Any) -> None:
+        entry = self._by_address.get(texture_address(texture))
+        if entry is None:
+            return
+        entry.refcount = max(entry.refcount - 1, 0)
+        if entry.refcount == 0 and self.total_bytes > self.budget_bytes:
+            self.evict()
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Destroy unreferenced textures except keep, oldest first, until under budget. Returns freed bytes"""
+        freed = 0
+        if self.total_bytes <= self.budget_bytes:
+            return freed
+        for key in list(self._entries.keys()):
+            if self.total_bytes <= self.budget_bytes:
+                break
+            entry = self._entries[key]
+            if entry.refcount > 0 or key == keep:
+                continue
+            self._remove(entry)
+            freed += entry.byte_size
+        if freed:
+            logger.info(f"Evicted {freed} bytes of textures, cache now {self.total_bytes} bytes")
+        elif self.total_bytes > self.budget_bytes:
+            logger.debug(f"Texture cache over budget ({self.total_bytes} bytes) but all textures are in use")
+        return freed
+
+    def _remove(self, entry: TextureEntry) -> None:
+        del self._entries[entry.key]
+        self._by_address.pop(texture_address(entry.texture), None)
+        self.total_bytes -= entry.byte_size
+        self.stats['evictions'] += 1
+        self.stats['evicted_bytes'] += entry.byte_size
+        try:
+            sdl3.SDL_DestroyTexture(entry.texture)
+        except Exception as e:
+            logger.error(f"Error destroying texture {entry.key}: {e}")
+
+    def clear(self) -> None:
+        """Destroy all textures, call on shutdown when no sprite will draw again"""
+        for entry in list(self._entries.values()):
+            self._remove(entry)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'textures': len(self._entries),
+            'referenced': sum(1 for entry in self._entries.values() if entry.refcount > 0),
+            'total_bytes': self.total_bytes,
+            'budget_bytes': self.budget_bytes,
+            **self.stats,
+        }
+
+
+# Shared cache, sprites retain/release through it
+texture_cache = TextureCache()
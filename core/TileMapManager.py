@@ -8,6 +8,7 @@ from typing import Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass, asdict
 import sdl3
 import ctypes
+from storage.json_stream import iter_json_file
 from tools.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -213,10 +214,16 @@ class TileMapManager:
             return False
     
     def load_map(self, filepath: str) -> bool:
-        """Load map from JSON file"""
+        """Load map from JSON file, tiles are parsed one at a time"""
         try:
-            with open(filepath, 'r') as f:
-                map_data = json.load(f)
+            map_data = {}
+            tiles = {}
+            for event in iter_json_file(filepath, "tiles"):
+                if event[0] == 'header':
+                    map_data.update(event[1])
+                else:
+                    _, _, key, tile_data = event
+                    tiles[key] = PlacedTile(**tile_data)
             
             # Create new map from data
             self.current_map = TileMap(
@@ -224,14 +231,9 @@ class TileMapManager:
                 grid_size=map_data["grid_size"],
                 width=map_data["width"],
                 height=map_data["height"],
-                tiles={}
+                tiles=tiles
             )
             
-            # Load tiles
-            for key, tile_data in map_data["tiles"].items():
-                placed_tile = PlacedTile(**tile_data)
-                self.current_map.tiles[key] = placed_tile
-            
             logger.info(f"Loaded tile map from: {filepath} ({len(self.current_map.tiles)} tiles)")
             return True
             
@@ -0,0 +1,111 @@
+import heapq
+import itertools
+import time
+from typing import Dict, Any, List, Optional
+from tools.logger import setup_logger
+import tools.settings as settings
+
+logger = setup_logger(__name__, level='WARNING')
+
+PRIORITY_VISIBLE = 0     # Textures for sprites currently on screen
+PRIORITY_NORMAL = 1      # Other sprite textures, table loads, saves, errors
+PRIORITY_BACKGROUND = 2  # Downloads, uploads, listings, prefetch
+PRIORITY_IDLE = 3        # Speculative work, only when nothing else waits
+STATS_HISTORY = 60
+
+
+def is_sprite_on_screen(sprite, table) -> bool:
+    """Visible sprite overlapping the table screen area (everything counts if no area set)"""
+    if not getattr(sprite, 'visible', False):
+        return False
+    screen_area = getattr(table, 'screen_area', None)
+    if not screen_area:
+        return True
+    x, y, w, h = screen_area
+    frect = sprite.frect
+    return frect.x < x + w and frect.x + frect.w > x and frect.y < y + h and frect.y + frect.h > y
+
+
+class WorkScheduler:
+    """Main thread scheduler for completed I/O operations.
+
+    Completions from ClientAssetManager are queued by priority and dispatched to
+    Actions until the per-frame millisecond budget is spent, the rest is carried
+    over to next frame. At least one operation runs per frame so nothing starves.
+    """
+
+    def __init__(self, context, budget_ms: float = settings.COMPLETION_BUDGET_MS):
+        self.context = context
+        self.budget_ms = budget_ms
+        self._queue: List[tuple] = []
+        self._counter = itertools.count()
+        self._frame_times: List[float] = []
+        self.stats: Dict[str, Any] = {
+            'depth': 0,
+            'oldest_age_ms': 0.0,
+            'processed': 0,
+            'last_ms': 0.0,
+            'avg_ms': 0.0,
+            'total_processed': 0,
+        }
+
+    def classify(self, operation: Dict[str, Any]) -> int:
+        """Pick priority for a completed operation"""
+        if operation.get('source') == 'download' or operation.get('type') in ('upload', 'upload_progress', 'list', 'prefetch'):
+            return PRIORITY_BACKGROUND
+        asset_manager = getattr(self.context, 'AssetManager', None)
+        sprite = asset_manager.dict_of_sprites.get(operation.get('operation_id')) if asset_manager else None
+        if sprite is not None and is_sprite_on_screen(sprite, getattr(self.context, 'current_table', None)):
+            return PRIORITY_VISIBLE
+        return PRIORITY_NORMAL
+
+    def submit(self, operations: List[Dict[str, Any]], priority: Optional[int] = None) -> None:
+        now = time.perf_counter()
+        for operation in operations:
+            op_priority = self.classify(operation) if priority is None else priority
+            heapq.heappush(self._queue, (op_priority, next(self._counter), now, operation))
+
+    def process(self) -> int:
+        """Dispatch queued operations within the frame budget. Returns number processed"""
+        start = time.perf_counter()
+        deadline = start + self.budget_ms / 1000.0
+        processed = 0
+        actions = getattr(self.context, 'Actions', None)
+        while self._queue and actions:
+            if processed and time.perf_counter() >= deadline:
+                break
+            _, _, _, operation = heapq.heappop(self._queue)
+            try:
+                if operation.get('success', False):
+                    actions.handle_completed_operation(operation)
+                else:
+                    actions.handle_operation_error(operation)
+            except Exception as e:
+                logger.error(f"Error dispatching operation {operation.get('operation_id')}: {e}")
+            processed += 1
+        self._record(start, processed)
+        return processed
+
+    def _record(self, start: float, processed: int) -> None:
+        now = time.perf_counter()
+        elapsed_ms = (now - start) * 1000
+        self._frame_times.append(elapsed_ms)
+        if len(self._frame_times) > STATS_HISTORY:
+            self._frame_times.pop(0)
+        self.stats['depth'] = len(self._queue)
+        self.stats['oldest_age_ms'] = (now - min(item[2] for item in self._queue)) * 1000 if self._queue else 0.0
+        self.stats['processed'] = processed
+        self.stats['last_ms'] = elapsed_ms
+        self.stats['avg_ms'] = sum(self._frame_times) / len(self._frame_times)
+        self.stats['total_processed'] += processed
+        if self._queue and processed:
+            logger.debug(f"Completion budget spent, {len(self._queue)} operations carried over")
+
+    def get_depth_by_priority(self) -> Dict[int, int]:
+        depth = {PRIORITY_VISIBLE: 0, PRIORITY_NORMAL: 0, PRIORITY_BACKGROUND: 0}
+        for item in self._queue:
+            depth[item[0]] = depth.get(item[0], 0) + 1
+        return depth
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
@@ -36,6 +36,11 @@ def handle_mouse_motion(cnt, event):
         if drag_distance > 5:
             cnt.grabing = True
             cnt._potential_drag = False
+            sprite = cnt.current_table.selected_sprite if cnt.current_table else None
+            if sprite is not None:
+                # Position before the drag, recorded as one move on mouse up
+                sprite._drag_start_x = sprite.coord_x.value
+                sprite._drag_start_y = sprite.coord_y.value
             logger.debug(f"Started dragging sprite after moving {drag_distance:.1f} pixels")
     
     if cnt.grabing:
@@ -322,8 +327,26 @@ def handle_rotate_end(cnt, sprite):
         #     logger.error(f"Error syncing rotation via MovementManager: {e}")
     
     cnt.rotating = False
+    if sprite and cnt.current_table:
+        cnt.current_table.mark_sprite_changed(sprite)
     logger.debug(f"Rotation ended for sprite at angle {getattr(sprite, 'rotation', 0.0)}")
 
+def handle_drag_end(cnt, sprite):
+    """Record a finished drag as one undoable move from the drag start to the final position"""
+    if not hasattr(sprite, '_drag_start_x') or not getattr(cnt, 'Actions', None):
+        return
+    final_pos = (sprite.coord_x.value, sprite.coord_y.value)
+    start_pos = (sprite._drag_start_x, sprite._drag_start_y)
+    if final_pos == start_pos:
+        return
+    # Motion events moved the sprite directly, put it back so the action sees the drag start as old position
+    sprite.coord_x.value, sprite.coord_y.value = start_pos
+    table_id = cnt.current_table.table_id if hasattr(cnt.current_table, 'table_id') else cnt.current_table.name
+    result = cnt.Actions.move_sprite(table_id, sprite.sprite_id, Position(*final_pos))
+    if not result.success:
+        sprite.coord_x.value, sprite.coord_y.value = final_pos
+        logger.error(f"Failed to record sprite drag: {result.message}")
+
 # Fix the handle_mouse_button_down function:
 
 def handle_mouse_button_down(cnt, event):
@@ -487,64 +510,59 @@ def handle_mouse_button_down(cnt, event):
         if cnt.current_table and hasattr(cnt, 'selected_layer'):            
             # Only check sprites on the currently selected layer
             selected_layer = getattr(cnt, 'selected_layer', 'tokens')
-            print('selected layer:', selected_layer, )
             if selected_layer in cnt.current_table.dict_of_sprites_list:
-                print('table:', cnt.current_table.table_name, )
-                sprites = cnt.current_table.dict_of_sprites_list[selected_layer]
-                print('sprites:', [sprite.sprite_id for sprite in sprites])
-                for sprite in sprites:
-                    if sdl3.SDL_PointInRectFloat(ctypes.byref(point), ctypes.byref(sprite.frect)):
-                        # Select sprite but don't start grabbing yet
-                        cnt.current_table.selected_sprite = sprite
-                        clicked_on_sprite = True
+                table_x, table_y = cnt.current_table.screen_to_table(point.x, point.y)
+                sprite = cnt.current_table.sprite_at(table_x, table_y, layers=[selected_layer])
+                if sprite is not None:
+                    # Select sprite but don't start grabbing yet
+                    cnt.current_table.selected_sprite = sprite
+                    clicked_on_sprite = True
+                    
+                    # Store click position for drag detection
+                    cnt._click_start_x = event.button.x
+                    cnt._click_start_y = event.button.y
+                    cnt._potential_drag = True
+                    cnt.grabing = False  # Don't start grabbing immediately
+                    
+                    logger.debug(f"Sprite selected from layer '{selected_layer}': {sprite}")
+                    
+                    # Notify actions bridge about sprite selection for character panel
+                    sprite_id = getattr(sprite, 'sprite_id', getattr(sprite, 'name', None))
+                    if sprite_id:
+                        # Try multiple ways to notify the character panel
+                        notified = False
                         
-                        # Store click position for drag detection
-                        cnt._click_start_x = event.button.x
-                        cnt._click_start_y = event.button.y
-                        cnt._potential_drag = True
-                        cnt.grabing = False  # Don't start grabbing immediately
+                        # Method 1: Through Actions bridge
+                        if hasattr(cnt, 'Actions') and cnt.Actions and hasattr(cnt.Actions, 'actions_bridge'):
+                            try:
+                                cnt.Actions.actions_bridge.on_entity_selected(sprite_id)
+                                logger.debug(f"Notified actions bridge of sprite selection: {sprite_id}")
+                                notified = True
+                            except Exception as e:
+                                logger.error(f"Failed to notify via actions bridge: {e}")
                         
-                        logger.debug(f"Sprite selected from layer '{selected_layer}': {sprite}")
+                        # Method 2: Through GUI system directly
+                        if hasattr(cnt, 'imgui') and cnt.imgui and hasattr(cnt.imgui, 'actions_bridge'):
+                            try:
+                                cnt.imgui.actions_bridge.on_entity_selected(sprite_id)
+                                logger.debug(f"Notified GUI actions bridge of sprite selection: {sprite_id}")
+                                notified = True
+                            except Exception as e:
+                                logger.error(f"Failed to notify via GUI actions bridge: {e}")
                         
-                        # Notify actions bridge about sprite selection for character panel
-                        sprite_id = getattr(sprite, 'sprite_id', getattr(sprite, 'name', None))
-                        if sprite_id:
-                            # Try multiple ways to notify the character panel
-                            notified = False
-                            
-                            # Method 1: Through Actions bridge
-                            if hasattr(cnt, 'Actions') and cnt.Actions and hasattr(cnt.Actions, 'actions_bridge'):
-                                try:
-                                    cnt.Actions.actions_bridge.on_entity_selected(sprite_id)
-                                    logger.debug(f"Notified actions bridge of sprite selection: {sprite_id}")
-                                    notified = True
-                                except Exception as e:
-                                    logger.error(f"Failed to notify via actions bridge: {e}")
-                            
-                            # Method 2: Through GUI system directly
-                            if hasattr(cnt, 'imgui') and cnt.imgui and hasattr(cnt.imgui, 'actions_bridge'):
-                                try:
-                                    cnt.imgui.actions_bridge.on_entity_selected(sprite_id)
-                                    logger.debug(f"Notified GUI actions bridge of sprite selection: {sprite_id}")
+                        # Method 3: Through context if available
+                        if not notified and hasattr(cnt, 'gui') and cnt.gui:
+                            try:
+                                if hasattr(cnt.gui, 'actions_bridge'):
+                                    cnt.gui.actions_bridge.on_entity_selected(sprite_id)
+                                    logger.debug(f"Notified context GUI actions bridge of sprite selection: {sprite_id}")
                                     notified = True
-                                except Exception as e:
-                                    logger.error(f"Failed to notify via GUI actions bridge: {e}")
-                            
-                            # Method 3: Through context if available
-                            if not notified and hasattr(cnt, 'gui') and cnt.gui:
-                                try:
-                                    if hasattr(cnt.gui, 'actions_bridge'):
-                                        cnt.gui.actions_bridge.on_entity_selected(sprite_id)
-                                        logger.debug(f"Notified context GUI actions bridge of sprite selection: {sprite_id}")
-                                        notified = True
-                                except Exception as e:
-                                    logger.error(f"Failed to notify via context GUI actions bridge: {e}")
-                            
-                            if not notified:
-                                logger.warning(f"Could not find any actions bridge to notify of sprite selection: {sprite_id}")
-                                logger.debug(f"Available context attributes: {[attr for attr in dir(cnt) if not attr.startswith('_')]}")
+                            except Exception as e:
+                                logger.error(f"Failed to notify via context GUI actions bridge: {e}")
                         
-                        break
+                        if not notified:
+                            logger.warning(f"Could not find any actions bridge to notify of sprite selection: {sprite_id}")
+                            logger.debug(f"Available context attributes: {[attr for attr in dir(cnt) if not attr.startswith('_')]}")
         
         # If we didn't click on a sprite and we're not resizing, start moving the table
         if not clicked_on_sprite and not cnt.resizing:
@@ -564,12 +582,10 @@ def handle_mouse_button_down(cnt, event):
             # Only check sprites on the currently selected layer
             selected_layer = getattr(cnt, 'selected_layer', 'tokens')
             if selected_layer in cnt.current_table.dict_of_sprites_list:
-                sprites = cnt.current_table.dict_of_sprites_list[selected_layer]
-                for sprite in sprites:
-                    if sdl3.SDL_PointInRectFloat(ctypes.byref(point), ctypes.byref(sprite.frect)):
-                        clicked_sprite = sprite
-                        logger.debug(f"Right-clicked sprite from layer '{selected_layer}'")
-                        break
+                table_x, table_y = cnt.current_table.screen_to_table(point.x, point.y)
+                clicked_sprite = cnt.current_table.sprite_at(table_x, table_y, layers=[selected_layer])
+                if clicked_sprite is not None:
+                    logger.debug(f"Right-clicked sprite from layer '{selected_layer}'")
         # Show context menu if we have a sprite and context menu system
         if clicked_sprite:
             try:
@@ -629,6 +645,11 @@ def handle_mouse_button_up(cnt, event):
             # Update last network position
             sprite._last_network_x = final_pos[0]
             sprite._last_network_y = final_pos[1]
+            cnt.current_table.mark_sprite_changed(sprite)
+            handle_drag_end(cnt, sprite)
+            # Send the coalesced drag now instead of on the next outbox tick
+            if getattr(cnt, 'MessageOutbox', None):
+                cnt.MessageOutbox.flush()
         
         # Clean up all stored interaction data
         if cnt.current_table and cnt.current_table.selected_sprite:
@@ -643,7 +664,8 @@ def handle_mouse_button_up(cnt, event):
             # Remove resize data
             for attr in ['_resize_start_scale_x', '_resize_start_scale_y', 
                         '_resize_start_mouse_x', '_resize_start_mouse_y',
-                        '_resize_start_coord_x', '_resize_start_coord_y']:
+                        '_resize_start_coord_x', '_resize_start_coord_y',
+                        '_drag_start_x', '_drag_start_y']:
                 if hasattr(sprite, attr):
                     delattr(sprite, attr)
         
@@ -674,6 +696,8 @@ def handle_resize_end(cnt, sprite):
     """Called when sprite resize operation ends"""
     logger.debug(f"Resize ended for sprite {sprite.name} at scale ({sprite.scale_x}, {sprite.scale_y})")
     cnt.resizing = False
+    if sprite and cnt.current_table:
+        cnt.current_table.mark_sprite_changed(sprite)
     if sprite and hasattr(cnt, 'protocol'):
         # Send scale update
         new_scale = (sprite.scale_x, sprite.scale_y)
@@ -728,10 +752,8 @@ def handle_key_event(cnt, key_code):
                 if clipboard_sys.handle_clipboard_copy(cnt):
                     # Delete the original sprite after copying
                     if cnt.current_table and cnt.current_table.selected_sprite:
-                        # Remove from all layers
-                        for layer_sprites in cnt.current_table.dict_of_sprites_list.values():
-                            if cnt.current_table.selected_sprite in layer_sprites:
-                                layer_sprites.remove(cnt.current_table.selected_sprite)
+                        # Remove from its layer
+                        cnt.current_table.remove_sprite_from_layer(cnt.current_table.selected_sprite)
                         cnt.current_table.selected_sprite = None
                         logger.info("Successfully cut selected sprite")
                     else:
@@ -759,15 +781,19 @@ def handle_key_event(cnt, key_code):
             # Update last network position
             sprite._last_network_x = final_pos[0]
             sprite._last_network_y = final_pos[1]
+            cnt.current_table.mark_sprite_changed(sprite)
         case sdl3.SDL_SCANCODE_UP:
             sprite = cnt.current_table.selected_sprite
             sprite.coord_y.value -= min(cnt.step.value, sprite.frect.h)
+            cnt.current_table.mark_sprite_changed(sprite)
         case sdl3.SDL_SCANCODE_LEFT:
             sprite = cnt.current_table.selected_sprite
             sprite.coord_x.value -= min(cnt.step.value, sprite.frect.w)
+            cnt.current_table.mark_sprite_changed(sprite)
         case sdl3.SDL_SCANCODE_DOWN:
             sprite = cnt.current_table.selected_sprite
             sprite.coord_y.value += min(cnt.step.value, sprite.frect.h)
+            cnt.current_table.mark_sprite_changed(sprite)
         case sdl3.SDL_SCANCODE_1:
             cnt.current_table.selected_sprite = cnt.current_table.dict_of_sprites_list['tokens'][0]
         case sdl3.SDL_SCANCODE_2:
@@ -899,10 +925,8 @@ def handle_event(cnt, event):
                     if clipboard_sys.handle_clipboard_copy(cnt):
                         # Delete the original sprite after copying
                         if cnt.current_table and cnt.current_table.selected_sprite:
-                            # Remove from all layers
-                            for layer_sprites in cnt.current_table.dict_of_sprites_list.values():
-                                if cnt.current_table.selected_sprite in layer_sprites:
-                                    layer_sprites.remove(cnt.current_table.selected_sprite)
+                            # Remove from its layer
+                            cnt.current_table.remove_sprite_from_layer(cnt.current_table.selected_sprite)
                             cnt.current_table.selected_sprite = None
                             logger.info("Successfully cut selected sprite (Ctrl+X)")
                         else:
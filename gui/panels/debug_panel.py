@@ -36,6 +36,12 @@ class DebugPanel:
         # Memory usage
         if self.show_memory:
             self._render_memory_section()
+
+        # Enemy AI scheduler
+        self._render_ai_section()
+
+        # Completed I/O backlog
+        self._render_io_queue_section()
             
         # Context information
         self._render_context_section()
@@ -88,6 +94,68 @@ class DebugPanel:
                 imgui.text("Memory info unavailable")
                 logger.warning(f"Failed to get memory info: {e}")
     
+    def _render_ai_section(self):
+        """Render enemy AI scheduler timing section"""
+        enemy_manager = getattr(self.context, 'EnemyManager', None)
+        scheduler = getattr(enemy_manager, 'scheduler', None)
+        if not scheduler:
+            return
+        if imgui.collapsing_header("Enemy AI"):
+            stats = scheduler.get_stats()
+            imgui.text(f"AI Time: {stats['last_ms']:.2f}ms (avg {stats['avg_ms']:.2f}ms, max {stats['max_ms']:.2f}ms)")
+            imgui.text(f"Budget: {scheduler.frame_budget_ms:.1f}ms")
+            imgui.text(f"Ticked: {stats['ticked']}  Deferred: {stats['deferred']}")
+            imgui.text(f"LOD full: {stats['full']}  reduced: {stats['reduced']}  dormant: {stats['dormant']}")
+
+    def _render_io_queue_section(self):
+        """Render completed I/O queue backlog section"""
+        scheduler = getattr(self.context, 'WorkScheduler', None)
+        if not scheduler:
+            return
+        if imgui.collapsing_header("I/O Queue"):
+            stats = scheduler.get_stats()
+            depth = scheduler.get_depth_by_priority()
+            imgui.text(f"Backlog: {stats['depth']} (oldest {stats['oldest_age_ms']:.0f}ms)")
+            imgui.text(f"Visible: {depth[0]}  Normal: {depth[1]}  Background: {depth[2]}")
+            imgui.text(f"Processed: {stats['processed']} in {stats['last_ms']:.2f}ms (budget {scheduler.budget_ms:.1f}ms)")
+            imgui.text(f"Total processed: {stats['total_processed']}")
+            asset_manager = getattr(self.context, 'AssetManager', None)
+            if asset_manager:
+                imgui.text(f"Pending texture uploads: {asset_manager.get_pending_upload_count()}")
+            download_scheduler = getattr(self.context, 'DownloadScheduler', None)
+            if download_scheduler:
+                downloads = download_scheduler.get_stats()
+                imgui.text(f"Downloads: {downloads['downloading']}/{downloads['concurrency']} active, "
+                           f"{downloads['queued']} queued, {downloads['awaiting_url']} awaiting URL")
+                imgui.text(f"Throughput: {downloads['throughput_bps'] / 1024:.0f} KB/s  "
+                           f"Coalesced: {downloads['coalesced']}")
+            prefetcher = getattr(self.context, 'AssetPrefetcher', None)
+            if prefetcher:
+                prefetch = prefetcher.get_stats()
+                imgui.text(f"Prefetch: {prefetch['tables']} tables, {prefetch['queued']} queued, "
+                           f"{prefetch['decodes']} decoded, {prefetch['downloads']} downloads")
+            outbox = getattr(self.context, 'MessageOutbox', None)
+            if outbox:
+                sends = outbox.get_stats()
+                imgui.text(f"Outbox: {sends['sent']} sent, {sends['suppressed']} suppressed, "
+                           f"{sends['bytes_saved'] / 1024:.1f} KB saved, {sends['pending']} pending")
+            table_loader = getattr(self.context, 'StreamingTableLoader', None)
+            if table_loader:
+                loads = table_loader.get_stats()
+                last = table_loader.last_load
+                imgui.text(f"Table streaming: {loads['queued']} active, {loads['loads']} loaded, "
+                           f"{loads['failed']} failed")
+                if last:
+                    imgui.text(f"Last table: {last['sprites']} sprites, first in {last['first_sprite_ms'] or 0:.0f}ms, "
+                               f"total {last['total_ms']:.0f}ms")
+            asset_manager = getattr(self.context, 'AssetManager', None)
+            evictor = getattr(asset_manager, 'cache_evictor', None) if asset_manager else None
+            if evictor:
+                cache = evictor.get_stats()
+                imgui.text(f"Cache: {cache['total_bytes'] / 1024 / 1024:.1f}/{cache['max_bytes'] / 1024 / 1024:.0f} MB, "
+                           f"{cache['files']} files, hit rate {cache['hit_rate']:.0%}, "
+                           f"{cache['evicted'] + cache['expired']} evicted ({cache['policy']})")
+
     def _render_context_section(self):
         """Render context information section"""
         if imgui.collapsing_header("Context"):
@@ -99,6 +99,15 @@ class StoragePanel:
         
         imgui.text(f"Files in {self.current_folder}: {len(self.file_list)}")
         
+        # Network uploads
+        uploads = self._get_upload_progress()
+        if uploads:
+            active = sum(1 for entry in uploads.values() if entry.get('status') == 'uploading')
+            imgui.text(f"Uploads: {active} active, {len(uploads) - active} finished")
+            imgui.same_line()
+            if imgui.small_button("Show uploads"):
+                self.show_upload_progress = True
+        
         # Render popup windows only when visible
         self._render_popup_windows()
     
@@ -218,9 +227,27 @@ class StoragePanel:
             # Draw the popup if it's open
             popup_opened, _ = imgui.begin_popup_modal("Upload Progress")
             if popup_opened:
-                imgui.text("File upload functionality coming soon...")
+                uploads = self._get_upload_progress()
+                if not uploads:
+                    imgui.text("No uploads")
+                for op_id, entry in uploads.items():
+                    total = entry.get('total', 0)
+                    sent = entry.get('sent', 0)
+                    fraction = sent / total if total else (1.0 if entry.get('status') == 'done' else 0.0)
+                    status = entry.get('status', 'uploading')
+                    if status == 'failed':
+                        overlay = f"failed: {entry.get('error', '')}"
+                    else:
+                        overlay = f"{sent / 1024 / 1024:.1f} / {total / 1024 / 1024:.1f} MB"
+                    imgui.text(entry.get('filename') or op_id)
+                    imgui.progress_bar(fraction, (300, 0), overlay)
                 imgui.spacing()
                 
+                if imgui.button("Clear finished"):
+                    asset_manager = getattr(self.context, 'AssetManager', None)
+                    if asset_manager:
+                        asset_manager.clear_finished_uploads()
+                imgui.same_line()
                 if imgui.button("Close"):
                     self.show_upload_progress = False
                     imgui.close_current_popup()
@@ -229,6 +256,11 @@ class StoragePanel:
         except Exception as e:
             logger.error(f"Error drawing upload progress: {e}")
             self.show_upload_progress = False
+
+    def _get_upload_progress(self) -> Dict[str, Dict[str, Any]]:
+        asset_manager = getattr(self.context, 'AssetManager', None)
+        return getattr(asset_manager, 'upload_progress', {}) if asset_manager else {}
+
     def get_cached_stats(self):
         """Get cached storage stats to avoid expensive I/O every frame"""
         current_time = time.time()
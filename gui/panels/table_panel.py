@@ -468,6 +468,9 @@ class TablePanel:
             self.context.current_table = table
             if hasattr(self.context, 'player') and hasattr(self.context.current_table, 'player'):
                     self.context.player = self.context.current_table.player
+            prefetcher = getattr(self.context, 'AssetPrefetcher', None)
+            if prefetcher:
+                prefetcher.note_table_switch(table)
             
             # Invalidate table cache since current table changed
             self._cached_table = None
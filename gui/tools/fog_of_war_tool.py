@@ -267,7 +267,7 @@ class FogOfWarTool:
         
         # Clear existing fog sprites
         if 'fog_of_war' in self.context.current_table.dict_of_sprites_list:
-            self.context.current_table.dict_of_sprites_list['fog_of_war'].clear()
+            self.context.current_table.clear_layer('fog_of_war')
         
         if 'fog_of_war' in self.context.RenderManager.dict_of_sprites_list:
             self.context.RenderManager.dict_of_sprites_list['fog_of_war'].clear()
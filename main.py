@@ -31,6 +31,14 @@ from core.Context import Context
 from core.Actions import Actions
 from core.actions_protocol import Position
 from core.MovementManager import MovementManager
+from core.ProjectileManager import ProjectileManager, PLAYER_BULLET_TYPE
+from core.PathfindingManager import PathfindingManager
+from core.WorkScheduler import WorkScheduler
+from core.DownloadScheduler import DownloadScheduler
+from core.AssetPrefetcher import AssetPrefetcher
+from core.MessageOutbox import MessageOutbox
+from core.TableAutosave import TableAutosave
+from core.StreamingTableLoader import StreamingTableLoader
 from core.EnemyManager import EnemyManager
 
 # Render imports
@@ -50,6 +58,7 @@ from storage.StorageManager import StorageManager
 from storage.AssetManager import ClientAssetManager
 # Game imports
 from core.Player import Player
+from core.Sprite import animation_clock
 
 if TYPE_CHECKING:
     SDL_Renderer = c_void_p
@@ -304,6 +313,8 @@ def SDL_AppInit_func() -> Context:
 
         # Link to casting rays:
         game_context.EnemyManager.cast_ray = game_context.GeometryManager.cast_ray_and_check_unobstructed_vision
+        game_context.EnemyManager.check_vision_batch = game_context.GeometryManager.check_unobstructed_vision_batch
+        game_context.EnemyManager.centers_from_frects = game_context.GeometryManager.centers_from_frects
         game_context.EnemyManager.prepare_enemies()
 
     except Exception as e:
@@ -336,6 +347,39 @@ def SDL_AppInit_func() -> Context:
     except Exception as e:
         logger.error(f"Failed to initialize MovementManager: {e}")
         game_context.MovementManager = None
+
+    # Initialize WorkScheduler for completed I/O
+    game_context.WorkScheduler = WorkScheduler(game_context)
+    game_context.DownloadScheduler = DownloadScheduler(game_context)
+    game_context.AssetPrefetcher = AssetPrefetcher(game_context)
+    game_context.MessageOutbox = MessageOutbox(game_context)
+    game_context.TableAutosave = TableAutosave(game_context)
+    game_context.StreamingTableLoader = StreamingTableLoader(game_context)
+
+    # Initialize PathfindingManager
+    try:
+        logger.info("Initializing PathfindingManager...")
+        game_context.PathfindingManager = PathfindingManager(game_context)
+        game_context.PathfindingManager.build(game_context.current_table)
+        logger.info("PathfindingManager initialized.")
+    except Exception as e:
+        logger.error(f"Failed to initialize PathfindingManager: {e}")
+        game_context.PathfindingManager = None
+
+    # Initialize ProjectileManager
+    try:
+        logger.info("Initializing ProjectileManager...")
+        game_context.ProjectileManager = ProjectileManager(game_context)
+        bullet = game_context.player.sprite_bullet_dict
+        game_context.ProjectileManager.register_type(
+            PLAYER_BULLET_TYPE, bullet["sprite_path"], bullet["atlas_path"],
+            scale_x=2, scale_y=2, frame_duration=142, speed=3, friction=0.999, lifetime=1000)
+        bullet["projectile_type"] = PLAYER_BULLET_TYPE
+        game_context.EnemyManager.register_projectiles(game_context.ProjectileManager)
+        logger.info("ProjectileManager initialized.")
+    except Exception as e:
+        logger.error(f"Failed to initialize ProjectileManager: {e}")
+        game_context.ProjectileManager = None
     return game_context
 
 def SDL_AppIterate(context):
@@ -364,25 +408,35 @@ def SDL_AppIterate(context):
         # Set the table's screen area for coordinate transformation
         table.set_screen_area(table_x, table_y, table_width, table_height)
 
+    # Advance all sprite animations in one step
+    animation_clock.tick(delta_time)
     # Movement
     context.MovementManager.move_and_collide(delta_time, table)
+    if context.ProjectileManager:
+        context.ProjectileManager.update(delta_time, table)
     # Render all sdl content
     context.RenderManager.iterate_draw(table, context.light_on, context)
     # Render paint system if active (in table area)
     if PaintManager.is_paint_mode_active():
         PaintManager.render_paint_system()
     # Enemy logic    
+    if context.PathfindingManager and table:
+        context.PathfindingManager.sync(table)
+        context.PathfindingManager.update()
     context.EnemyManager.update(context.player, context.RenderManager.obstacles_np, delta_time)    
     # Async event queue for network and io   
     if context.AssetManager and context.Actions:
         completed = context.AssetManager.process_all_completed_operations()        
-        # Process completed operations through Actions
-        for op in completed:
-            success = op.get('success', False)            
-            if success:
-                context.Actions.handle_completed_operation(op)
-            else:
-                context.Actions.handle_operation_error(op)
+        # Process completed operations through Actions within frame budget
+        context.WorkScheduler.submit(completed)
+        context.WorkScheduler.process()
+        context.DownloadScheduler.update()
+        context.AssetPrefetcher.update()
+    # Coalesced sprite messages at OUTBOX_FLUSH_HZ
+    context.MessageOutbox.update()
+    context.TableAutosave.update()
+    # Large table files fill in within STREAM_LOAD_BUDGET_MS per frame
+    context.StreamingTableLoader.update()
     return sdl3.SDL_APP_CONTINUE
 
 
@@ -2,18 +2,45 @@
 Non-blocking Download Manager for SDL Applications.
 Thread pool-based downloads/uploads that don't block the main thread.
 """
+import json
 import os
 import queue
+import random
+import re
+import threading
+import time
 import uuid
 import xxhash
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
 from pathlib import Path
-from typing import Optional, Dict, Any, Union, List
-from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Union, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait
+from storage.file_io import hash_file
 from tools.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Segmented downloads
+SEGMENT_THRESHOLD = 8 * 1024 * 1024   # Files above this are split into Range segments
+MIN_SEGMENT_SIZE = 4 * 1024 * 1024
+MAX_SEGMENTS = 4
+PART_SUFFIX = '.part'
+STATE_SAVE_BYTES = 4 * 1024 * 1024    # Persist segment progress this often for resume
+# Adaptive read size, grows on fast connections and shrinks on slow ones
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 4 * 1024 * 1024
+CHUNK_TARGET_SECONDS = 0.1
+# Retries
+MAX_RETRIES = 4
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8.0
+REQUEST_TIMEOUT = 30
+PROGRESS_INTERVAL_SECONDS = 0.1  # Upload progress events at most 10 per second
+
+CONTENT_RANGE_RE = re.compile(r'bytes\s+\d+-\d+/(\d+)')
+
 
 class DownloadManager:
     """Non-blocking download/upload manager for SDL apps using thread pool."""
@@ -23,6 +50,14 @@ class DownloadManager:
         self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="download")
         self._completed_operations = queue.Queue()
         self._pending_operations = {}
+        # Segments run on their own pool, download workers block waiting for them
+        self._segment_executor = ThreadPoolExecutor(max_workers=max_workers * MAX_SEGMENTS,
+                                                    thread_name_prefix="download-segment")
+        # Shared session keeps connections alive between downloads
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers * MAX_SEGMENTS)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
           # Create download directory
         self.download_dir.mkdir(parents=True, exist_ok=True)
     
@@ -55,39 +90,20 @@ class DownloadManager:
                 
                 logger.info(f"Starting download: {url} -> {file_path}")
                 
-                # Download with streaming to handle large files
-                response = requests.get(url, stream=True, timeout=30)
-                response.raise_for_status()                # Write file in chunks and always calculate xxHash for consistency with AssetManager
-                total_size = 0
-                hash_obj = xxhash.xxh64()  # Always calculate hash for duplicate detection
-                expected_hash_obj = xxhash.xxh64() if expected_hash else None
+                total_size, segment_count, resumed = self._download_to_file(url, file_path)
                 
-                with open(file_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                            total_size += len(chunk)
-                            hash_obj.update(chunk)
-                            if expected_hash_obj:
-                                expected_hash_obj.update(chunk)
-                
-                # Always get the downloaded file hash
-                download_hash = hash_obj.hexdigest()
+                # Hash once after the file is complete, segments arrive out of order
+                download_hash, _, _ = hash_file(file_path)
                 
                 # Verify hash if expected hash was provided
                 hash_valid = True
                 if expected_hash:
-                    if expected_hash_obj:
-                        calculated_expected = expected_hash_obj.hexdigest()
-                        hash_valid = calculated_expected.lower() == expected_hash.lower()
-                    else:
-                        # Compare directly if expected_hash is already a hash
-                        hash_valid = download_hash.lower() == expected_hash.lower()
-                    
+                    hash_valid = download_hash.lower() == expected_hash.lower()
                     if not hash_valid:
                         logger.warning(f"Hash mismatch for {filename}: expected {expected_hash}, got {download_hash}")
                 
-                logger.info(f"Download completed: {filename} ({total_size} bytes)")
+                logger.info(f"Download completed: {filename} ({total_size} bytes, {segment_count} segments"
+                            f"{', resumed' if resumed else ''})")
                 
                 self._completed_operations.put({
                     'operation_id': operation_id,
@@ -100,6 +116,8 @@ class DownloadManager:
                     'size': total_size,
                     'hash': download_hash,
                     'hash_valid': hash_valid,
+                    'segments': segment_count,
+                    'resumed': resumed,
                     'metadata': metadata or {}
                 })
                 
@@ -121,10 +139,205 @@ class DownloadManager:
         
         self._pending_operations[operation_id] = self._executor.submit(_download)
         return operation_id
+
+    # ========================================================================
+    # DOWNLOAD ENGINE
+    # ========================================================================
+
+    def _download_to_file(self, url: str, file_path: Path) -> Tuple[int, int, bool]:
+        """Download url into file_path through a .part file.
+
+        Uses parallel Range segments when the server supports them, resumes a
+        previous .part file and retries failed requests with exponential backoff.
+        Returns (size, segment count, resumed).
+        """
+        part_path = file_path.with_name(file_path.name + PART_SUFFIX)
+        state_path = part_path.with_name(part_path.name + '.json')
+        total_size, accepts_ranges, etag = self._with_retries(lambda: self._probe(url), f"Probe {url}")
+
+        if not accepts_ranges or total_size is None:
+            self._with_retries(lambda: self._fetch_whole(url, part_path), f"Download {url}")
+            size = part_path.stat().st_size
+            os.replace(part_path, file_path)
+            state_path.unlink(missing_ok=True)
+            return size, 1, False
+        if total_size == 0:
+            file_path.write_bytes(b'')  # Empty file, nothing to fetch
+            state_path.unlink(missing_ok=True)
+            return 0, 1, False
+
+        state = self._load_part_state(state_path, part_path, total_size, etag)
+        resumed = state is not None
+        if state is None:
+            state = {'size': total_size, 'etag': etag, 'segments': self._plan_segments(total_size)}
+            with open(part_path, 'wb') as f:
+                f.truncate(total_size)
+            self._save_part_state(state_path, state)
+        else:
+            done = sum(segment[2] for segment in state['segments'])
+            logger.info(f"Resuming {file_path.name} at {done}/{total_size} bytes")
+
+        state_lock = threading.Lock()
+        segments = [segment for segment in state['segments'] if segment[0] + segment[2] <= segment[1]]
+        try:
+            if len(segments) <= 1:
+                for segment in segments:
+                    self._fetch_segment(url, part_path, segment, state, state_path, state_lock)
+            else:
+                futures = [self._segment_executor.submit(self._fetch_segment, url, part_path, segment,
+                                                         state, state_path, state_lock)
+                           for segment in segments]
+                wait(futures)
+                for future in futures:
+                    future.result()
+        finally:
+            with state_lock:
+                self._save_part_state(state_path, state)
+
+        os.replace(part_path, file_path)
+        state_path.unlink(missing_ok=True)
+        return total_size, len(state['segments']), resumed
+
+    def _probe(self, url: str) -> Tuple[Optional[int], bool, Optional[str]]:
+        """Find size and Range support with a one byte GET (presigned GET URLs reject HEAD)"""
+        headers = {'Range': 'bytes=0-0', 'Accept-Encoding': 'identity'}
+        response = self._session.get(url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT)
+        try:
+            if response.status_code == 416 and response.headers.get('Content-Range', '').endswith('/0'):
+                return 0, True, response.headers.get('ETag')  # Empty file
+            response.raise_for_status()
+            etag = response.headers.get('ETag')
+            if response.status_code == 206:
+                match = CONTENT_RANGE_RE.match(response.headers.get('Content-Range', ''))
+                if match:
+                    return int(match.group(1)), True, etag
+            content_length = response.headers.get('Content-Length')
+            return (int(content_length) if content_length else None), False, etag
+        finally:
+            response.close()
+
+    def _plan_segments(self, total_size: int) -> List[List[int]]:
+        """Segments as [start, end inclusive, bytes done], total_size must be positive"""
+        if total_size <= SEGMENT_THRESHOLD:
+            count = 1
+        else:
+            count = max(1, min(MAX_SEGMENTS, total_size // MIN_SEGMENT_SIZE))
+        segment_size = -(-total_size // count)
+        return [[start, min(start + segment_size, total_size) - 1, 0]
+                for start in range(0, total_size, segment_size)]
+
+    def _load_part_state(self, state_path: Path, part_path: Path, total_size: int,
+                         etag: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Saved segment progress if it matches the remote file, else None"""
+        if not state_path.exists() or not part_path.exists():
+            return None
+        try:
+            with open(state_path, 'r') as f:
+                state = json.load(f)
+            if state.get('size') != total_size or part_path.stat().st_size != total_size:
+                return None
+            if etag and state.get('etag') and state['etag'] != etag:
+                return None
+            return state
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable download state {state_path}: {e}")
+            return None
+
+    def _save_part_state(self, state_path: Path, state: Dict[str, Any]) -> None:
+        try:
+            tmp_path = state_path.with_name(state_path.name + '.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, state_path)
+        except Exception as e:
+            logger.warning(f"Failed to save download state {state_path}: {e}")
+
+    def _fetch_whole(self, url: str, part_path: Path) -> None:
+        """Plain GET for servers without Range support, restarts from zero on retry"""
+        with self._session.get(url, stream=True, timeout=REQUEST_TIMEOUT) as response:
+            response.raise_for_status()
+            with open(part_path, 'wb') as f:
+                for chunk in self._iter_adaptive(response):
+                    f.write(chunk)
+
+    def _fetch_segment(self, url: str, part_path: Path, segment: List[int], state: Dict[str, Any],
+                       state_path: Path, state_lock: threading.Lock) -> None:
+        def _fetch():
+            start = segment[0] + segment[2]
+            end = segment[1]
+            if start > end:
+                return
+            # Identity encoding so byte counts match the requested range
+            headers = {'Range': f'bytes={start}-{end}', 'Accept-Encoding': 'identity'}
+            with self._session.get(url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT) as response:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    raise IOError(f"Server ignored Range request for {url}")
+                # segment[2] only counts flushed bytes, any segment's thread may persist the state
+                done = segment[2]
+                with open(part_path, 'r+b') as f:
+                    f.seek(start)
+                    for chunk in self._iter_adaptive(response, end - start + 1):
+                        f.write(chunk)
+                        done += len(chunk)
+                        if done - segment[2] >= STATE_SAVE_BYTES:
+                            f.flush()
+                            with state_lock:
+                                segment[2] = done
+                                self._save_part_state(state_path, state)
+                with state_lock:
+                    segment[2] = done  # Closed, everything written is flushed
+        self._with_retries(_fetch, f"Segment {segment[0]}-{segment[1]} of {url}")
+
+    def _iter_adaptive(self, response: requests.Response, limit: Optional[int] = None):
+        """Read response body with chunk size adapted to throughput"""
+        chunk_size = MIN_CHUNK_SIZE
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            started = time.perf_counter()
+            chunk = response.raw.read(size, decode_content=True)
+            if not chunk:
+                break
+            elapsed = time.perf_counter() - started
+            if remaining is not None:
+                remaining -= len(chunk)
+            if elapsed < CHUNK_TARGET_SECONDS / 2 and chunk_size < MAX_CHUNK_SIZE:
+                chunk_size *= 2
+            elif elapsed > CHUNK_TARGET_SECONDS and chunk_size > MIN_CHUNK_SIZE:
+                chunk_size //= 2
+            yield chunk
+        if remaining:
+            raise requests.exceptions.ChunkedEncodingError(f"Connection closed with {remaining} bytes missing")
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        if isinstance(error, requests.HTTPError):
+            status = error.response.status_code if error.response is not None else 0
+            return status == 429 or status >= 500
+        return isinstance(error, (requests.ConnectionError, requests.Timeout,
+                                  requests.exceptions.ChunkedEncodingError, Urllib3HTTPError))
+
+    def _with_retries(self, func, description: str):
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                return func()
+            except Exception as e:
+                if attempt >= MAX_RETRIES or not self._is_retryable(e):
+                    raise
+                delay = min(BACKOFF_BASE_SECONDS * (2 ** attempt), BACKOFF_MAX_SECONDS) * random.uniform(0.5, 1.0)
+                logger.warning(f"{description} failed ({e}), retry {attempt + 1}/{MAX_RETRIES} in {delay:.1f}s")
+                time.sleep(delay)
     
     def upload_file_async(self, file_path: Union[str, Path], upload_url: str,
                          metadata: Optional[Dict[str, Any]] = None) -> str:
-        """Upload file asynchronously. Returns operation ID."""
+        """Upload file asynchronously. Returns operation ID.
+        
+        The file is streamed from disk and hashed while it is sent. If metadata has
+        'part_urls' (presigned URL per part) the file is sent as a multipart upload,
+        each part retried on its own, and the part ETags are returned in 'parts'.
+        'upload_progress' operations are queued while the upload runs.
+        """
         operation_id = str(uuid.uuid4())[:8]
         file_path = Path(file_path)
         
@@ -134,24 +347,23 @@ class DownloadManager:
                     raise FileNotFoundError(f"File not found: {file_path}")
                 
                 logger.info(f"Starting upload: {file_path} -> {upload_url}")
-                  # Calculate file hash and size
                 file_size = file_path.stat().st_size
-                hash_obj = xxhash.xxh64()
                 
-                with open(file_path, 'rb') as f:
-                    # Calculate hash while uploading
-                    data = f.read()
-                    hash_obj.update(data)
-                    f.seek(0)  # Reset for upload
-                    
-                    # Extract custom headers from metadata
-                    headers = metadata.get('headers', {}) if metadata else {}
-                    
-                    # Perform upload with custom headers
-                    response = requests.put(upload_url, data=data, headers=headers, timeout=60)
-                    response.raise_for_status()
+                # Extract custom headers from metadata
+                headers = metadata.get('headers', {}) if metadata else {}
+                part_urls = metadata.get('part_urls') if metadata else None
+                progress = _UploadProgress(self, operation_id, file_path.name, file_size, metadata)
+                progress.emit(force=True)
+                
+                if part_urls:
+                    part_size = (metadata.get('part_size') if metadata else None) or -(-file_size // len(part_urls))
+                    file_hash, parts = self._upload_parts(file_path, part_urls, part_size, headers, progress)
+                else:
+                    file_hash, _ = self._upload_part(file_path, upload_url, 0, file_size, headers,
+                                                     xxhash.xxh64(), progress, "Upload")
+                    parts = []
+                progress.emit(force=True)
                 
-                file_hash = hash_obj.hexdigest()
                 logger.info(f"Upload completed: {file_path.name} ({file_size} bytes)")
                 
                 self._completed_operations.put({
@@ -163,7 +375,8 @@ class DownloadManager:
                     'success': True,
                     'error': None,
                     'size': file_size,
-                    'hash': file_hash,
+                    'hash': file_hash.hexdigest(),
+                    'parts': parts,
                     'metadata': metadata or {}
                 })
                 
@@ -184,6 +397,40 @@ class DownloadManager:
         
         self._pending_operations[operation_id] = self._executor.submit(_upload)
         return operation_id
+
+    def _upload_parts(self, file_path: Path, part_urls: List[str], part_size: int,
+                      headers: Dict[str, str], progress: '_UploadProgress') -> Tuple[Any, List[Dict[str, Any]]]:
+        """Upload file as consecutive parts, returns (xxhash object, [{part_number, etag}])"""
+        file_size = file_path.stat().st_size
+        hasher = xxhash.xxh64()
+        parts = []
+        for index, part_url in enumerate(part_urls):
+            offset = index * part_size
+            if offset >= file_size and index > 0:
+                break
+            length = min(part_size, file_size - offset)
+            hasher, etag = self._upload_part(file_path, part_url, offset, length, headers, hasher,
+                                             progress, f"Part {index + 1}/{len(part_urls)}")
+            parts.append({'part_number': index + 1, 'etag': etag})
+        return hasher, parts
+
+    def _upload_part(self, file_path: Path, url: str, offset: int, length: int, headers: Dict[str, str],
+                     hasher: Any, progress: '_UploadProgress', description: str) -> Tuple[Any, Optional[str]]:
+        """PUT length bytes at offset, streamed from disk. Retried as a whole part.
+        
+        hasher holds the hash of all bytes before offset, the returned copy includes this part.
+        """
+        sent_before = progress.sent
+        
+        def _put():
+            progress.sent = sent_before
+            part_hasher = hasher.copy()
+            with open(file_path, 'rb') as f:
+                body = _FileSliceReader(f, offset, length, part_hasher, progress)
+                response = self._session.put(url, data=body, headers=headers, timeout=REQUEST_TIMEOUT * 2)
+            response.raise_for_status()
+            return part_hasher, response.headers.get('ETag')
+        return self._with_retries(_put, f"{description} of {file_path.name}")
     
     def process_completed_operations(self) -> List[Dict[str, Any]]:
         """Process completed operations. Call this in SDL main loop."""
@@ -192,8 +439,9 @@ class DownloadManager:
             try:
                 operation = self._completed_operations.get_nowait()
                 completed.append(operation)
-                # Clean up pending operations
-                self._pending_operations.pop(operation['operation_id'], None)
+                # Clean up pending operations, progress events come before the final result
+                if operation.get('type') != 'upload_progress':
+                    self._pending_operations.pop(operation['operation_id'], None)
             except queue.Empty:
                 break
         return completed
@@ -222,6 +470,8 @@ class DownloadManager:
                 pass
         
         self._executor.shutdown(wait=True)
+        self._segment_executor.shutdown(wait=True)
+        self._session.close()
     
     def _calculate_file_xxhash(self, file_path: Path) -> str:
         """Calculate xxHash for a file (for consistency with AssetManager)"""
@@ -263,6 +513,70 @@ class DownloadManager:
             expected_hash=expected_xxhash
         )
 
+class _FileSliceReader:
+    """File-like view of length bytes at offset for requests to stream.
+    
+    Has __len__ so requests sends Content-Length (presigned PUT rejects chunked
+    transfer encoding), hashes and reports progress as data is read.
+    """
+    
+    def __init__(self, file, offset: int, length: int, hasher: Any, progress: '_UploadProgress'):
+        self._file = file
+        self._remaining = length
+        self._length = length
+        self._hasher = hasher
+        self._progress = progress
+        self._file.seek(offset)
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    def read(self, size: int = -1) -> bytes:
+        if self._remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self._remaining:
+            size = min(self._remaining, MAX_CHUNK_SIZE)
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        self._hasher.update(data)
+        self._progress.advance(len(data))
+        return data
+
+
+class _UploadProgress:
+    """Throttled 'upload_progress' events on the completion queue"""
+    
+    def __init__(self, manager: 'DownloadManager', operation_id: str, filename: str,
+                 total: int, metadata: Optional[Dict[str, Any]]):
+        self.manager = manager
+        self.operation_id = operation_id
+        self.filename = filename
+        self.total = total
+        self.metadata = metadata or {}
+        self.sent = 0
+        self._last_emit = 0.0
+    
+    def advance(self, count: int) -> None:
+        self.sent += count
+        self.emit()
+    
+    def emit(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_emit < PROGRESS_INTERVAL_SECONDS:
+            return
+        self._last_emit = now
+        self.manager._completed_operations.put({
+            'operation_id': self.operation_id,
+            'type': 'upload_progress',
+            'filename': self.filename,
+            'success': True,
+            'error': None,
+            'bytes_sent': min(self.sent, self.total),
+            'total_bytes': self.total,
+            'metadata': self.metadata
+        })
+
+
 def main():
     """Example usage in SDL main loop."""
     download_mgr = DownloadManager("test_downloads")
@@ -0,0 +1,270 @@
+"""
+Wire codecs for protocol messages.
+'json' is the text format every peer understands, 'packed' is a compact
+binary encoding with one byte ids for common field names, binary floats and
+zlib compression of large payloads. The codec is agreed at handshake.
+"""
+
+import json
+import struct
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from tools.logger import setup_logger
+import tools.settings as settings
+
+logger = setup_logger(__name__, level='WARNING')
+
+# Field names sent as one byte ids by the packed codec. Wire format: only append, never reorder
+FIELD_NAMES = (
+    'type', 'data', 'client_id', 'timestamp', 'category', 'table_id', 'table_name', 'sprite_id',
+    'sprite_data', 'sprites', 'removed', 'revision', 'base_revision', 'full', 'name', 'width',
+    'height', 'position', 'scale', 'rotation', 'x', 'y', 'scale_x', 'scale_y', 'coord_x',
+    'coord_y', 'layer', 'texture_path', 'asset_id', 'visible', 'show_grid', 'cell_side',
+    'hide_rectangles', 'reveal_rectangles', 'from', 'to', 'operations', 'method', 'args',
+    'kwargs', 'frect_w', 'frect_h', 'is_player', 'character', 'moving', 'speed', 'collidable',
+)
+FIELD_IDS = {name: index for index, name in enumerate(FIELD_NAMES)}
+
+# Packed value tags
+T_NONE, T_FALSE, T_TRUE, T_INT, T_FLOAT32, T_FLOAT64, T_STR, T_BYTES, T_LIST, T_DICT, T_FIELD = range(11)
+FLAG_ZLIB = 0x01
+
+_F32 = struct.Struct('<f')
+_F64 = struct.Struct('<d')
+
+
+# ============================================================================
+# PACKED ENCODING
+# ============================================================================
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _write_value(out: bytearray, value: Any) -> None:
+    if value is None:
+        out.append(T_NONE)
+    elif value is True:
+        out.append(T_TRUE)
+    elif value is False:
+        out.append(T_FALSE)
+    elif isinstance(value, int):
+        out.append(T_INT)
+        _write_varint(out, (value << 1) if value >= 0 else ((-value << 1) - 1))  # zigzag
+    elif isinstance(value, float):
+        try:
+            packed = _F32.pack(value)
+        except OverflowError:  # Beyond float32 range
+            packed = None
+        if packed is not None and _F32.unpack(packed)[0] == value:
+            out.append(T_FLOAT32)
+            out += packed
+        else:
+            out.append(T_FLOAT64)
+            out += _F64.pack(value)
+    elif isinstance(value, str):
+        encoded = value.encode('utf-8')
+        out.append(T_STR)
+        _write_varint(out, len(encoded))
+        out += encoded
+    elif isinstance(value, (bytes, bytearray)):
+        out.append(T_BYTES)
+        _write_varint(out, len(value))
+        out += value
+    elif isinstance(value, (list, tuple)):
+        out.append(T_LIST)
+        _write_varint(out, len(value))
+        for item in value:
+            _write_value(out, item)
+    elif isinstance(value, dict):
+        out.append(T_DICT)
+        _write_varint(out, len(value))
+        for key, item in value.items():
+            field_id = FIELD_IDS.get(key) if isinstance(key, str) else None
+            if field_id is not None:
+                out.append(T_FIELD)
+                out.append(field_id)
+            else:
+                _write_value(out, key)
+            _write_value(out, item)
+    else:
+        raise TypeError(f"Cannot pack value of type {type(value).__name__}")
+
+
+def _read_value(data: bytes, pos: int) -> Tuple[Any, int]:
+    tag = data[pos]
+    pos += 1
+    if tag == T_NONE:
+        return None, pos
+    if tag == T_TRUE:
+        return True, pos
+    if tag == T_FALSE:
+        return False, pos
+    if tag == T_INT:
+        raw, pos = _read_varint(data, pos)
+        return (raw >> 1) if not raw & 1 else -((raw + 1) >> 1), pos
+    if tag == T_FLOAT32:
+        return _F32.unpack_from(data, pos)[0], pos + 4
+    if tag == T_FLOAT64:
+        return _F64.unpack_from(data, pos)[0], pos + 8
+    if tag in (T_STR, T_BYTES):
+        length, pos = _read_varint(data, pos)
+        chunk = data[pos:pos + length]
+        return (chunk.decode('utf-8') if tag == T_STR else bytes(chunk)), pos + length
+    if tag == T_LIST:
+        count, pos = _read_varint(data, pos)
+        items = []
+        for _ in range(count):
+            item, pos = _read_value(data, pos)
+            items.append(item)
+        return items, pos
+    if tag == T_DICT:
+        count, pos = _read_varint(data, pos)
+        result = {}
+        for _ in range(count):
+            if data[pos] == T_FIELD:
+                key = FIELD_NAMES[data[pos + 1]]
+                pos += 2
+            else:
+                key, pos = _read_value(data, pos)
+            result[key], pos = _read_value(data, pos)
+        return result, pos
+    raise ValueError(f"Unknown packed tag {tag} at offset {pos - 1}")
+
+
+# ============================================================================
+# CODECS
+# ============================================================================
+
+class JsonCodec:
+    """Plain JSON text, the fallback every peer supports"""
+    name = 'json'
+
+    def encode(self, message: Dict[str, Any]) -> str:
+        return json.dumps(message)
+
+    def decode(self, data: Union[str, bytes]) -> Dict[str, Any]:
+        return json.loads(data)
+
+
+class PackedCodec:
+    """Binary encoding: flags byte, then the tagged value, zlib compressed above compress_threshold.
+
+    Round trip matches JSON except that tuples come back as lists and float
+    values that fit in 32 bits are sent in 4 bytes (decoded exactly).
+    """
+    name = 'packed'
+
+    def __init__(self, compress_threshold: int = settings.WIRE_COMPRESS_THRESHOLD):
+        self.compress_threshold = compress_threshold
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        body = bytearray()
+        _write_value(body, message)
+        if self.compress_threshold and len(body) >= self.compress_threshold:
+            compressed = zlib.compress(bytes(body), 1)
+            if len(compressed) < len(body):
+                return bytes((FLAG_ZLIB,)) + compressed
+        return b'\x00' + bytes(body)
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        if not data:
+            raise ValueError("Empty packed message")
+        body = zlib.decompress(data[1:]) if data[0] & FLAG_ZLIB else memoryview(data)[1:].tobytes()
+        message, end = _read_value(body, 0)
+        if end != len(body):
+            raise ValueError(f"Trailing bytes in packed message ({len(body) - end})")
+        return message
+
+
+CODECS = {
+    JsonCodec.name: JsonCodec,
+    PackedCodec.name: PackedCodec,
+}
+
+
+def supported_codecs() -> List[str]:
+    """Codec names offered at handshake, most preferred first"""
+    return [name for name in settings.WIRE_CODECS if name in CODECS] or [JsonCodec.name]
+
+
+def negotiate_codec(offered: Optional[Iterable[str]]) -> Union[JsonCodec, PackedCodec]:
+    """First of our codecs the peer also offered, JSON when there is none in common"""
+    offered = set(offered or ())
+    for name in supported_codecs():
+        if name in offered:
+            return CODECS[name]()
+    return JsonCodec()
+
+
+# Protocol send methods sent as one encoded message once a binary codec is agreed -> names of their args
+CALL_FIELDS = {
+    'sprite_move': ('table_id', 'sprite_id', 'from', 'to'),
+    'sprite_scale': ('table_id', 'sprite_id', 'scale_x', 'scale_y'),
+    'sprite_rotate': ('table_id', 'sprite_id', 'rotation'),
+}
+
+
+# Further protocol send methods that can be an operation of a 'batch' update -> names of their args
+OPERATION_FIELDS = {
+    **CALL_FIELDS,
+    'sprite_create': ('table_id', 'sprite_data'),
+    'sprite_delete': ('table_id', 'sprite_id'),
+    'table_delete': ('table_id',),
+    'send_sprite_update': ('update_type', 'data'),
+}
+
+# Message type of send methods not named after it
+OPERATION_TYPES = {
+    'send_sprite_update': 'sprite_update',
+}
+
+
+def call_to_dict(method: str, args: Iterable[Any], kwargs: Dict[str, Any],
+                 client_id: Any = None, timestamp: Optional[float] = None,
+                 fields: Dict[str, Tuple[str, ...]] = CALL_FIELDS) -> Optional[Dict[str, Any]]:
+    """Message for a protocol send call, send_update(type, data) or one of `fields`.
+    None for calls the codec does not carry, those go to the protocol method."""
+    args = list(args)
+    if method == 'send_update' and len(args) == 2 and not kwargs:
+        message_type, data = args
+    elif method in fields and len(args) <= len(fields[method]):
+        message_type = OPERATION_TYPES.get(method, method)
+        data = dict(zip(fields[method], args))
+        data.update(kwargs)
+    else:
+        return None
+    message = {'type': message_type, 'data': data, 'client_id': client_id, 'timestamp': timestamp}
+    return {key: value for key, value in message.items() if value is not None}
+
+
+def call_to_operation(method: str, args: Iterable[Any], kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Operation of a 'batch' update for a protocol send call, a message without client_id and timestamp"""
+    return call_to_dict(method, args, kwargs, fields=OPERATION_FIELDS)
+
+
+def message_to_dict(message: Any) -> Dict[str, Any]:
+    """Fields of a protocol Message, as they appear in its to_json"""
+    message_type = getattr(message, 'type', None)
+    fields = {
+        'type': getattr(message_type, 'value', message_type),
+        'data': getattr(message, 'data', None),
+        'client_id': getattr(message, 'client_id', None),
+        'timestamp': getattr(message, 'timestamp', None),
+    }
+    return {key: value for key, value in fields.items() if value is not None}
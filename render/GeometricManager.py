@@ -579,6 +579,59 @@ class GeometricManager:
         # If intersection is before the target, vision is blocked
         return False
         
+    @staticmethod
+    def centers_from_frects(frects: List[sdl3.SDL_FRect]) -> np.ndarray:
+        """
+        Centers of many SDL_FRect as numpy array of shape (K, 2).
+        """
+        if not frects:
+            return np.empty((0, 2), dtype=np.float64)
+        rects = np.array([(f.x, f.y, f.w, f.h) for f in frects], dtype=np.float64)
+        return rects[:, :2] + rects[:, 2:] / 2.0
+
+    @staticmethod
+    def check_unobstructed_vision_batch(from_points: np.ndarray, to_points: np.ndarray, obstacles: np.ndarray,
+                                        vision_distances: Optional[np.ndarray] = None,
+                                        threshold: float = 2.0) -> np.ndarray:
+        """
+        Batched version of cast_ray_and_check_unobstructed_vision for K queries in one vectorized pass.
+        Args:
+            from_points: numpy array of shape (K, 2), ray sources (e.g., enemy centers)
+            to_points: numpy array of shape (K, 2), ray targets (e.g., player center)
+            obstacles: numpy array of shape (N, 2, 2) representing obstacle line segments
+            vision_distances: numpy array of shape (K,) with max distance per query, None for unlimited
+            threshold: distance threshold to consider 'close enough' to target center
+        Returns:
+            numpy bool array of shape (K,): True if vision is unobstructed
+        """
+        from_points = np.asarray(from_points, dtype=np.float64).reshape(-1, 2)
+        to_points = np.asarray(to_points, dtype=np.float64).reshape(-1, 2)
+        k = len(from_points)
+        if k == 0:
+            return np.zeros(0, dtype=bool)
+        direction = to_points - from_points
+        distance = np.hypot(direction[:, 0], direction[:, 1])
+        in_range = np.ones(k, dtype=bool)
+        if vision_distances is not None:
+            in_range = distance <= np.asarray(vision_distances, dtype=np.float64)
+        if obstacles is None or obstacles.size == 0:
+            return in_range
+        # (K, 1) rays against (1, N) obstacle segments
+        x1, y1 = from_points[:, 0:1], from_points[:, 1:2]
+        x2, y2 = to_points[:, 0:1], to_points[:, 1:2]
+        x3, y3 = obstacles[:, 0, 0][None, :], obstacles[:, 0, 1][None, :]
+        x4, y4 = obstacles[:, 1, 0][None, :], obstacles[:, 1, 1][None, :]
+        denom = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
+        valid = np.abs(denom) > 1e-10
+        safe_denom = np.where(valid, denom, 1.0)
+        t = ((x1 - x3) * (y3 - y4) - (y1 - y3) * (x3 - x4)) / safe_denom
+        u = -((x1 - x2) * (y1 - y3) - (y1 - y2) * (x1 - x3)) / safe_denom
+        # Blocked if an obstacle is hit before target minus threshold
+        hit_distance = t * distance[:, None]
+        blocked = (valid & (t >= 0) & (t <= 1) & (u >= 0) & (u <= 1) &
+                   (hit_distance < (distance - threshold)[:, None])).any(axis=1)
+        return in_range & ((distance < 1e-6) | ~blocked)
+
         
     @staticmethod
     #@profile_function
@@ -411,7 +411,7 @@ class PaintSystem:
             sprite = self.create_sprite_from_drawing(filename, sdl3.SDL_Point(int(min_x), int(min_y)))
             if sprite:
                 logger.info("Successfully created sprite from drawing")
-                self.context.current_table.dict_of_sprites_list[sprite.layer].append(sprite)
+                self.context.current_table.add_sprite_to_layer(sprite, sprite.layer)
             else:
                 logger.error("Failed to create sprite from drawing")
 
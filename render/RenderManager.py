@@ -175,8 +175,7 @@ class RenderManager():
             if sprite.visible == True:
                 # Animation support: if sprite has frames, animate
                 if isinstance(sprite, AnimatedSprite):
-                    
-                    sprite.update_animation()
+                    # Frame index is advanced once per frame by animation_clock
                     src_frect = sprite.get_current_frame_frect()
                     if not is_selected_layer:
                         sdl3.SDL_SetTextureAlphaMod(sprite.texture, ctypes.c_ubyte(128))
@@ -225,6 +224,9 @@ class RenderManager():
                                     f"exc_info=with texture {sprite.texture}")
                         sdl3.SDL_RenderTexture(self.renderer, sprite.texture, None,
                                             ctypes.byref(sprite.frect))
+        # Pooled projectiles are drawn in one batch on top of the projectiles layer
+        if layer_name == "projectiles" and getattr(context, 'ProjectileManager', None):
+            context.ProjectileManager.render(self.renderer, getattr(context, 'current_table', None), is_selected_layer)
 
     def render_texture(self, texture: sdl3.SDL_Texture, 
                        sfrect: Optional[sdl3.SDL_FRect] = None,
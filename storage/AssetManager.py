@@ -3,22 +3,27 @@ Client Asset Manager for R2 Integration
 Handles asset downloading, local caching, and integration with the game client.
 """
 
-import hashlib
-import json
 import time
 import xxhash   
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Set, Tuple, Any
 from tools.logger import setup_logger
 import tools.settings as settings
-import shutil
 import sdl3
+from collections import deque, OrderedDict
 from core.Sprite import Sprite
+from core.TextureCache import texture_cache
+from storage.AssetRegistry import AssetRegistry
+from storage.CacheEvictor import CacheEvictor
+from storage.file_io import hash_file, copy_file
 from storage.StorageManager import StorageManager
 from net.DownloadManager import DownloadManager  
 
 logger = setup_logger(__name__, level='WARNING')
 
+# Image types decoded on the storage worker, must match images handled by Actions.handle_file_loaded
+DECODABLE_IMAGE_FORMATS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.tiff'}
+
 class ClientAssetManager:
     """Manages R2 assets on the client side with local caching"""
     def __init__(self, cache_dir: Optional[str] = None, storage_root: Optional[str] = None):
@@ -42,7 +47,7 @@ class ClientAssetManager:
         try:
             download_dir = self.cache_dir / "downloads"
             download_dir.mkdir(exist_ok=True)
-            self.DownloadManager = DownloadManager(str(download_dir))
+            self.DownloadManager = DownloadManager(str(download_dir), max_workers=settings.MAX_DOWNLOAD_CONCURRENCY)
             logger.info(f"DownloadManager initialized with directory: {download_dir}")
         except Exception as e:
             logger.error(f"Failed to initialize DownloadManager: {e}")
@@ -51,8 +56,9 @@ class ClientAssetManager:
         self.registry_file = Path(settings.ASSET_REGISTRY_FILE)
         self.registry_file.parent.mkdir(parents=True, exist_ok=True)
         
-        self.asset_registry: Dict[str, Dict] = {}
-        self.session_textures: Dict[str, sdl3.SDL_Texture] = {}
+        self.asset_registry: AssetRegistry = None
+        # asset_id -> content hash (xxhash), textures themselves live in texture_cache
+        self.texture_keys: Dict[str, str] = {}
         self.download_queue = []
         self.downloading = False
         self.download_stats = {
@@ -64,44 +70,45 @@ class ClientAssetManager:
             'hash_verifications': 0,
             'hash_failures': 0
         }
+        # Session lookups, persistent lookups go through indexed registry columns
         self.path_to_asset: Dict[str, str] = {}  # path -> asset_id
-        # Hash lookup cache for fast duplicate detection
         self.hash_to_asset: Dict[str, str] = {}  # xxhash -> asset_id
         self.dict_of_sprites: Dict[str, Sprite] = {}  # operation ID -> sprite object
+        # Loads in flight by path, later sprites for the same file wait for the first load
+        self._loads_in_flight: Dict[str, str] = {}  # file path -> operation ID
+        self._waiting_sprites: Dict[str, List[Sprite]] = {}  # operation ID -> extra sprites
+        # Shared loads whose asset a later sprite needs uploaded to the server
+        self._upload_requested: Set[str] = set()  # operation IDs
+        # Decoded images waiting for GPU upload on the main thread
+        self._pending_uploads: deque = deque()
+        self.upload_budget_bytes: int = settings.TEXTURE_UPLOAD_BUDGET_BYTES
+        # Prefetched images decoded ahead of use, no sprite waits for them
+        self._prefetch_operations: Dict[str, str] = {}  # operation ID -> file path
+        self._prefetched: OrderedDict = OrderedDict()  # file path -> decoded load operation
+        self._prefetched_bytes = 0
+        self.prefetch_budget_bytes: int = settings.PREFETCH_SURFACE_BUDGET_BYTES
+        # Network uploads, operation ID -> filename, sent, total, status, error
+        self.upload_progress: Dict[str, Dict[str, Any]] = {}
         
         self._load_registry()
-        self._build_hash_lookup()
+        self.cache_evictor = CacheEvictor(
+            self.asset_registry, self.cache_dir,
+            max_bytes=settings.MAX_ASSET_CACHE_SIZE_MB * 1024 * 1024,
+            policy=settings.CACHE_EVICTION_POLICY,
+            high_watermark=settings.CACHE_HIGH_WATERMARK,
+            low_watermark=settings.CACHE_LOW_WATERMARK,
+            max_age_seconds=settings.CACHE_CLEANUP_AGE_DAYS * 24 * 3600)
+        if settings.AUTO_CLEANUP_CACHE:
+            self.cache_evictor.start()
         
         logger.info(f"ClientAssetManager initialized with cache dir: {self.cache_dir}")
 
     def _load_registry(self):
-        """Load asset registry from disk"""
+        """Open SQLite asset registry, importing the old JSON registry on first run"""
+        self.asset_registry = AssetRegistry(settings.ASSET_REGISTRY_DB)
         if self.registry_file.exists():
-            try:
-                with open(self.registry_file, 'r') as f:
-                    self.asset_registry = json.load(f)
-                logger.info(f"Loaded {len(self.asset_registry)} cached assets from registry")
-            except Exception as e:
-                logger.error(f"Failed to load asset registry: {e}")
-                self.asset_registry = {}
-
-    def _save_registry(self):
-        """Save asset registry to disk"""
-        try:
-            with open(self.registry_file, 'w') as f:
-                json.dump(self.asset_registry, f, indent=2)
-            logger.debug("Asset registry saved to disk")
-        except Exception as e:
-            logger.error(f"Failed to save asset registry: {e}")
-
-    def _build_hash_lookup(self):
-        """Build hash lookup table for fast duplicate detection"""
-        self.hash_to_asset.clear()
-        for asset_id, asset_info in self.asset_registry.items():
-            xxhash_value = asset_info.get('xxhash')
-            if xxhash_value:
-                self.hash_to_asset[xxhash_value] = asset_id
-        logger.debug(f"Built hash lookup table with {len(self.hash_to_asset)} entries")
+            self.asset_registry.import_json(self.registry_file)
+        logger.info(f"Asset registry has {len(self.asset_registry)} cached assets")
 
     def _get_cache_path(self, asset_id: str, filename: str) -> Path:
         """Get cache path for an asset"""
@@ -135,18 +142,14 @@ class ClientAssetManager:
         """Calculate xxHash for a file before upload (public method) - temporarily sync"""
         # TODO: This should be async via StorageManager
         try:
-            hasher = xxhash.xxh64()
-            with open(file_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(8192), b""):
-                    hasher.update(chunk)
-            return hasher.hexdigest()
+            return hash_file(file_path)[0]
         except Exception as e:
             logger.error(f"Failed to calculate xxHash for file {file_path}: {e}")
             return ""
 
     def find_asset_by_xxhash(self, xxhash_value: str) -> Optional[str]:
         """Find cached asset by xxHash (fast duplicate detection)"""
-        asset_id = self.hash_to_asset.get(xxhash_value)
+        asset_id = self.hash_to_asset.get(xxhash_value) or self.asset_registry.find_by_xxhash(xxhash_value)
         if asset_id and self.is_asset_cached(asset_id):
             logger.info(f"Found cached asset by xxHash: {xxhash_value} -> {asset_id}")
             return asset_id
@@ -154,26 +157,34 @@ class ClientAssetManager:
             # Asset was in lookup but cache file missing, clean up
             logger.warning(f"Asset {asset_id} in hash lookup but not cached, cleaning up")
             self._remove_from_hash_lookup(asset_id)
+            self.asset_registry.remove(asset_id)
         return None
     
     def find_asset_by_path(self, file_path: str) -> Optional[str]:
         """Find cached asset by file path"""
-        asset_id = self.path_to_asset.get(file_path)
+        asset_id = self.path_to_asset.get(file_path) or self.asset_registry.find_by_path(file_path)
         if asset_id and self.is_asset_cached(asset_id):
             logger.info(f"Found cached asset by path: {file_path} -> {asset_id}")
             return asset_id
         elif asset_id:
             # Asset was in lookup but cache file missing, clean up
             logger.warning(f"Asset {asset_id} in path lookup but not cached, cleaning up")
-            del self.path_to_asset[file_path]
+            self.path_to_asset.pop(file_path, None)
         return None
     
     def find_texture_by_asset_id(self, asset_id: str) -> Optional[sdl3.SDL_Texture]:
-        """Find texture by asset ID in session textures"""
-        if asset_id in self.session_textures:
-            return self.session_textures[asset_id]
-        logger.warning(f"Texture for asset {asset_id} not found in session textures")
+        """Find texture by asset ID in texture cache"""
+        key = self.texture_keys.get(asset_id)
+        texture = texture_cache.get(key) if key else None
+        if texture:
+            return texture
+        logger.warning(f"Texture for asset {asset_id} not found in texture cache")
         return None
+
+    def get_texture_size(self, asset_id: str) -> Tuple[int, int]:
+        """Width and height of cached texture for asset, (0, 0) if not cached"""
+        entry = texture_cache.get_entry(self.texture_keys.get(asset_id, ''))
+        return (entry.width, entry.height) if entry else (0, 0)
     
     def _add_to_hash_lookup(self, asset_id: str, xxhash_value: str):
         """Add asset to hash lookup table"""
@@ -185,6 +196,19 @@ class ClientAssetManager:
             self.path_to_asset[file_path] = asset_id
             logger.debug(f"Added asset {asset_id} to path lookup: {file_path}")
             
+    def _forget_evicted_assets(self):
+        """Drop session lookups of assets the cache evictor removed, runs on the main thread"""
+        evicted = set(self.cache_evictor.take_removed())
+        if not evicted:
+            return
+        for lookup in (self.hash_to_asset, self.path_to_asset):
+            for key in [key for key, asset_id in lookup.items() if asset_id in evicted]:
+                del lookup[key]
+        for asset_id in evicted:
+            # Textures stay with the sprites using them, a new load reads the asset again
+            self.texture_keys.pop(asset_id, None)
+        logger.debug(f"Forgot {len(evicted)} evicted assets")
+
     def _remove_from_hash_lookup(self, asset_id: str):
         """Remove asset from hash lookup table"""
         # Find and remove the hash entry for this asset_id
@@ -199,39 +223,25 @@ class ClientAssetManager:
     
     def is_asset_cached(self, asset_id: str) -> bool:
         """Check if asset is cached locally"""
-        if asset_id not in self.asset_registry:
-            return False
-        asset_info = self.asset_registry[asset_id]
-        cache_path = Path(asset_info.get('local_path', ''))
-        return cache_path.exists()
+        local_path = self.asset_registry.get_local_path(asset_id)
+        return bool(local_path) and Path(local_path).exists()
 
     def get_cached_asset_path(self, asset_id: str) -> Optional[str]:
         """Get local path for cached asset"""
         if not self.is_asset_cached(asset_id):
             return None
-        asset_info = self.asset_registry[asset_id]
-        return asset_info.get('local_path')
+        self.asset_registry.touch(asset_id)
+        self.cache_evictor.record_access(asset_id)
+        return self.asset_registry.get_local_path(asset_id)
 
    
 
-    def update_session_textures(self):
-        """Update available session assets"""
-        self.session_textures.clear()
-        for key, sprite in self.dict_of_sprites.items():
-            texture = sprite.texture
-            if texture:
-                self.session_textures[key] = texture
-        logger.info(f"Updated session textures: {len(self.session_textures)} textures available")
-
-    def register_texture(self, asset_id: str, texture: sdl3.SDL_Texture):
-        """Register a texture for asset"""
-        if not texture:
-            logger.error(f"Cannot register None texture for asset {asset_id}")
+    def register_texture(self, asset_id: str, texture_key: str):
+        """Map asset to texture cache key (content hash)"""
+        if not texture_key:
+            logger.error(f"Cannot register empty texture key for asset {asset_id}")
             return
-        
-        if asset_id in self.session_textures:
-            logger.warning(f"Texture for asset {asset_id} already registered, replacing")
-        self.session_textures[asset_id] = texture
+        self.texture_keys[asset_id] = texture_key
         logger.info(f"Registered texture for asset {asset_id}")
 
 
@@ -243,6 +253,7 @@ class ClientAssetManager:
             logger.debug(f"Asset {asset_id} served from cache: {cache_path}")
             return cache_path
         logger.info(f"Asset {asset_id} not cached, download required")
+        self.cache_evictor.record_miss()
         return None
 
     def get_asset_for_sprite_by_xxhash(self, xxhash_value: str) -> Optional[str]:
@@ -270,7 +281,6 @@ class ClientAssetManager:
                 existing_info['source'] = 'upload'
                 existing_info['cached_at'] = time.time()
                 self.asset_registry[asset_id] = existing_info
-                self._save_registry()
                 return
             
             # Copy the file to cache directory
@@ -280,11 +290,10 @@ class ClientAssetManager:
             cache_path.parent.mkdir(parents=True, exist_ok=True)
             
             # Copy file to cache
-            shutil.copy2(local_file_path, cache_path)
+            copy_file(local_file_path, cache_path)
             
-            # Calculate hashes for cached file
-            cached_xxhash = self._calculate_data_xxhash(cache_path.read_bytes())
-            cached_sha256 = hashlib.sha256(cache_path.read_bytes()).hexdigest()
+            # Calculate hashes for cached file in one streaming pass
+            cached_xxhash, cached_sha256, cached_size = hash_file(cache_path, with_sha256=True)
             
             # Verify copy was successful
             if original_xxhash != cached_xxhash:
@@ -299,7 +308,7 @@ class ClientAssetManager:
                 'local_path': str(cache_path),
                 'cached_at': time.time(),
                 'source': 'upload',
-                'file_size': cache_path.stat().st_size,
+                'file_size': cached_size,
                 'file_hash': cached_sha256,
                 'xxhash': cached_xxhash,
                 'hash_verified': True
@@ -307,9 +316,7 @@ class ClientAssetManager:
             
             # Add to hash lookup
             self._add_to_hash_lookup(asset_id, cached_xxhash)
-            
-            # Save registry
-            self._save_registry()
+            self.cache_evictor.record_add(asset_id, str(cache_path), cached_size)
             
             logger.info(f"Registered uploaded asset {asset_id} in cache: {cache_path} (xxHash: {cached_xxhash})")
             
@@ -332,7 +339,7 @@ class ClientAssetManager:
                 return True  # Assume valid if no hash to check
             
             # Calculate current hash
-            current_xxhash = self._calculate_data_xxhash(cache_path.read_bytes())
+            current_xxhash = hash_file(cache_path)[0]
             
             # Verify
             if current_xxhash == stored_xxhash:
@@ -346,130 +353,92 @@ class ClientAssetManager:
             logger.error(f"Error verifying asset {asset_id}: {e}")
             return False
 
-    def cleanup_cache(self, max_age_days: Optional[int] = None, max_size_mb: Optional[int] = None):
-        """Clean up old/large cache files"""
-        # Use settings defaults if not provided
-        if max_age_days is None:
-            max_age_days = settings.CACHE_CLEANUP_AGE_DAYS
-        if max_size_mb is None:
-            max_size_mb = settings.MAX_ASSET_CACHE_SIZE_MB
-            
+    def cleanup_cache(self, max_age_days: Optional[int] = None, max_size_mb: Optional[int] = None) -> int:
+        """Evict old/large cache files now instead of waiting for the background evictor.
+        Returns freed bytes"""
+        if max_age_days is not None:
+            self.cache_evictor.max_age_seconds = max_age_days * 24 * 3600
+        target_bytes = max_size_mb * 1024 * 1024 if max_size_mb is not None else None
         try:
-            current_time = time.time()
-            max_age_seconds = max_age_days * 24 * 3600
-            max_size_bytes = max_size_mb * 1024 * 1024
-            
-            cached_files = []
-            total_size = 0
-            
-            # Collect cache file info
-            for asset_id, asset_info in self.asset_registry.items():
-                cache_path = Path(asset_info.get('local_path', ''))
-                if cache_path.exists():
-                    stat = cache_path.stat()
-                    cached_files.append({
-                        'asset_id': asset_id,
-                        'path': cache_path,
-                        'size': stat.st_size,
-                        'age': current_time - asset_info.get('download_time', current_time)
-                    })
-                    total_size += stat.st_size
-            
-            logger.info(f"Cache cleanup: {len(cached_files)} files, {total_size / 1024 / 1024:.1f} MB total")
-            
-            removed_count = 0
-            freed_bytes = 0
-            
-            # Remove old files
-            for file_info in cached_files.copy():
-                if file_info['age'] > max_age_seconds:
-                    try:
-                        file_info['path'].unlink()
-                        self._remove_from_hash_lookup(file_info['asset_id'])
-                        del self.asset_registry[file_info['asset_id']]
-                        cached_files.remove(file_info)
-                        removed_count += 1
-                        freed_bytes += file_info['size']
-                        total_size -= file_info['size']
-                        logger.debug(f"Removed old cached file: {file_info['path']}")
-                    except Exception as e:
-                        logger.error(f"Failed to remove {file_info['path']}: {e}")
-            
-            # Remove files if cache too large (oldest first)
-            if total_size > max_size_bytes:
-                cached_files.sort(key=lambda x: self.asset_registry[x['asset_id']].get('download_time', 0))
-                for file_info in cached_files:
-                    if total_size <= max_size_bytes:
-                        break
-                    try:
-                        file_info['path'].unlink()
-                        self._remove_from_hash_lookup(file_info['asset_id'])
-                        del self.asset_registry[file_info['asset_id']]
-                        removed_count += 1
-                        freed_bytes += file_info['size']
-                        total_size -= file_info['size']
-                        logger.debug(f"Removed cached file (size limit): {file_info['path']}")
-                    except Exception as e:
-                        logger.error(f"Failed to remove {file_info['path']}: {e}")
-            
-            if removed_count > 0:
-                self._save_registry()
-                logger.info(f"Cache cleanup completed: removed {removed_count} files, freed {freed_bytes / 1024 / 1024:.1f} MB")
-                
+            freed = self.cache_evictor.evict_all(target_bytes)
+            self._forget_evicted_assets()
+            return freed
         except Exception as e:
             logger.error(f"Error during cache cleanup: {e}")
+            return 0
 
     def get_stats(self) -> Dict:
         """Get asset manager statistics"""
-        cached_count = sum(1 for asset_id in self.asset_registry if self.is_asset_cached(asset_id))
-        total_cache_size = 0
-        
-        for asset_info in self.asset_registry.values():
-            cache_path = Path(asset_info.get('local_path', ''))
-            if cache_path.exists():
-                total_cache_size += cache_path.stat().st_size        
+        # Registry totals, files are not stat'ed so this stays cheap for large caches
+        total_cache_size = self.asset_registry.total_size()
         return {
-            'cached_assets': cached_count,
-            'session_textures': len(self.session_textures),
+            'cached_assets': len(self.asset_registry),
+            'session_textures': len(self.texture_keys),
+            'texture_cache': texture_cache.get_stats(),
             'cache_size_mb': total_cache_size / 1024 / 1024,
             'download_queue_size': len(self.download_queue),
             'downloading': self.downloading,
             'hash_lookup_entries': len(self.hash_to_asset),
+            'cache_eviction': self.cache_evictor.get_stats(),
             **self.download_stats
         }
 
 
-    def handle_file_loaded(self, operation_id: str, filename: str, data: bytes) -> Optional[Tuple[str,str]]:
-        """Handle loading an asset by filename or operation ID"""
+    def handle_file_loaded(self, operation_id: str, filename: str, data: bytes,
+                           decoded: Optional[Dict[str, Any]] = None) -> Optional[Tuple[str,str]]:
+        """Handle loading an asset by filename or operation ID.
+        
+        decoded holds 'surface' and 'xxhash' prepared by decode_image on the worker,
+        then only the texture upload happens here on the main thread.
+        """
+        decoded = decoded or {}
+        surface = decoded.get('surface')
         if not filename and not operation_id:
             logger.error("No filename or operation ID provided for loading asset")
+            if surface:
+                sdl3.SDL_DestroySurface(surface)
             return None
         
         # Check by operation ID
-        xxhash = self._calculate_data_xxhash(data)
+        xxhash = decoded.get('xxhash') or self._calculate_data_xxhash(data)
         asset_id = xxhash[:16]
         self._add_to_hash_lookup(asset_id, xxhash)
         self._add_to_path_lookup(asset_id, filename)
         if operation_id:
             sprite = self.dict_of_sprites.get(operation_id)            
+            waiting = self._finish_load_in_flight(operation_id)
             if sprite:
-                logger.info(f"Found sprite for operation ID {operation_id} with filename {filename}, create surgface")
-                surface = self.surface_from_bytes(data, filename)
-                if not surface:
-                    logger.error(f"Failed to create surface from bytes for operation ID {operation_id}")
-                    return None                
-                logger.info(f"Creating texture from surface for operation ID {operation_id} and filename {filename}")
-                texture_with_w_h = self.create_texture_from_surface(sprite.renderer, surface)
-                if not texture_with_w_h:
-                    logger.error(f"Failed to create texture from surface for operation ID {operation_id}")
-                    return None
-                texture, w, h = texture_with_w_h
+                texture = texture_cache.get(xxhash)
+                if texture:
+                    # Same content already on GPU, share it
+                    entry = texture_cache.get_entry(xxhash)
+                    w, h = entry.width, entry.height
+                else:
+                    logger.info(f"Found sprite for operation ID {operation_id} with filename {filename}, create surgface")
+                    if not surface:
+                        # Not decoded on worker, decode here
+                        surface = self.surface_from_bytes(data, filename)
+                    if not surface:
+                        logger.error(f"Failed to create surface from bytes for operation ID {operation_id}")
+                        return None                
+                    logger.info(f"Creating texture from surface for operation ID {operation_id} and filename {filename}")
+                    texture_with_w_h = self.create_texture_from_surface(sprite.renderer, surface)
+                    surface = None  # Destroyed by create_texture_from_surface
+                    if not texture_with_w_h:
+                        logger.error(f"Failed to create texture from surface for operation ID {operation_id}")
+                        return None
+                    texture, w, h = texture_with_w_h
+                    if texture and w and h:
+                        texture = texture_cache.add(xxhash, texture, w, h)
                 if texture and w and h:
                     logger.info(f"Reloading texture for sprite with operation ID {operation_id} and filename {filename}")
-                    sprite.reload_texture(texture, w, h)
-                    sprite.asset_id = asset_id                    
+                    for target in [sprite] + waiting:
+                        target.reload_texture(texture, w, h)
+                        target.asset_id = asset_id                    
                     logger.info(f"Texture reloaded for operation ID {operation_id} with size {w}x{h}")
-                    self.register_texture(asset_id, texture)
+                    self.register_texture(asset_id, xxhash)
+                    if surface:
+                        sdl3.SDL_DestroySurface(surface)
                     logger.info(f"Loaded asset for operation ID {operation_id} with texture {filename}")
                     return asset_id, xxhash
                 else:
@@ -477,6 +446,8 @@ class ClientAssetManager:
                     return None
             else:
                 logger.warning(f"Sprite with operation id {operation_id} not finded")
+        if surface:
+            sdl3.SDL_DestroySurface(surface)
         
         # TODO: Then check by filename
            
@@ -506,6 +477,31 @@ class ClientAssetManager:
             logger.error(f"Error creating surface from bytes data for {filename}: {e}")
             return None
 
+    def image_decoder(self, filename: str):
+        """Worker decoder for load_file_async, None for files that are not decodable images"""
+        return self.decode_image if Path(filename).suffix.lower() in DECODABLE_IMAGE_FORMATS else None
+
+    def decode_image(self, data: bytes, filename: str) -> Dict[str, Any]:
+        """Decode image bytes on a worker thread.
+        Returns surface converted to RGBA32 and xxhash, so the main thread only uploads it."""
+        decoded: Dict[str, Any] = {'xxhash': self._calculate_data_xxhash(data)}
+        surface = self.surface_from_bytes(data, filename)
+        if not surface:
+            return decoded
+        converted = sdl3.SDL_ConvertSurface(surface, sdl3.SDL_PIXELFORMAT_RGBA32)
+        if converted:
+            sdl3.SDL_DestroySurface(surface)
+            surface = converted
+        width = surface.contents.w
+        height = surface.contents.h
+        decoded.update({
+            'surface': surface,
+            'width': width,
+            'height': height,
+            'byte_size': width * height * 4
+        })
+        return decoded
+
     def create_texture_from_surface(self, renderer:  'sdl3.LP_SDL_Renderer', surface: 'sdl3.LP_SDL_Surface') -> Optional[tuple['sdl3.SDL_Texture', int, int]]: 
             """Create texture from surface"""
             texture = sdl3.SDL_CreateTextureFromSurface(renderer, surface)
@@ -524,8 +520,12 @@ class ClientAssetManager:
             sdl3.SDL_DestroySurface(surface)
             return texture, width, height
     
-    def load_asset_for_sprite(self, sprite: Sprite, file_path: str, to_server:bool=False) -> Optional[bool]:
-        """Load asset for sprite from cache or disk, importing external files if needed"""
+    def load_asset_for_sprite(self, sprite: Sprite, file_path: str, to_server:bool=False,
+                              waiting: Optional[List[Sprite]] = None) -> Optional[bool]:
+        """Load asset for sprite from cache or disk, importing external files if needed.
+
+        waiting are more sprites with the same asset, they get the texture of this load.
+        """
         logger.debug(f"Loading asset for sprite: {sprite} from file path: {file_path}")
         if not sprite:
             logger.error("No sprite provided for loading asset")
@@ -534,6 +534,7 @@ class ClientAssetManager:
         if not self.StorageManager:
             logger.error("StorageManager not initialized, cannot load asset")
             return None
+        waiting = list(waiting or [])
             
         # Check if asset is already cached
         asset_id = self.find_asset_by_path(file_path)
@@ -543,7 +544,9 @@ class ClientAssetManager:
             texture = self.find_texture_by_asset_id(asset_id)
             if texture:
                 logger.info(f"Using cached texture for asset {asset_id}")
-                sprite.reload_texture(texture, sprite.rect.w, sprite.rect.h)
+                w, h = self.get_texture_size(asset_id)
+                for target in [sprite] + waiting:
+                    target.reload_texture(texture, w, h)
                 return True
             else:
                 logger.warning(f"Texture for asset {asset_id} not found in session textures, loading from disk")
@@ -563,19 +566,75 @@ class ClientAssetManager:
                 subdir="assets"
             )
             self.dict_of_sprites[operation_id] = sprite
+            self._loads_in_flight[file_path] = operation_id
+            if waiting:
+                self._waiting_sprites[operation_id] = waiting
+            if to_server:
+                self._upload_requested.add(operation_id)
             logger.debug(f"Importing external file with operation ID {operation_id}")
             return True
         
+        # Same file already loading, share its result
+        in_flight = self._loads_in_flight.get(file_path)
+        if in_flight:
+            if to_server:
+                self._upload_requested.add(in_flight)  # Uploaded when the shared load completes
+            if self._prefetch_operations.pop(in_flight, None):
+                # Prefetch of this file becomes the sprite load
+                self.dict_of_sprites[in_flight] = sprite
+                if waiting:
+                    self._waiting_sprites.setdefault(in_flight, []).extend(waiting)
+                logger.debug(f"Asset {file_path} prefetch in flight with operation ID {in_flight}, sprite takes it")
+                return True
+            self._waiting_sprites.setdefault(in_flight, []).extend([sprite] + waiting)
+            logger.debug(f"Asset {file_path} already loading with operation ID {in_flight}, sprite waits")
+            return True
+
+        # Already decoded by prefetch, only the texture upload is left
+        prefetched = None if to_server else self._take_prefetched(file_path)
+        if prefetched:
+            operation_id = prefetched['operation_id']
+            self.dict_of_sprites[operation_id] = sprite
+            self._loads_in_flight[file_path] = operation_id
+            if waiting:
+                self._waiting_sprites[operation_id] = waiting
+            self._pending_uploads.append(prefetched)
+            logger.debug(f"Asset {file_path} served from prefetched surface")
+            return True
+
         # File is already in managed storage, load it
         logger.info(f"Loading asset from managed storage: {file_path}")                      
         filename = Path(file_path).name
         subdir = Path(file_path).parent.as_posix() if Path(file_path).parent.as_posix() != "." else ""
         logger.debug(f"Using subdir: {subdir} for asset {filename}")
-        operation_id = self.StorageManager.load_file_async(filename, subdir=subdir, as_json=False, to_server=to_server)
+        operation_id = self.StorageManager.load_file_async(filename, subdir=subdir, as_json=False,
+                                                           to_server=to_server, decoder=self.image_decoder(filename))
         self.dict_of_sprites[operation_id] = sprite
+        self._loads_in_flight[file_path] = operation_id
+        if waiting:
+            self._waiting_sprites[operation_id] = waiting
         logger.debug(f"Loading asset from storage with operation ID {operation_id} and filename {filename}")
         return True
 
+    def load_asset_for_sprites(self, sprites: List[Sprite], file_path: str,
+                               asset_id: Optional[str] = None) -> int:
+        """Load one asset for many sprites, returns number of loads issued (0 or 1).
+
+        Sprites share the texture when asset_id is already on the GPU, otherwise
+        the first sprite starts the load and the rest wait for it.
+        """
+        if not sprites:
+            return 0
+        texture = self.find_texture_by_asset_id(asset_id) if asset_id else None
+        if texture:
+            w, h = self.get_texture_size(asset_id)
+            for sprite in sprites:
+                sprite.reload_texture(texture, w, h)
+            return 0
+        operations = len(self.dict_of_sprites)
+        self.load_asset_for_sprite(sprites[0], file_path, waiting=sprites[1:])
+        return 1 if len(self.dict_of_sprites) > operations else 0
+
     def cache_downloaded_asset(self, asset_id: str, downloaded_file_path: str) -> bool:
         """Cache a downloaded asset in the local registry"""
         try:
@@ -585,8 +644,7 @@ class ClientAssetManager:
                 logger.error(f"Downloaded file not found: {downloaded_file_path}")
                 return False
             
-            file_hash = self._calculate_data_xxhash(file_path.read_bytes())
-            file_size = file_path.stat().st_size
+            file_hash, file_sha256, file_size = hash_file(file_path, with_sha256=True)
             
             # Get filename
             filename = file_path.name
@@ -598,15 +656,14 @@ class ClientAssetManager:
                 'local_path': str(file_path),
                 'file_size': file_size,
                 'xxhash': file_hash,
+                'file_hash': file_sha256,
                 'download_time': int(time.time()),
                 'source': 'downloaded'
             }
             
             # Update lookup tables
             self._add_to_hash_lookup(asset_id, file_hash)
-            
-            # Save registry
-            self._save_registry()
+            self.cache_evictor.record_add(asset_id, str(file_path), file_size)
             
             logger.info(f"Cached downloaded asset {asset_id}: {filename} ({file_size} bytes)")
             return True
@@ -617,6 +674,7 @@ class ClientAssetManager:
     def process_all_completed_operations(self) -> List[Dict[str, Any]]:
         """Single point for processing all async I/O operations"""
         completed = []
+        self._forget_evicted_assets()
         
         # Collect from storage operations
         if self.StorageManager:
@@ -624,9 +682,19 @@ class ClientAssetManager:
                 storage_completed = self.StorageManager.process_completed_operations()
                 for op in storage_completed:
                     op['source'] = 'storage'
-                    completed.append(op)
+                    if op['operation_id'] in self._prefetch_operations:
+                        self._store_prefetched(op)
+                        continue
+                    if not op.get('success', False):
+                        self._finish_load_in_flight(op['operation_id'])
+                    if op.get('surface'):
+                        # Decoded image, upload under per-frame budget
+                        self._pending_uploads.append(op)
+                    else:
+                        completed.append(op)
             except Exception as e:
                 logger.error(f"Error processing storage completions: {e}")
+        completed.extend(self._release_pending_uploads())
         
         # Collect from download operations  
         if self.DownloadManager:
@@ -639,6 +707,110 @@ class ClientAssetManager:
                 logger.error(f"Error processing download completions: {e}")                
         return completed
     
+    def _release_pending_uploads(self) -> List[Dict[str, Any]]:
+        """Take decoded images from the upload queue until the per-frame byte budget is spent"""
+        released = []
+        budget = self.upload_budget_bytes
+        while self._pending_uploads:
+            size = self._pending_uploads[0].get('byte_size', 0)
+            # Always release at least one so large images can not block the queue
+            if released and size > budget:
+                break
+            budget -= size
+            released.append(self._pending_uploads.popleft())
+        if self._pending_uploads:
+            logger.debug(f"{len(self._pending_uploads)} decoded images wait for upload next frame")
+        return released
+
+    def update_upload_progress(self, operation_id: str, filename: str, sent: int, total: int,
+                               status: str = 'uploading', error: Optional[str] = None):
+        """Record upload progress from DownloadManager events"""
+        entry = self.upload_progress.setdefault(operation_id, {'filename': filename, 'sent': 0, 'total': 0})
+        if filename:
+            entry['filename'] = filename
+        if status == 'uploading' or status == 'done':
+            entry['sent'] = sent
+            entry['total'] = total or entry['total']
+        entry['status'] = status
+        entry['error'] = error
+
+    def clear_finished_uploads(self):
+        self.upload_progress = {op_id: entry for op_id, entry in self.upload_progress.items()
+                                if entry.get('status') == 'uploading'}
+
+    # Prefetch
+
+    def prefetch_asset(self, file_path: str) -> Optional[str]:
+        """Decode image in background so a later load_asset_for_sprite skips disk and decode.
+        Returns operation ID, None if nothing to do"""
+        if not self.StorageManager or not file_path:
+            return None
+        if Path(file_path).suffix.lower() not in DECODABLE_IMAGE_FORMATS:
+            return None
+        if file_path in self._loads_in_flight or file_path in self._prefetched:
+            return None
+        asset_id = self.find_asset_by_path(file_path)
+        if asset_id and texture_cache.get_entry(self.texture_keys.get(asset_id, '')):
+            return None  # Texture already on GPU
+        if self._is_external_file(file_path):
+            return None  # Needs import, done when a sprite uses it
+        filename = Path(file_path).name
+        subdir = Path(file_path).parent.as_posix() if Path(file_path).parent.as_posix() != "." else ""
+        operation_id = self.StorageManager.load_file_async(filename, subdir=subdir, as_json=False,
+                                                           decoder=self.decode_image)
+        self._prefetch_operations[operation_id] = file_path
+        self._loads_in_flight[file_path] = operation_id
+        logger.debug(f"Prefetching {file_path} with operation ID {operation_id}")
+        return operation_id
+
+    def get_prefetch_in_flight_count(self) -> int:
+        return len(self._prefetch_operations)
+
+    def _store_prefetched(self, op: Dict[str, Any]):
+        file_path = self._prefetch_operations.pop(op['operation_id'])
+        self._finish_load_in_flight(op['operation_id'])
+        if not op.get('success', False) or not op.get('surface'):
+            logger.debug(f"Prefetch of {file_path} produced no surface: {op.get('error')}")
+            return
+        op['data'] = b''  # Only the decoded surface is needed later
+        self._prefetched[file_path] = op
+        self._prefetched_bytes += op.get('byte_size', 0)
+        while self._prefetched_bytes > self.prefetch_budget_bytes and len(self._prefetched) > 1:
+            _, dropped = self._prefetched.popitem(last=False)
+            self._prefetched_bytes -= dropped.get('byte_size', 0)
+            sdl3.SDL_DestroySurface(dropped['surface'])
+
+    def _take_prefetched(self, file_path: str) -> Optional[Dict[str, Any]]:
+        op = self._prefetched.pop(file_path, None)
+        if op:
+            self._prefetched_bytes -= op.get('byte_size', 0)
+        return op
+
+    def clear_prefetched(self):
+        for op in self._prefetched.values():
+            sdl3.SDL_DestroySurface(op['surface'])
+        self._prefetched.clear()
+        self._prefetched_bytes = 0
+
+    def get_pending_upload_count(self) -> int:
+        return len(self._pending_uploads)
+
+    def _finish_load_in_flight(self, operation_id: str) -> List[Sprite]:
+        """Stop tracking a load by path, returns sprites that waited for it"""
+        for path, in_flight in list(self._loads_in_flight.items()):
+            if in_flight == operation_id:
+                del self._loads_in_flight[path]
+                break
+        self._upload_requested.discard(operation_id)
+        return self._waiting_sprites.pop(operation_id, [])
+
+    def take_upload_request(self, operation_id: str) -> bool:
+        """True once if a sprite sharing this load needs the asset uploaded to the server"""
+        if operation_id in self._upload_requested:
+            self._upload_requested.discard(operation_id)
+            return True
+        return False
+
     def cleanup_operation_tracking(self, operation_id: str):
         """Clean up tracking for completed operation"""
         self.dict_of_sprites.pop(operation_id, None)
@@ -0,0 +1,253 @@
+"""
+SQLite asset registry for the client asset cache.
+Replaces the JSON registry file, entries are written incrementally instead of
+rewriting the whole registry on every change.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from tools.logger import setup_logger
+
+logger = setup_logger(__name__, level='WARNING')
+
+SCHEMA_VERSION = 1
+
+# Indexed columns, any other asset info key is kept in the 'extra' JSON column
+COLUMNS = ('asset_id', 'filename', 'local_path', 'original_path', 'xxhash', 'file_hash',
+           'file_size', 'source', 'cached_at', 'last_access', 'hash_verified')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    asset_id TEXT PRIMARY KEY,
+    filename TEXT,
+    local_path TEXT,
+    original_path TEXT,
+    xxhash TEXT,
+    file_hash TEXT,
+    file_size INTEGER NOT NULL DEFAULT 0,
+    source TEXT,
+    cached_at REAL,
+    last_access REAL,
+    hash_verified INTEGER NOT NULL DEFAULT 0,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_assets_xxhash ON assets(xxhash);
+CREATE INDEX IF NOT EXISTS idx_assets_local_path ON assets(local_path);
+CREATE INDEX IF NOT EXISTS idx_assets_original_path ON assets(original_path);
+CREATE INDEX IF NOT EXISTS idx_assets_file_size ON assets(file_size);
+CREATE INDEX IF NOT EXISTS idx_assets_last_access ON assets(last_access);
+"""
+
+
+class AssetRegistry:
+    """Asset registry stored in SQLite (WAL mode).
+
+    Behaves like the old asset_id -> asset info dict (get, [], in, del, items,
+    values, len) so existing callers keep working, every assignment is an upsert
+    of one row. Group several writes with `with registry.transaction():`.
+    Returned dicts are copies, assign them back to persist changes.
+    """
+
+    def __init__(self, db_path: Union[str, Path]):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._transaction_depth = 0
+        # Autocommit, transactions are explicit
+        self._conn = sqlite3.connect(str(self.db_path), isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        logger.info(f"Asset registry opened: {self.db_path} ({len(self)} assets)")
+
+    # ========================================================================
+    # TRANSACTIONS
+    # ========================================================================
+
+    @contextmanager
+    def transaction(self) -> Iterator['AssetRegistry']:
+        """Group writes in one transaction, nested calls join the outer one"""
+        with self._lock:
+            if self._transaction_depth == 0:
+                self._conn.execute("BEGIN IMMEDIATE")
+            self._transaction_depth += 1
+            try:
+                yield self
+            except Exception:
+                self._transaction_depth -= 1
+                if self._transaction_depth == 0:
+                    self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._transaction_depth -= 1
+                if self._transaction_depth == 0:
+                    self._conn.execute("COMMIT")
+
+    # Rows are fetched under the lock, the connection is shared with the cache evictor thread
+    def _execute(self, sql: str, params: tuple = ()) -> int:
+        """Run a write statement, returns the number of changed rows"""
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount
+
+    def _fetchone(self, sql: str, params: tuple = ()) -> Optional[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def _fetchall(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # ========================================================================
+    # ROWS
+    # ========================================================================
+
+    @staticmethod
+    def _to_row(asset_id: str, asset_info: Dict) -> Tuple:
+        extra = {k: v for k, v in asset_info.items() if k not in COLUMNS}
+        cached_at = asset_info.get('cached_at', asset_info.get('download_time'))
+        return (
+            asset_id,
+            asset_info.get('filename'),
+            asset_info.get('local_path'),
+            asset_info.get('original_path'),
+            asset_info.get('xxhash') or None,
+            asset_info.get('file_hash'),
+            int(asset_info.get('file_size') or 0),
+            asset_info.get('source'),
+            cached_at,
+            asset_info.get('last_access', cached_at),
+            1 if asset_info.get('hash_verified') else 0,
+            json.dumps(extra) if extra else None,
+        )
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> Dict:
+        asset_info = {}
+        for key in COLUMNS:
+            value = row[key]
+            if value is not None:
+                asset_info[key] = value
+        asset_info['hash_verified'] = bool(row['hash_verified'])
+        if row['extra']:
+            asset_info.update(json.loads(row['extra']))
+        return asset_info
+
+    def get(self, asset_id: str, default: Optional[Dict] = None) -> Optional[Dict]:
+        row = self._fetchone("SELECT * FROM assets WHERE asset_id = ?", (asset_id,))
+        return self._from_row(row) if row else default
+
+    def put(self, asset_id: str, asset_info: Dict) -> None:
+        self._execute(f"INSERT OR REPLACE INTO assets ({', '.join(COLUMNS)}, extra) "
+                      f"VALUES ({', '.join('?' * (len(COLUMNS) + 1))})",
+                      self._to_row(asset_id, asset_info))
+
+    def put_many(self, assets: Dict[str, Dict]) -> None:
+        rows = [self._to_row(asset_id, asset_info) for asset_id, asset_info in assets.items()]
+        with self.transaction():
+            self._conn.executemany(f"INSERT OR REPLACE INTO assets ({', '.join(COLUMNS)}, extra) "
+                                   f"VALUES ({', '.join('?' * (len(COLUMNS) + 1))})", rows)
+
+    def remove(self, asset_id: str) -> bool:
+        return self._execute("DELETE FROM assets WHERE asset_id = ?", (asset_id,)) > 0
+
+    def __getitem__(self, asset_id: str) -> Dict:
+        asset_info = self.get(asset_id)
+        if asset_info is None:
+            raise KeyError(asset_id)
+        return asset_info
+
+    def __setitem__(self, asset_id: str, asset_info: Dict) -> None:
+        self.put(asset_id, asset_info)
+
+    def __delitem__(self, asset_id: str) -> None:
+        if not self.remove(asset_id):
+            raise KeyError(asset_id)
+
+    def __contains__(self, asset_id: object) -> bool:
+        return self._fetchone("SELECT 1 FROM assets WHERE asset_id = ?", (asset_id,)) is not None
+
+    def __len__(self) -> int:
+        return self._fetchone("SELECT COUNT(*) FROM assets")[0]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def keys(self) -> List[str]:
+        return [row[0] for row in self._fetchall("SELECT asset_id FROM assets")]
+
+    def items(self) -> List[Tuple[str, Dict]]:
+        return [(row['asset_id'], self._from_row(row)) for row in self._fetchall("SELECT * FROM assets")]
+
+    def values(self) -> List[Dict]:
+        return [self._from_row(row) for row in self._fetchall("SELECT * FROM assets")]
+
+    # ========================================================================
+    # LOOKUPS
+    # ========================================================================
+
+    def find_by_xxhash(self, xxhash_value: str) -> Optional[str]:
+        if not xxhash_value:
+            return None
+        row = self._fetchone("SELECT asset_id FROM assets WHERE xxhash = ? ORDER BY last_access DESC LIMIT 1",
+                             (xxhash_value,))
+        return row[0] if row else None
+
+    def find_by_path(self, file_path: str) -> Optional[str]:
+        """Asset cached at or imported from file_path"""
+        if not file_path:
+            return None
+        row = self._fetchone("SELECT asset_id FROM assets WHERE local_path = ? OR original_path = ? LIMIT 1",
+                             (file_path, file_path))
+        return row[0] if row else None
+
+    def get_local_path(self, asset_id: str) -> Optional[str]:
+        row = self._fetchone("SELECT local_path FROM assets WHERE asset_id = ?", (asset_id,))
+        return row[0] if row else None
+
+    def touch(self, asset_id: str, timestamp: Optional[float] = None) -> None:
+        """Record access time, used for least recently used cache cleanup"""
+        self._execute("UPDATE assets SET last_access = ? WHERE asset_id = ?",
+                      (timestamp or time.time(), asset_id))
+
+    def cache_entries(self) -> List[Tuple[str, Optional[str], int, Optional[float]]]:
+        """(asset_id, local_path, file_size, last access) of every asset, for eviction bookkeeping"""
+        return [tuple(row) for row in self._fetchall(
+            "SELECT asset_id, local_path, file_size, COALESCE(last_access, cached_at) FROM assets")]
+
+    def total_size(self) -> int:
+        return self._fetchone("SELECT COALESCE(SUM(file_size), 0) FROM assets")[0]
+
+    # ========================================================================
+    # MIGRATION
+    # ========================================================================
+
+    def import_json(self, json_path: Union[str, Path]) -> int:
+        """Import entries from the old JSON registry file, returns number imported.
+
+        The file is renamed to *.imported afterwards so it is only imported once.
+        """
+        json_path = Path(json_path)
+        if not json_path.exists():
+            return 0
+        try:
+            with open(json_path, 'r') as f:
+                assets = json.load(f)
+            self.put_many({asset_id: asset_info for asset_id, asset_info in assets.items()
+                           if isinstance(asset_info, dict)})
+            json_path.replace(json_path.with_suffix(json_path.suffix + '.imported'))
+            logger.info(f"Imported {len(assets)} assets from {json_path}")
+            return len(assets)
+        except Exception as e:
+            logger.error(f"Failed to import JSON asset registry {json_path}: {e}")
+            return 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,273 @@
+"""
+Incremental eviction for the client asset cache.
+Sizes and access times are kept in memory so eviction never stats the cache,
+files are removed in small batches on a background thread. Removed asset IDs
+are queued for the main thread, which drops its in-memory lookups.
+"""
+
+import heapq
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Union, Any
+from storage.AssetRegistry import AssetRegistry
+from tools.logger import setup_logger
+
+logger = setup_logger(__name__, level='WARNING')
+
+EVICT_BATCH = 16                # Files removed per step, lock is released between steps
+EVICT_INTERVAL_SECONDS = 5.0    # Background check interval when not woken by an insert
+POLICIES = ('lru', 'gdsf')
+
+
+@dataclass
+class CacheEntry:
+    asset_id: str
+    path: str
+    size: int
+    last_access: float
+    hits: int = 1
+    version: int = 0
+
+
+class CacheEvictor:
+    """Keeps the asset cache under its size budget.
+
+    Tracks size, last access and hit count of every file in the cache directory
+    with a running total. When the total crosses the high watermark entries are
+    evicted down to the low watermark, least recently used first ('lru') or by
+    Greedy-Dual-Size-Frequency ('gdsf', keeps small often used files longer).
+    Files outside the cache directory (imported into managed storage) are never
+    removed.
+    """
+
+    def __init__(self, registry: AssetRegistry, cache_dir: Union[str, Path], max_bytes: int,
+                 policy: str = 'gdsf', high_watermark: float = 0.9, low_watermark: float = 0.75,
+                 max_age_seconds: Optional[float] = None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown cache eviction policy {policy}, expected one of {POLICIES}")
+        self.registry = registry
+        self.cache_dir = Path(cache_dir).resolve()
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.high_watermark = high_watermark
+        self.low_watermark = low_watermark
+        self.max_age_seconds = max_age_seconds
+        self.total_bytes = 0
+        self._entries: Dict[str, CacheEntry] = {}
+        self._heap: List[tuple] = []  # (priority, version, asset_id), stale versions skipped
+        self._inflation = 0.0  # GDSF aging value, priority of the last evicted entry
+        self._removed: deque = deque()  # Asset IDs removed, not yet taken by the main thread
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats: Dict[str, Any] = {
+            'hits': 0,
+            'misses': 0,
+            'evicted': 0,
+            'expired': 0,
+            'freed_bytes': 0,
+        }
+        self._load()
+
+    def _load(self) -> None:
+        for asset_id, local_path, size, last_access in self.registry.cache_entries():
+            if self._in_cache_dir(local_path):
+                self._add_locked(asset_id, local_path, size or 0, last_access or 0.0)
+        logger.info(f"Cache evictor tracking {len(self._entries)} files, {self.total_bytes} bytes")
+
+    def _in_cache_dir(self, local_path: Optional[str]) -> bool:
+        if not local_path:
+            return False
+        try:
+            return Path(local_path).resolve().is_relative_to(self.cache_dir)
+        except (OSError, ValueError):
+            return False
+
+    # ========================================================================
+    # TRACKING
+    # ========================================================================
+
+    def _priority(self, entry: CacheEntry) -> float:
+        if self.policy == 'lru':
+            return entry.last_access
+        return self._inflation + entry.hits / max(entry.size, 1)
+
+    def _push(self, entry: CacheEntry) -> None:
+        entry.version += 1
+        heapq.heappush(self._heap, (self._priority(entry), entry.version, entry.asset_id))
+        if len(self._heap) > 4 * len(self._entries) + 64:
+            # Drop stale heap items left behind by accesses
+            self._heap = [(self._priority(e), e.version, e.asset_id) for e in self._entries.values()]
+            heapq.heapify(self._heap)
+
+    def _add_locked(self, asset_id: str, local_path: str, size: int, last_access: float) -> None:
+        old = self._entries.get(asset_id)
+        if old:
+            self.total_bytes -= old.size
+        entry = CacheEntry(asset_id, local_path, size, last_access, hits=old.hits if old else 1,
+                           version=old.version if old else 0)
+        self._entries[asset_id] = entry
+        self.total_bytes += size
+        self._push(entry)
+
+    def record_add(self, asset_id: str, local_path: str, size: int) -> None:
+        """File added to the cache"""
+        if not self._in_cache_dir(local_path):
+            return
+        with self._lock:
+            self._add_locked(asset_id, local_path, size, time.time())
+            over = self.total_bytes > self.max_bytes * self.high_watermark
+        if over:
+            self._wake.set()
+
+    def record_access(self, asset_id: str) -> None:
+        """Cached file served"""
+        with self._lock:
+            self.stats['hits'] += 1
+            entry = self._entries.get(asset_id)
+            if entry:
+                entry.hits += 1
+                entry.last_access = time.time()
+                self._push(entry)
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self.stats['misses'] += 1
+
+    def forget(self, asset_id: str) -> None:
+        """File removed by someone else"""
+        with self._lock:
+            entry = self._entries.pop(asset_id, None)
+            if entry:
+                self.total_bytes -= entry.size
+
+    # ========================================================================
+    # EVICTION
+    # ========================================================================
+
+    def _pop_victims(self, target_bytes: int, limit: int) -> List[CacheEntry]:
+        victims = []
+        with self._lock:
+            while self._heap and len(victims) < limit and self.total_bytes > target_bytes:
+                priority, version, asset_id = heapq.heappop(self._heap)
+                entry = self._entries.get(asset_id)
+                if entry is None or entry.version != version:
+                    continue
+                del self._entries[asset_id]
+                self.total_bytes -= entry.size
+                if self.policy == 'gdsf':
+                    self._inflation = priority
+                victims.append(entry)
+        return victims
+
+    def _expired_victims(self, limit: int) -> List[CacheEntry]:
+        if not self.max_age_seconds:
+            return []
+        cutoff = time.time() - self.max_age_seconds
+        victims = []
+        with self._lock:
+            for entry in list(self._entries.values()):
+                if len(victims) >= limit:
+                    break
+                if entry.last_access and entry.last_access < cutoff:
+                    del self._entries[entry.asset_id]
+                    self.total_bytes -= entry.size
+                    victims.append(entry)
+        return victims
+
+    def _remove_files(self, victims: List[CacheEntry], expired: bool = False) -> int:
+        freed = 0
+        with self.registry.transaction():
+            for entry in victims:
+                try:
+                    Path(entry.path).unlink(missing_ok=True)
+                    freed += entry.size
+                except OSError as e:
+                    logger.error(f"Failed to remove cached file {entry.path}: {e}")
+                self.registry.remove(entry.asset_id)
+        with self._lock:
+            self.stats['expired' if expired else 'evicted'] += len(victims)
+            self.stats['freed_bytes'] += freed
+            self._removed.extend(entry.asset_id for entry in victims)
+        return freed
+
+    def take_removed(self) -> List[str]:
+        """Asset IDs removed since the last call, for the main thread to forget"""
+        with self._lock:
+            removed = list(self._removed)
+            self._removed.clear()
+        return removed
+
+    def evict_step(self, target_bytes: Optional[int] = None, limit: int = EVICT_BATCH) -> int:
+        """Remove up to limit files towards target_bytes (low watermark). Returns freed bytes"""
+        if target_bytes is None:
+            target_bytes = int(self.max_bytes * self.low_watermark)
+        victims = self._pop_victims(target_bytes, limit)
+        return self._remove_files(victims) if victims else 0
+
+    def expire_step(self, limit: int = EVICT_BATCH) -> int:
+        victims = self._expired_victims(limit)
+        return self._remove_files(victims, expired=True) if victims else 0
+
+    def evict_all(self, target_bytes: Optional[int] = None) -> int:
+        """Evict expired and over budget files now, in batches. Returns freed bytes"""
+        freed = 0
+        while True:
+            step = self.expire_step()
+            if not step:
+                break
+            freed += step
+        while True:
+            step = self.evict_step(target_bytes)
+            if not step:
+                break
+            freed += step
+        if freed:
+            logger.info(f"Cache eviction freed {freed / 1024 / 1024:.1f} MB, cache now {self.total_bytes / 1024 / 1024:.1f} MB")
+        return freed
+
+    # ========================================================================
+    # BACKGROUND
+    # ========================================================================
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-evictor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(EVICT_INTERVAL_SECONDS)
+            self._wake.clear()
+            try:
+                while not self._stop.is_set() and self.expire_step():
+                    time.sleep(0)  # Let the main thread take the locks between batches
+                if self.total_bytes > self.max_bytes * self.high_watermark:
+                    while not self._stop.is_set() and self.evict_step():
+                        time.sleep(0)
+            except Exception as e:
+                logger.error(f"Background cache eviction failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+            'files': len(self._entries),
+            'total_bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'policy': self.policy,
+        }
@@ -3,6 +3,7 @@ Non-blocking Storage Manager for SDL Applications.
 Thread pool-based file operations that don't block the main thread.
 """
 import json
+import os
 import queue
 from re import S
 import uuid
@@ -11,6 +12,8 @@ from typing import Optional, List, Dict, Any, Union, Callable
 from concurrent.futures import ThreadPoolExecutor
 from tools.logger import setup_logger
 from tools.utils import bytes_to_str
+from storage.file_io import hash_file, copy_file
+import tools.settings as settings
 logger = setup_logger(__name__, level='WARNING')
 
 class StorageManager:
@@ -24,24 +27,36 @@ class StorageManager:
         # Create root directory
         self.root_path.mkdir(parents=True, exist_ok=True)
     
-    def save_file_async(self, filename: str, data: Union[bytes, str, Dict], 
-                       subdir: str = "") -> str:
-        """Save file asynchronously. Returns operation ID."""
+    def save_file_async(self, filename: str, data: Union[bytes, str, Dict, Any], 
+                       subdir: str = "", serializer: Optional[Callable[[Any], Any]] = None) -> str:
+        """Save file asynchronously. Returns operation ID.
+        
+        serializer runs on the worker thread and turns data (e.g. a table snapshot)
+        into what is written. The file is written to a temp file and renamed, so
+        readers never see a partial file.
+        """
         operation_id = str(uuid.uuid4())[:8]
-        data = bytes_to_str(data)
+        if serializer is None:
+            data = bytes_to_str(data)
         def _save():
             try:
                 file_path = self.root_path / subdir / filename
-                file_path.parent.mkdir(parents=True, exist_ok=True)                
-                if isinstance(data, dict):                    
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        json.dump(data, f, indent=2)
-                elif isinstance(data, str):
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(data)                
-                else:
-                    with open(file_path, 'wb') as f:
-                        f.write(data)
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+                content = bytes_to_str(serializer(data)) if serializer else data
+                temp_path = file_path.with_name(f".{file_path.name}.{operation_id}.tmp")
+                try:
+                    if isinstance(content, dict):
+                        with open(temp_path, 'w', encoding='utf-8') as f:
+                            json.dump(content, f, indent=2)
+                    elif isinstance(content, str):
+                        with open(temp_path, 'w', encoding='utf-8') as f:
+                            f.write(content)
+                    else:
+                        with open(temp_path, 'wb') as f:
+                            f.write(content)
+                    os.replace(temp_path, file_path)
+                finally:
+                    temp_path.unlink(missing_ok=True)
                 
                 self._completed_operations.put({
                     'operation_id': operation_id,
@@ -83,16 +98,10 @@ class StorageManager:
                 target_path = self.root_path / subdir / target_name
                 target_path.parent.mkdir(parents=True, exist_ok=True)
                 
-                # Copy file data
-                with open(external_path, 'rb') as src:
-                    file_data = src.read()
-                
-                with open(target_path, 'wb') as dst:
-                    dst.write(file_data)
-                
-                # Calculate hash for verification
-                import xxhash
-                xxhash_value = xxhash.xxh64(file_data).hexdigest()
+                # Stream copy and hash, memory use does not depend on file size
+                copy_method = copy_file(external_path, target_path,
+                                        allow_hardlink=settings.IMPORT_ALLOW_HARDLINK)
+                xxhash_value, _, file_size = hash_file(target_path)
                 
                 self._completed_operations.put({
                     'operation_id': operation_id,
@@ -102,7 +111,8 @@ class StorageManager:
                     'filename': target_name,
                     'subdir': subdir,
                     'xxhash': xxhash_value,
-                    'file_size': len(file_data),
+                    'file_size': file_size,
+                    'copy_method': copy_method,
                     'success': True,
                     'error': None
                 })
@@ -116,13 +126,18 @@ class StorageManager:
                     'success': False,
                     'error': str(e)
                 })
-                logger.error(f"Error saving file {filename}: {e}")
+                logger.error(f"Error importing file {external_file_path}: {e}")
         self._pending_operations[operation_id] = self._executor.submit(_import)
         return operation_id
 
     def load_file_async(self, filename: str, subdir: str = "",
-                       as_json: bool = False, to_server: bool = False) -> str:
-        """Load file asynchronously. Returns operation ID."""        
+                       as_json: bool = False, to_server: bool = False,
+                       decoder: Optional[Callable[[bytes, str], Dict[str, Any]]] = None) -> str:
+        """Load file asynchronously. Returns operation ID.
+        
+        decoder runs on the worker thread with (data, filename) and its result
+        dict is merged into the completion, e.g. decoded image surfaces.
+        """        
         operation_id = str(uuid.uuid4())[:8]
         logger.debug(f"Loading file {filename} from {subdir} with as_json={as_json}")
         def _load():
@@ -137,6 +152,7 @@ class StorageManager:
                 else:
                     with open(file_path, 'rb') as f:
                         data = f.read()
+                decoded = decoder(data, filename) if decoder else {}
                 
                 self._completed_operations.put({
                     'operation_id': operation_id,
@@ -147,7 +163,8 @@ class StorageManager:
                     'success': True,
                     'data': data,
                     'error': None,
-                    'to_server': to_server
+                    'to_server': to_server,
+                    **decoded
                 })
             except FileNotFoundError:
                 self._completed_operations.put({
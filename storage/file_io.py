@@ -0,0 +1,95 @@
+"""
+Streaming file helpers for the storage layer.
+Files are hashed and copied in fixed size chunks so memory use does not grow
+with file size, copies use kernel side copy or hardlinks where available.
+"""
+
+import errno
+import hashlib
+import os
+import shutil
+import xxhash
+from pathlib import Path
+from typing import Optional, Tuple, Union
+from tools.logger import setup_logger
+
+logger = setup_logger(__name__, level='WARNING')
+
+HASH_CHUNK_SIZE = 1024 * 1024  # 1MB read buffer, reused for the whole file
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+PathLike = Union[str, Path]
+
+
+def hash_file(file_path: PathLike, with_sha256: bool = False,
+              chunk_size: int = HASH_CHUNK_SIZE) -> Tuple[str, Optional[str], int]:
+    """Hash file in one pass. Returns (xxhash, sha256 or None, size in bytes)"""
+    xx_hasher = xxhash.xxh64()
+    sha_hasher = hashlib.sha256() if with_sha256 else None
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    size = 0
+    with open(file_path, 'rb', buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            chunk = view[:n]
+            xx_hasher.update(chunk)
+            if sha_hasher is not None:
+                sha_hasher.update(chunk)
+            size += n
+    return xx_hasher.hexdigest(), sha_hasher.hexdigest() if sha_hasher else None, size
+
+
+def _kernel_copy(src_fd: int, dst_fd: int, size: int) -> bool:
+    """Copy without passing data through Python. Returns False if not supported"""
+    copy_func = getattr(os, 'copy_file_range', None)
+    if copy_func is None:
+        copy_func = getattr(os, 'sendfile', None)
+        if copy_func is None:
+            return False
+        copy = lambda count: copy_func(dst_fd, src_fd, None, count)
+    else:
+        copy = lambda count: copy_func(src_fd, dst_fd, count)
+    copied = 0
+    try:
+        while copied < size:
+            n = copy(min(COPY_CHUNK_SIZE, size - copied))
+            if n == 0:
+                break
+            copied += n
+    except OSError as e:
+        if copied == 0 and e.errno in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.ENOTSUP, errno.EBADF):
+            return False
+        raise
+    return copied == size
+
+
+def copy_file(src: PathLike, dst: PathLike, allow_hardlink: bool = False) -> str:
+    """Copy src to dst with constant memory. Returns method used: 'hardlink', 'kernel' or 'stream'.
+
+    A hardlink shares the file with src, only use it when src is not modified in place.
+    """
+    src, dst = Path(src), Path(dst)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if dst.exists():
+        dst.unlink()
+    if allow_hardlink:
+        try:
+            os.link(src, dst)
+            return 'hardlink'
+        except OSError as e:
+            logger.debug(f"Hardlink {src} -> {dst} not possible ({e}), copying")
+    size = src.stat().st_size
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        if _kernel_copy(fsrc.fileno(), fdst.fileno(), size):
+            method = 'kernel'
+        else:
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+            shutil.copyfileobj(fsrc, fdst, COPY_CHUNK_SIZE)
+            method = 'stream'
+    shutil.copystat(src, dst)
+    return method
@@ -0,0 +1,152 @@
+"""
+Incremental reader for large JSON files (saved tables, tile maps).
+The file is read in chunks and the entries of one big container are yielded
+as soon as each is parsed, so memory holds one chunk and one entry instead of
+the whole text plus the whole decoded document.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Iterator, Optional, TextIO, Tuple, Union
+from tools.logger import setup_logger
+
+logger = setup_logger(__name__, level='WARNING')
+
+STREAM_CHUNK_SIZE = 256 * 1024
+WHITESPACE = ' \t\n\r'
+NUMBER_CHARS = '0123456789+-.eE'
+
+PathLike = Union[str, Path]
+
+
+class JsonStreamReader:
+    """Pull parser over a text file: containers are walked by hand, values decoded with raw_decode"""
+
+    def __init__(self, stream: TextIO, chunk_size: int = STREAM_CHUNK_SIZE):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Read the next chunk, drops consumed text. False at end of file"""
+        if self._eof:
+            return False
+        chunk = self._stream.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, '' at end of file"""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' but found '{found or 'end of file'}'")
+        self._pos += 1
+
+    def read_value(self) -> Any:
+        """Decode the next complete JSON value, reading more chunks until it is complete"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            if (not self._eof and isinstance(value, (int, float)) and not isinstance(value, bool)
+                    and (end == len(self._buffer) or self._buffer[end] in NUMBER_CHARS)):
+                # A number cut by the chunk boundary decodes as its prefix ("1." + "25" as 1)
+                if self._fill():
+                    continue
+            self._pos = end
+            return value
+
+    def iter_object(self) -> Iterator[str]:
+        """Keys of the object at the current position. The caller reads or walks
+        each value before asking for the next key"""
+        self.expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self.expect(':')
+            yield key
+            separator = self.peek()
+            self._pos += 1
+            if separator == '}':
+                return
+            if separator != ',':
+                raise ValueError(f"Expected ',' or '}}' but found '{separator or 'end of file'}'")
+
+    def iter_array(self) -> Iterator[Any]:
+        """Items of the array at the current position"""
+        self.expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self.read_value()
+            separator = self.peek()
+            self._pos += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f"Expected ',' or ']' but found '{separator or 'end of file'}'")
+
+    def iter_entries(self) -> Iterator[Tuple[Any, Any]]:
+        """(key or index, value) of the object or array at the current position"""
+        if self.peek() == '[':
+            yield from enumerate(self.iter_array())
+        elif self.peek() == '{':
+            for key in self.iter_object():
+                yield key, self.read_value()
+        else:
+            self.read_value()  # null or scalar, nothing to stream
+
+
+def iter_json_file(file_path: PathLike, container_key: str, nested: bool = False,
+                   chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Tuple]:
+    """Stream a JSON object file whose container_key holds most of the data.
+
+    Yields ('header', dict) with the other top level keys (once before the
+    container and once after it if more keys follow), then
+    ('entry', group, key, value) for each container entry. With nested the
+    container holds groups of entries (table layers -> sprites), group is the
+    group name, otherwise group is None.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        reader = JsonStreamReader(f, chunk_size)
+        header = {}
+        for top_key in reader.iter_object():
+            if top_key != container_key:
+                header[top_key] = reader.read_value()
+                continue
+            yield 'header', header
+            header = {}
+            if not nested:
+                for key, value in reader.iter_entries():
+                    yield 'entry', None, key, value
+            elif reader.peek() == '{':
+                for group in reader.iter_object():
+                    for key, value in reader.iter_entries():
+                        yield 'entry', group, key, value
+            else:
+                reader.read_value()
+        if header:
+            yield 'header', header
@@ -0,0 +1,11 @@
+import os
+import sys
+from pathlib import Path
+
+# Tests import the engine packages (core, net, storage, tools) from the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Use the installed SDL binaries, no downloads or version checks on import
+os.environ.setdefault('SDL_DOWNLOAD_BINARIES', '0')
+os.environ.setdefault('SDL_CHECK_VERSION', '0')
+os.environ.setdefault('SDL_DOC_GENERATOR', '0')
@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+
+from core.AIScheduler import AI_TICK_MS, AIScheduler
+
+
+def _coords(x, y):
+    return SimpleNamespace(coord_x=SimpleNamespace(value=x), coord_y=SimpleNamespace(value=y))
+
+
+class FakeEnemy:
+    def __init__(self, enemy_id, x=0.0, y=0.0):
+        self.enemy_id = enemy_id
+        self.coord_x = SimpleNamespace(value=x)
+        self.coord_y = SimpleNamespace(value=y)
+        self.thoughts = 0
+        self.player_visible = None
+
+    def think(self, cast_ray, player, obstacles_np):
+        self.thoughts += 1
+
+    def step_movement(self, dt):
+        pass
+
+
+class FakeEnemyManager:
+    cast_ray = None
+
+    def __init__(self, enemies):
+        self.enemies = enemies
+
+    def resolve_vision(self, player, obstacles_np, enemies=None):
+        pass
+
+
+def test_tick_keeps_remainder_of_accumulator():
+    enemy = FakeEnemy('e')
+    scheduler = AIScheduler(FakeEnemyManager([enemy]), frame_budget_ms=1000.0)
+    player = _coords(0.0, 0.0)
+    # 30 ms frames do not divide the 50 ms tick, 20 frames are 600 ms or 12 ticks
+    for _ in range(20):
+        scheduler.update(player, None, 30.0)
+    assert enemy.thoughts == 600 // AI_TICK_MS
+    assert scheduler._accumulators['e'] == 600 % AI_TICK_MS
+
+
+def test_state_of_removed_enemies_is_dropped():
+    enemies = [FakeEnemy(f'e{i}') for i in range(3)]
+    manager = FakeEnemyManager(list(enemies))
+    scheduler = AIScheduler(manager)
+    player = _coords(0.0, 0.0)
+    scheduler.update(player, None, 16.0)
+    assert set(scheduler._accumulators) == {'e0', 'e1', 'e2'}
+
+    manager.enemies.remove(enemies[1])
+    scheduler.update(player, None, 16.0)
+    assert set(scheduler._accumulators) == set(scheduler._lods) == {'e0', 'e2'}
+
@@ -0,0 +1,75 @@
+import pytest
+
+import tools.settings as settings
+from core.Context import Context
+from core.Sprite import Sprite
+from storage.AssetManager import ClientAssetManager
+
+
+@pytest.fixture
+def asset_manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'ASSET_REGISTRY_FILE', str(tmp_path / 'cache' / 'registry.json'))
+    monkeypatch.setattr(settings, 'ASSET_REGISTRY_DB', str(tmp_path / 'cache' / 'registry.db'))
+    (tmp_path / 'storage').mkdir()
+    (tmp_path / 'storage' / 'token.png').write_bytes(b'not decoded in this test')
+    return ClientAssetManager(cache_dir=str(tmp_path / 'cache'), storage_root=str(tmp_path / 'storage'))
+
+
+def _sprite(sprite_id):
+    return Sprite(None, 'token.png', coord_x=0.0, coord_y=0.0, sprite_id=sprite_id)
+
+
+def test_waiter_requesting_upload_marks_shared_load(asset_manager):
+    first, second = _sprite('a'), _sprite('b')
+    assert asset_manager.load_asset_for_sprite(first, 'token.png')
+    operation_id = asset_manager._loads_in_flight['token.png']
+    assert operation_id not in asset_manager._upload_requested
+
+    asset_manager.load_asset_for_sprite(second, 'token.png', to_server=True)
+    assert asset_manager._waiting_sprites[operation_id] == [second]
+    assert asset_manager.take_upload_request(operation_id)
+    assert not asset_manager.take_upload_request(operation_id)
+
+
+def test_adopted_prefetch_keeps_upload(asset_manager):
+    operation_id = asset_manager.prefetch_asset('token.png')
+    assert operation_id
+    sprite = _sprite('a')
+    asset_manager.load_asset_for_sprite(sprite, 'token.png', to_server=True)
+    assert asset_manager.dict_of_sprites[operation_id] is sprite
+    assert operation_id not in asset_manager._prefetch_operations
+    assert asset_manager.take_upload_request(operation_id)
+
+
+def test_evicted_assets_leave_session_lookups(asset_manager):
+    cached = asset_manager.cache_dir / 'evicted.png'
+    cached.write_bytes(b'x' * 1024)
+    asset_manager.cache_evictor.record_add('evicted', str(cached), 1024)
+    asset_manager._add_to_hash_lookup('evicted', 'hash-1')
+    asset_manager._add_to_path_lookup('evicted', 'maps/evicted.png')
+    asset_manager._add_to_path_lookup('kept', 'maps/kept.png')
+    asset_manager.texture_keys['evicted'] = 'texture-key'
+
+    assert asset_manager.cleanup_cache(max_size_mb=0) == 1024
+    assert not cached.exists()
+    assert 'hash-1' not in asset_manager.hash_to_asset
+    assert asset_manager.path_to_asset == {'maps/kept.png': 'kept'}
+    assert 'evicted' not in asset_manager.texture_keys
+
+
+def test_imported_image_loads_with_worker_decoder(asset_manager, monkeypatch):
+    loads = []
+    load_file_async = asset_manager.StorageManager.load_file_async
+
+    def recording_load(filename, **kwargs):
+        loads.append((filename, kwargs.get('decoder')))
+        return load_file_async(filename, **kwargs)
+
+    monkeypatch.setattr(asset_manager.StorageManager, 'load_file_async', recording_load)
+    actions = Context(None, None, 800, 600).Actions
+    actions.AssetManager = asset_manager
+    for operation_id, filename in (('import-png', 'token.png'), ('import-txt', 'notes.txt')):
+        asset_manager.dict_of_sprites[operation_id] = _sprite(filename)
+        operation = {'filename': filename, 'target_path': filename, 'xxhash': 'f' * 16, 'subdir': ''}
+        assert actions.handle_file_imported(operation_id, operation).success
+    assert loads == [('token.png', asset_manager.decode_image), ('notes.txt', None)]
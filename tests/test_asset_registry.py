@@ -0,0 +1,46 @@
+import threading
+
+from storage.AssetRegistry import AssetRegistry
+
+
+def test_registry_behaves_like_dict(tmp_path):
+    registry = AssetRegistry(tmp_path / 'registry.db')
+    registry['a'] = {'filename': 'a.png', 'local_path': '/cache/a.png', 'xxhash': 'h1', 'file_size': 3, 'note': 'x'}
+    assert 'a' in registry and len(registry) == 1
+    assert registry['a']['note'] == 'x'
+    assert registry.find_by_xxhash('h1') == 'a'
+    assert registry.find_by_path('/cache/a.png') == 'a'
+    assert registry.total_size() == 3
+    assert registry.remove('a') and not registry.remove('a')
+    assert registry.get('a') is None
+    registry.close()
+
+
+def test_reads_while_another_thread_writes(tmp_path):
+    registry = AssetRegistry(tmp_path / 'registry.db')
+    registry.put_many({f'seed{i}': {'file_size': 1} for i in range(50)})
+    errors = []
+    stop = threading.Event()
+
+    def writer():
+        try:
+            i = 0
+            while not stop.is_set():
+                with registry.transaction():
+                    registry[f'w{i}'] = {'file_size': 1}
+                    registry.remove(f'w{i - 1}')
+                i += 1
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        for _ in range(200):
+            assert len(registry.items()) >= 50
+            assert len(registry.cache_entries()) >= 50
+    finally:
+        stop.set()
+        thread.join()
+    assert errors == []
+    registry.close()
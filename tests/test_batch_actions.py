@@ -0,0 +1,152 @@
+"""Batch transactions, and a benchmark of 1,000 sprite updates sent one by one and through batch_sprite_update"""
+
+import time
+
+import pytest
+
+from core.Context import Context
+from core.actions_protocol import Position
+from core.Sprite import Sprite
+from net.codec import PackedCodec
+
+UPDATES = 1_000
+
+
+class FakeProtocol:
+    """Records protocol calls in order"""
+    is_connected = True
+    client_id = 'client'
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, method):
+        return lambda *args, **kwargs: self.calls.append((method, args, kwargs))
+
+
+@pytest.fixture
+def context():
+    context = Context(None, None, 800, 600)
+    context.protocol = FakeProtocol()
+    return context
+
+
+def _table(context, sprites=2):
+    table = context.add_table('batch', 100, 100)
+    for i in range(sprites):
+        table.add_sprite_to_layer(Sprite(None, f's{i}.png', coord_x=0.0, coord_y=0.0, sprite_id=f's{i}'), 'tokens')
+    return table
+
+
+def test_batch_sends_one_message_of_operations(context):
+    table = _table(context)
+    actions = context.Actions
+    with actions.batch():
+        actions.move_sprite(table.table_id, 's0', Position(5.0, 5.0))
+        actions.update_sprite(table.table_id, 's1', rotation=45.0)
+        actions.delete_sprite(table.table_id, 's1')
+
+    assert len(context.protocol.calls) == 1
+    method, (update_type, data), _ = context.protocol.calls[0]
+    assert (method, update_type) == ('send_update', 'batch')
+    assert [operation['type'] for operation in data['operations']] == ['sprite_move', 'sprite_update', 'sprite_delete']
+    assert data['operations'][0]['data']['to'] == {'x': 5.0, 'y': 5.0}
+    assert data['operations'][1]['data'] == {
+        'update_type': 'update', 'data': {'sprite_id': 's1', 'table_id': table.table_id, 'rotation': 45.0}}
+    assert all(set(operation) == {'type', 'data'} for operation in data['operations'])
+    assert len(actions.history.undo_stack) == 1
+
+
+def test_single_operation_is_sent_as_is(context):
+    table = _table(context)
+    with context.Actions.batch():
+        context.Actions.delete_sprite(table.table_id, 's0')
+    assert context.protocol.calls == [('sprite_delete', (table.table_id, 's0'), {})]
+
+
+def test_calls_without_a_message_form_keep_their_order(context):
+    table = _table(context)
+    actions = context.Actions
+    with actions.batch():
+        actions.move_sprite(table.table_id, 's0', Position(1.0, 1.0))
+        actions._send_to_server('request_table', 'other')
+        actions.move_sprite(table.table_id, 's1', Position(2.0, 2.0))
+    assert [(method, args[0]) for method, args, _ in context.protocol.calls] == [
+        ('send_update', 'batch'), ('request_table', 'other'), ('send_update', 'batch')]
+
+
+def test_nested_batch_joins_the_outer_one(context):
+    table = _table(context)
+    actions = context.Actions
+    with actions.batch():
+        actions.move_sprite(table.table_id, 's0', Position(1.0, 1.0))
+        with actions.batch():
+            actions.move_sprite(table.table_id, 's1', Position(2.0, 2.0))
+        assert context.protocol.calls == []
+    assert len(context.protocol.calls) == 1
+    assert len(actions.history.undo_stack) == 1
+
+
+def test_batch_is_encoded_with_the_agreed_codec(context):
+    table = _table(context)
+    actions = context.Actions
+    actions.wire_codec = PackedCodec()
+    with actions.batch():
+        actions.move_sprite(table.table_id, 's0', Position(1.0, 1.0))
+        actions.scale_sprite(table.table_id, 's1', 2.0, 2.0)
+
+    method, (payload,), _ = context.protocol.calls[0]
+    message = actions.wire_codec.decode(payload)
+    assert method == 'send' and message['type'] == 'batch' and message['client_id'] == 'client'
+    assert [operation['type'] for operation in message['data']['operations']] == ['sprite_move', 'sprite_scale']
+
+
+def test_batch_actions_dispatches_and_records_one_command(context):
+    table = _table(context)
+    result = context.Actions.batch_actions([
+        {'type': 'move_sprite', 'params': {'table_id': table.table_id, 'sprite_id': 's0', 'position': Position(3.0, 3.0)}},
+        {'type': 'rotate_sprite', 'params': {'table_id': table.table_id, 'sprite_id': 's1', 'angle': 90.0}},
+        {'type': 'no_such_action', 'params': {}},
+    ])
+    assert [r.success for r in result.data['results']] == [True, True, False]
+    assert len(context.protocol.calls) == 1
+    assert len(context.Actions.history.undo_stack) == 1
+    assert context.Actions.undo_action().success
+    assert table.sprite_index['s0'][1].coord_x.value == 0.0
+    assert table.sprite_index['s1'][1].rotation == 0.0
+
+
+def test_batch_sprite_update_leaves_the_updates_untouched(context):
+    table = _table(context)
+    updates = [{'sprite_id': 's0', 'rotation': 10.0}, {'rotation': 20.0}]
+    result = context.Actions.batch_sprite_update(table.table_id, updates)
+    assert updates == [{'sprite_id': 's0', 'rotation': 10.0}, {'rotation': 20.0}]
+    assert [r.success for r in result.data['results']] == [True, False]
+    assert table.sprite_index['s0'][1].rotation == 10.0
+
+
+def test_sprite_update_benchmark(context):
+    table = _table(context, sprites=UPDATES)
+    actions = context.Actions
+    updates = [{'sprite_id': f's{i}', 'rotation': float(i)} for i in range(UPDATES)]
+
+    started = time.perf_counter()
+    for update in updates:
+        actions.update_sprite(table.table_id, update['sprite_id'], rotation=update['rotation'] + 1.0)
+    before_ms = (time.perf_counter() - started) * 1000
+    before = (len(context.protocol.calls), len(actions.history.undo_stack))
+
+    context.protocol.calls.clear()
+    actions.history.undo_stack.clear()
+    started = time.perf_counter()
+    result = actions.batch_sprite_update(table.table_id, updates)
+    after_ms = (time.perf_counter() - started) * 1000
+    after = (len(context.protocol.calls), len(actions.history.undo_stack))
+
+    print(f"\n{UPDATES} sprite updates: one by one {before_ms:.1f} ms, {before[0]} messages, {before[1]} undo entries; "
+          f"batch_sprite_update {after_ms:.1f} ms, {after[0]} messages, {after[1]} undo entries")
+    assert all(r.success for r in result.data['results'])
+    assert before == (UPDATES, actions.max_history)
+    assert after == (1, 1)
+    assert len(context.protocol.calls[0][1][1]['operations']) == UPDATES
+    assert table.sprite_index[f's{UPDATES - 1}'][1].rotation == float(UPDATES - 1)
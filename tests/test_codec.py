@@ -0,0 +1,178 @@
+import json
+import math
+import random
+import struct
+
+import pytest
+
+from core.Context import Context
+from core.actions_protocol import Position
+from core.Sprite import Sprite
+from net.codec import FIELD_NAMES, JsonCodec, PackedCodec, call_to_dict, call_to_operation, negotiate_codec
+
+KEYS = list(FIELD_NAMES[:12]) + ['custom', 'ключ', '']
+
+
+def _random_float(rng):
+    kind = rng.randrange(4)
+    if kind == 0:
+        return struct.unpack('<f', struct.pack('<f', rng.uniform(-1e6, 1e6)))[0]  # Fits 32 bits
+    if kind == 1:
+        return rng.uniform(-1e300, 1e300)
+    if kind == 2:
+        return rng.choice([0.0, -0.0, 0.1, 1e-320, math.pi])
+    return float(rng.randrange(-10000, 10000))
+
+
+def _random_value(rng, depth=0):
+    kind = rng.randrange(9 if depth < 4 else 6)
+    if kind == 0:
+        return None
+    if kind == 1:
+        return rng.random() < 0.5
+    if kind == 2:
+        return rng.choice([0, 1, -1, 63, -64, 2 ** 31, -2 ** 63, 2 ** 70, rng.randrange(-10 ** 9, 10 ** 9)])
+    if kind == 3:
+        return _random_float(rng)
+    if kind in (4, 5):
+        return ''.join(rng.choice('abcxyz _-é€😀') for _ in range(rng.randrange(12)))
+    if kind == 6:
+        return [_random_value(rng, depth + 1) for _ in range(rng.randrange(6))]
+    if kind == 7:
+        return tuple(_random_value(rng, depth + 1) for _ in range(rng.randrange(6)))
+    return {rng.choice(KEYS): _random_value(rng, depth + 1) for _ in range(rng.randrange(6))}
+
+
+def _as_json(value):
+    """What a JSON round trip gives back: tuples as lists"""
+    if isinstance(value, (list, tuple)):
+        return [_as_json(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _as_json(item) for key, item in value.items()}
+    return value
+
+
+def _same(a, b):
+    if isinstance(a, float) and isinstance(b, float):
+        return struct.pack('<d', a) == struct.pack('<d', b)  # Exact, keeps the sign of zero
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_same(a[key], b[key]) for key in a)
+    return type(a) is type(b) and a == b
+
+
+@pytest.mark.parametrize('threshold', [0, 64, 1024])
+def test_packed_round_trip_random_messages(threshold):
+    rng = random.Random(threshold)
+    codec = PackedCodec(compress_threshold=threshold)
+    for _ in range(500):
+        message = {'type': 'table_sync', 'data': _random_value(rng)}
+        decoded = codec.decode(codec.encode(message))
+        assert _same(decoded, _as_json(message)), message
+
+
+def test_json_round_trip_matches_packed():
+    rng = random.Random(1)
+    json_codec, packed_codec = JsonCodec(), PackedCodec()
+    for _ in range(200):
+        message = {'type': 'sprite_move', 'data': _random_value(rng)}
+        assert _same(json_codec.decode(json_codec.encode(message)), packed_codec.decode(packed_codec.encode(message)))
+
+
+def test_large_payload_is_compressed_and_smaller_than_json():
+    sprites = {f'sprite_{i}': {'layer': 'tokens', 'coord_x': i * 20.0, 'coord_y': 40.0, 'scale_x': 1.0,
+                               'scale_y': 1.0, 'rotation': 0.0, 'texture_path': 'resources/token.png'}
+               for i in range(200)}
+    message = {'type': 'table_sync', 'data': {'table_id': 't', 'revision': 7, 'full': True,
+                                              'sprites': sprites, 'removed': []}}
+    packed = PackedCodec().encode(message)
+    assert packed[0] == 1  # zlib flag
+    assert len(packed) < len(JsonCodec().encode(message)) / 4
+    assert PackedCodec().decode(packed) == message
+
+
+def test_decode_rejects_trailing_and_unknown_data():
+    codec = PackedCodec(compress_threshold=0)
+    with pytest.raises(ValueError):
+        codec.decode(codec.encode({'type': 'x'}) + b'\x00')
+    with pytest.raises(ValueError):
+        codec.decode(b'\x00\xff')
+    with pytest.raises(ValueError):
+        codec.decode(b'')
+    with pytest.raises(TypeError):
+        codec.encode({'type': object()})
+
+
+def test_negotiation_falls_back_to_json():
+    assert negotiate_codec(['json', 'packed']).name == 'packed'
+    assert negotiate_codec(['json']).name == 'json'
+    assert negotiate_codec(['msgpack']).name == 'json'
+    assert negotiate_codec(None).name == 'json'
+
+
+def test_call_to_dict():
+    assert call_to_dict('sprite_move', ('t', 's', {'x': 1}, {'x': 2}), {}) == {
+        'type': 'sprite_move', 'data': {'table_id': 't', 'sprite_id': 's', 'from': {'x': 1}, 'to': {'x': 2}}}
+    assert call_to_dict('send_update', ('table_sync', {'full': True}), {}, client_id='c')['client_id'] == 'c'
+    assert call_to_dict('sprite_delete', ('t', 's'), {}) is None  # Batch operation only, see call_to_operation
+    assert call_to_operation('sprite_delete', ('t', 's'), {}) == {'type': 'sprite_delete', 'data': {'table_id': 't', 'sprite_id': 's'}}
+    assert call_to_operation('request_table', ('t',), {}) is None
+
+
+class RecordingProtocol:
+    """Peer that records every protocol call"""
+    is_connected = True
+    client_id = 'client'
+
+    def __init__(self):
+        self.sent = []
+        self.calls = []
+
+    def send(self, data):
+        self.sent.append(data)
+
+    def __getattr__(self, method):
+        return lambda *args, **kwargs: self.calls.append((method, args, kwargs))
+
+
+@pytest.fixture
+def context():
+    context = Context(None, None, 800, 600)
+    context.protocol = RecordingProtocol()
+    return context
+
+
+def test_welcome_agrees_codec_and_announces_it_as_json(context):
+    context.Actions.handle_welcome_message({'username': 'u', 'codecs': ['packed', 'json']})
+    assert context.Actions.wire_codec.name == 'packed'
+    assert context.protocol.calls == [('send_update', ('wire_codec', {'codec': 'packed', 'codecs': ['packed', 'json']}), {})]
+
+    context.Actions.handle_welcome_message({'username': 'u'})
+    assert context.Actions.wire_codec.name == 'json'
+
+
+def test_table_sync_and_sprite_move_use_agreed_codec(context):
+    table = context.add_table('codec', 100, 100)
+    sprite = Sprite(None, 'token.png', coord_x=1.0, coord_y=2.0, sprite_id='token')
+    table.add_sprite_to_layer(sprite, 'tokens')
+    context.Actions.negotiate_wire_codec(['packed'])
+    codec = context.Actions.wire_codec
+
+    context.sync_table_with_network(table.table_id)
+    context.Actions.move_sprite(table.table_id, 'token', Position(5.0, 6.0))
+    assert not context.protocol.calls
+    sync, move = [codec.decode(data) for data in context.protocol.sent]
+    assert sync['type'] == 'table_sync' and sync['data']['full'] and 'token' in sync['data']['sprites']
+    assert move['type'] == 'sprite_move' and move['client_id'] == 'client'
+    assert move['data'] == {'table_id': table.table_id, 'sprite_id': 'token',
+                            'from': {'x': 1.0, 'y': 2.0}, 'to': {'x': 5.0, 'y': 6.0}}
+
+
+def test_json_codec_keeps_protocol_methods(context):
+    table = context.add_table('codec', 100, 100)
+    table.add_sprite_to_layer(Sprite(None, 'token.png', coord_x=1.0, coord_y=2.0, sprite_id='token'), 'tokens')
+    context.sync_table_with_network(table.table_id)
+    assert not context.protocol.sent
+    assert [call[1][0] for call in context.protocol.calls] == ['table_sync']
+    json.dumps(context.protocol.calls[0][1][1])
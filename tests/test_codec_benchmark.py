@@ -0,0 +1,76 @@
+"""Benchmark: size and encode/decode time of the JSON and packed codecs on the messages the client sends most"""
+
+import time
+
+from core.Context import Context
+from core.actions_protocol import Position
+from core.Sprite import Sprite
+from net.codec import JsonCodec, PackedCodec, call_to_dict
+
+SPRITES = 500
+RECTANGLES = 200
+ROUNDS = 20
+
+
+class RecordingProtocol:
+    """Records protocol calls in order"""
+    is_connected = True
+    client_id = 'client'
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, method):
+        return lambda *args, **kwargs: self.calls.append((method, args, kwargs))
+
+
+def _messages():
+    context = Context(None, None, 800, 600)
+    context.protocol = RecordingProtocol()
+    table = context.add_table('bench', 4000, 4000)
+    for i in range(SPRITES):
+        sprite = Sprite(None, f'resources/asset_{i % 20}.png', coord_x=float(i % 50) * 40.5,
+                        coord_y=float(i // 50) * 40.25, sprite_id=f'sprite_{i}')
+        table.add_sprite_to_layer(sprite, 'tokens')
+    context.Actions.move_sprite(table.table_id, 'sprite_0', Position(120.5, 80.25))
+    (method, args, kwargs), = context.protocol.calls
+
+    timestamp = time.time()
+    # The fog_update message update_fog_rectangles sends as a table update
+    fog = {'category': 'table', 'type': 'fog_update', 'data': {
+        'table_id': table.table_id,
+        'hide_rectangles': [((float(i), float(i)), (float(i) + 64.0, float(i) + 48.0)) for i in range(RECTANGLES)],
+        'reveal_rectangles': [((float(i) * 2.5, 10.0), (float(i) * 2.5 + 32.0, 90.0)) for i in range(RECTANGLES // 2)],
+    }}
+    return {
+        'table_sync': call_to_dict('send_update', ('table_sync', table.sync_payload()), {}, 'client', timestamp),
+        'sprite_move': call_to_dict(method, args, kwargs, 'client', timestamp),
+        'fog_update': {'type': 'table_update', 'data': fog, 'client_id': 'client', 'timestamp': timestamp},
+    }
+
+
+def _best_us(function, rounds=ROUNDS):
+    best = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best * 1e6
+
+
+def test_codec_size_and_speed():
+    codecs = [JsonCodec(), PackedCodec()]
+    sizes = {}
+    print()
+    for name, message in _messages().items():
+        for codec in codecs:
+            data = codec.encode(message)
+            decoded = codec.decode(data)
+            assert codec.encode(decoded) == data
+            size = len(data.encode('utf-8')) if isinstance(data, str) else len(data)
+            sizes[name, codec.name] = size
+            encode_us = _best_us(lambda: codec.encode(message))
+            decode_us = _best_us(lambda: codec.decode(data))
+            print(f"{name:<12} {codec.name:<7} {size:>8} bytes  encode {encode_us:>9.1f} us  decode {decode_us:>9.1f} us")
+    for name, _ in sizes:
+        assert sizes[name, PackedCodec.name] < sizes[name, JsonCodec.name]
@@ -0,0 +1,150 @@
+import pytest
+
+import core.CommandHistory as command_history
+from core.CommandHistory import Command, CommandHistory
+from core.Context import Context
+from core.actions_protocol import Position
+from core.Sprite import Sprite
+
+
+def _move(sprite_id, old, new):
+    return {'type': 'move_sprite', 'table_id': 't', 'sprite_id': sprite_id, 'old_position': old, 'new_position': new}
+
+
+def test_command_from_action_and_inverted():
+    command = Command.from_action({'type': 'set_layer_visibility', 'table_id': 't', 'layer': 'tokens',
+                                   'old_visibility': True, 'new_visibility': False})
+    assert (command.old, command.new, command.extra) == (True, False, {'layer': 'tokens'})
+    inverted = command.inverted()
+    assert (inverted.old, inverted.new, inverted.extra) == (False, True, {'layer': 'tokens'})
+    assert not Command.from_action({'type': 'file_loaded'}).undoable
+
+
+def test_inverted_group_reverses_order():
+    first = Command.from_action(_move('a', (0, 0), (1, 1)))
+    second = Command.from_action(_move('b', (0, 0), (2, 2)))
+    inverted = Command.group([first, second]).inverted()
+    assert [(c.sprite_id, c.new) for c in inverted.extra['commands']] == [('b', (0, 0)), ('a', (0, 0))]
+
+
+def test_moves_coalesce_within_window(monkeypatch):
+    history = CommandHistory()
+    for step in range(5):
+        history.record(_move('a', (step, 0), (step + 1, 0)))
+    assert len(history.undo_stack) == 1
+    assert (history.undo_stack[-1].old, history.undo_stack[-1].new) == ((0, 0), (5, 0))
+
+    history.record(_move('b', (0, 0), (1, 0)))  # Other sprite
+    monkeypatch.setattr(command_history, 'MOVE_COALESCE_SECONDS', -1.0)
+    history.record(_move('b', (1, 0), (2, 0)))  # Outside the window
+    assert len(history.undo_stack) == 3
+
+
+def test_history_is_bounded_and_recording_clears_redo():
+    history = CommandHistory(max_history=3)
+    for i in range(5):
+        history.record({'type': 'rotate_sprite', 'sprite_id': 'a', 'old_rotation': i, 'new_rotation': i + 1})
+    assert [c.new for c in history.undo_stack] == [3, 4, 5]
+    history.push_redo(history.pop_undo())
+    assert history.redo_stack
+    history.record({'type': 'rotate_sprite', 'sprite_id': 'a', 'old_rotation': 4, 'new_rotation': 9})
+    assert not history.redo_stack
+
+
+def test_log_only_and_suspended_actions():
+    history = CommandHistory()
+    history.record({'type': 'file_loaded', 'filename': 'x'})
+    assert len(history.log) == 1 and not history.undo_stack
+    with history.suspended():
+        assert history.record(_move('a', (0, 0), (1, 1))) is None
+    assert len(history.log) == 1 and not history.is_suspended
+
+
+def test_group_records_one_entry():
+    history = CommandHistory()
+    history.begin_group()
+    history.record(_move('a', (0, 0), (1, 1)))
+    history.record({'type': 'file_loaded'})
+    history.record(_move('b', (0, 0), (1, 1)))
+    command = history.end_group()
+    assert command.type == 'batch' and len(command.extra['commands']) == 2
+    assert list(history.undo_stack) == [command]
+    history.begin_group()
+    assert history.end_group() is None
+
+
+@pytest.fixture
+def actions():
+    context = Context(None, None, 800, 600)
+    table = context.add_table('history', 100, 100)
+    for sprite_id in ('a', 'b'):
+        table.add_sprite_to_layer(Sprite(None, f'{sprite_id}.png', coord_x=0.0, coord_y=0.0, sprite_id=sprite_id), 'tokens')
+    context.Actions.table = table
+    return context.Actions
+
+
+def _sprite(actions, sprite_id):
+    return actions.table.sprite_index[sprite_id][1]
+
+
+def test_undo_redo_through_actions(actions):
+    table_id = actions.table.table_id
+    actions.move_sprite(table_id, 'a', Position(10.0, 20.0))
+    actions.scale_sprite(table_id, 'a', 2.0, 3.0)
+    actions.rotate_sprite(table_id, 'a', 90.0)
+    sprite = _sprite(actions, 'a')
+
+    assert actions.undo_action().success
+    assert sprite.rotation == 0.0
+    assert actions.undo_action().success
+    assert (sprite.scale_x, sprite.scale_y) == (1.0, 1.0)
+    assert actions.undo_action().success
+    assert (sprite.coord_x.value, sprite.coord_y.value) == (0.0, 0.0)
+    assert not actions.undo_action().success
+
+    assert actions.redo_action().success and actions.redo_action().success
+    assert (sprite.coord_x.value, sprite.scale_x) == (10.0, 2.0)
+    assert len(actions.history.undo_stack) == 2  # Undo and redo do not record
+
+
+def test_batch_undoes_in_one_step(actions):
+    table_id = actions.table.table_id
+    with actions.batch():
+        actions.move_sprite(table_id, 'a', Position(5.0, 5.0))
+        actions.move_sprite(table_id, 'b', Position(6.0, 6.0))
+    assert len(actions.history.undo_stack) == 1
+    assert actions.undo_action().success
+    assert _sprite(actions, 'a').coord_x.value == 0.0 and _sprite(actions, 'b').coord_x.value == 0.0
+
+
+def test_undo_delete_table_without_player(actions):
+    context = actions.context
+    table_id = actions.table.table_id
+    assert actions.delete_table(table_id).success
+    assert context._get_table_by_id(table_id) is None
+
+    assert actions.undo_action().success
+    restored = context._get_table_by_id(table_id)
+    assert restored is not None and len(restored.sprite_index) == 2
+    assert context.list_of_tables.count(restored) == 1
+    assert not hasattr(restored, 'player')
+
+    assert actions.redo_action().success
+    assert context._get_table_by_id(table_id) is None
+
+
+def test_failed_undo_keeps_the_command(actions, monkeypatch):
+    table_id = actions.table.table_id
+    actions.delete_table(table_id)
+    tables = list(actions.context.list_of_tables)
+
+    def broken(data):
+        raise ValueError('broken save')
+    monkeypatch.setattr(actions.context, 'create_table_from_dict', broken)
+    assert not actions.undo_action().success
+    assert actions.context.list_of_tables == tables
+    assert len(actions.history.undo_stack) == 1
+
+    monkeypatch.undo()
+    assert actions.undo_action().success
+    assert actions.context._get_table_by_id(table_id) is not None
@@ -0,0 +1,113 @@
+import time
+
+from core.Context import Context
+from core.ContextTable import ContextTable
+from core.Sprite import Sprite
+
+
+def _table_with_sprites(count, layer='tokens'):
+    table = ContextTable('index', 100, 100)
+    sprites = [Sprite(None, f'{i}.png', coord_x=float(i), coord_y=0.0, sprite_id=f's{i}') for i in range(count)]
+    for sprite in sprites:
+        table.add_sprite_to_layer(sprite, layer)
+    return table, sprites
+
+
+def test_find_sprite_uses_flat_index():
+    table, sprites = _table_with_sprites(50)
+    table.add_sprite_to_layer(Sprite(None, 'map.png', coord_x=0.0, coord_y=0.0, sprite_id='m'), 'map')
+    assert table.find_sprite('s17') is sprites[17]
+    assert table.find_sprite_layer('s17') == 'tokens'
+    assert table.find_sprite_layer('m') == 'map'
+    assert table.find_sprite('missing') is None
+
+
+def test_remove_sprite_keeps_draw_order_and_index():
+    table, sprites = _table_with_sprites(6)
+    assert table.remove_sprite_from_layer(sprites[2]) == 'tokens'
+    assert table.remove_sprite_from_layer(sprites[5]) == 'tokens'
+    assert table.remove_sprite_from_layer(sprites[5]) is None
+    assert table.dict_of_sprites_list['tokens'] == [sprites[0], sprites[1], sprites[3], sprites[4]]
+    assert table.find_sprite('s2') is None
+    assert set(table.removed_sprites) == {'s2', 's5'}
+
+
+def test_remove_sprites_in_bulk():
+    table, sprites = _table_with_sprites(10)
+    layer_list = table.dict_of_sprites_list['tokens']
+    revision = table.revision
+    assert table.remove_sprites([sprites[i] for i in (1, 4, 4, 9)]) == 3
+    # Same list object, the renderer holds a reference to it
+    assert table.dict_of_sprites_list['tokens'] is layer_list
+    assert [s.sprite_id for s in layer_list] == ['s0', 's2', 's3', 's5', 's6', 's7', 's8']
+    assert set(table.sprite_index) == {s.sprite_id for s in layer_list}
+    changed, removed = table.changes_since(revision)
+    assert changed == [] and sorted(removed) == ['s1', 's4', 's9']
+
+
+def _sized(sprite, size=10.0):
+    sprite.original_w = sprite.original_h = size
+    return sprite
+
+
+def test_hit_cache_rebuilds_only_changed_layer():
+    table = ContextTable('hits', 100, 100)
+    token = _sized(Sprite(None, 't.png', coord_x=0.0, coord_y=0.0, sprite_id='t'))
+    tile = _sized(Sprite(None, 'm.png', coord_x=50.0, coord_y=50.0, sprite_id='m'))
+    table.add_sprite_to_layer(token, 'tokens')
+    table.add_sprite_to_layer(tile, 'map')
+    assert table.sprites_at(5, 5) == [token]
+    assert table.sprites_at(55, 55) == [tile]
+    map_cache = table._hit_cache['map']
+
+    token.coord_x.value = 30.0
+    table.mark_sprite_changed(token)
+    assert table.sprites_at(5, 5) == []
+    assert table.sprites_at(35, 5) == [token]
+    assert table._hit_cache['map'] is map_cache
+
+
+def test_hit_cache_same_length_replacement():
+    table = ContextTable('hits', 100, 100)
+    old = _sized(Sprite(None, 'a.png', coord_x=0.0, coord_y=0.0, sprite_id='a'))
+    table.add_sprite_to_layer(old, 'tokens')
+    assert table.sprites_at(5, 5) == [old]
+
+    new = _sized(Sprite(None, 'b.png', coord_x=60.0, coord_y=60.0, sprite_id='b'))
+    table.remove_sprite_from_layer(old)
+    table.add_sprite_to_layer(new, 'tokens')
+    assert table.sprites_at(5, 5) == []
+    assert table.sprites_at(65, 65) == [new]
+
+
+def _lookup_seconds(lookup, sprite_ids, repeats=5):
+    """Best of repeats, time to look every id up once"""
+    best = float('inf')
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for sprite_id in sprite_ids:
+            lookup(sprite_id)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def test_lookup_cost_stays_flat_as_table_grows():
+    sprites = [Sprite(None, 'token.png', coord_x=float(i), coord_y=0.0, sprite_id=f's{i}') for i in range(50_000)]
+    timings = {}
+    for count in (1_000, 50_000):
+        context = Context(None, None, 800, 600)
+        table = context.add_table(f'grow{count}', 100, 100)
+        for sprite in sprites[:count]:
+            table.add_sprite_to_layer(sprite, 'tokens')
+        context.current_table = table
+        # The same number of lookups, spread over the whole table, last sprites included
+        sprite_ids = [f's{i * count // 1000}' for i in range(1000)] + [f's{count - 1}'] * 1000
+        assert context.find_sprite_by_id(f's{count - 1}') is sprites[count - 1]
+        timings[count] = {
+            'table': _lookup_seconds(table.find_sprite, sprite_ids),
+            'actions': _lookup_seconds(lambda sprite_id: context.Actions._find_sprite_in_table(table, sprite_id), sprite_ids),
+            'context': _lookup_seconds(context.find_sprite_by_id, sprite_ids),
+        }
+    for name in timings[1_000]:
+        # A scan of the layers would be ~50x slower on the large table
+        assert timings[50_000][name] < timings[1_000][name] * 5, (name, timings)
@@ -0,0 +1,199 @@
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import xxhash
+
+import net.DownloadManager as download_module
+from net.DownloadManager import DownloadManager, PART_SUFFIX
+
+RANGE_RE = re.compile(r'bytes=(\d+)-(\d+)')
+
+
+class FileHandler(BaseHTTPRequestHandler):
+    """Serves server.data with optional Range support, can drop connections mid body"""
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        data = server.data
+        match = RANGE_RE.match(self.headers.get('Range', ''))
+        with server.lock:
+            server.requests.append(self.headers.get('Range'))
+        if match and server.ranges:
+            start, end = int(match.group(1)), int(match.group(2))
+            if not data:
+                self.send_response(416)
+                self.send_header('Content-Range', 'bytes */0')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            end = min(end, len(data) - 1)
+            body = data[start:end + 1]
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(data)}')
+        else:
+            start, body = 0, data
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', '"v1"')
+        self.end_headers()
+        with server.lock:
+            drop = server.drop_once.pop(start, None) if len(body) > 1 else None
+        if drop is not None:
+            self.wfile.write(body[:drop])  # Truncated, then the connection closes
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def do_PUT(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        with self.server.lock:
+            self.server.uploads.append((self.path, body))
+        self.send_response(200)
+        self.send_header('ETag', f'"{xxhash.xxh64(body).hexdigest()}"')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FileHandler)
+    server.daemon_threads = True
+    server.data = b''
+    server.ranges = True
+    server.drop_once = {}  # Range start -> bytes sent before dropping the connection
+    server.requests = []
+    server.uploads = []
+    server.lock = threading.Lock()
+    server.url = f'http://127.0.0.1:{server.server_address[1]}/file.bin'
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(download_module, 'SEGMENT_THRESHOLD', 64 * 1024)
+    monkeypatch.setattr(download_module, 'MIN_SEGMENT_SIZE', 32 * 1024)
+    monkeypatch.setattr(download_module, 'MIN_CHUNK_SIZE', 4 * 1024)
+    monkeypatch.setattr(download_module, 'STATE_SAVE_BYTES', 8 * 1024)
+    monkeypatch.setattr(download_module, 'BACKOFF_BASE_SECONDS', 0.01)
+    manager = DownloadManager(tmp_path / 'downloads')
+    yield manager
+    manager.close()
+
+
+def _payload(size):
+    return bytes((i * 7 + i // 256) % 256 for i in range(size))
+
+
+def _segment_requests(server):
+    return [r for r in server.requests if r != 'bytes=0-0']
+
+
+def test_segmented_download(server, manager, tmp_path):
+    server.data = _payload(200 * 1024)
+    target = tmp_path / 'out.bin'
+    size, segments, resumed = manager._download_to_file(server.url, target)
+    assert (size, segments, resumed) == (len(server.data), 4, False)
+    assert target.read_bytes() == server.data
+    assert len(_segment_requests(server)) == 4
+    assert not target.with_name('out.bin' + PART_SUFFIX).exists()
+    assert not target.with_name('out.bin' + PART_SUFFIX + '.json').exists()
+
+
+def test_resume_from_part_and_state(server, manager, tmp_path):
+    server.data = _payload(200 * 1024)
+    target = tmp_path / 'out.bin'
+    part_path = target.with_name('out.bin' + PART_SUFFIX)
+    state_path = part_path.with_name(part_path.name + '.json')
+    segments = manager._plan_segments(len(server.data))
+    # First segment complete, second half done, the rest not started
+    part = bytearray(len(server.data))
+    first, second = segments[0], segments[1]
+    part[:first[1] + 1] = server.data[:first[1] + 1]
+    first[2] = first[1] - first[0] + 1
+    half = (second[1] - second[0] + 1) // 2
+    part[second[0]:second[0] + half] = server.data[second[0]:second[0] + half]
+    second[2] = half
+    part_path.write_bytes(bytes(part))
+    state_path.write_text(json.dumps({'size': len(server.data), 'etag': '"v1"', 'segments': segments}))
+
+    size, _, resumed = manager._download_to_file(server.url, target)
+    assert resumed and size == len(server.data)
+    assert target.read_bytes() == server.data
+    requested = sorted(_segment_requests(server))
+    assert f'bytes={second[0] + half}-{second[1]}' in requested
+    assert not any(r.startswith(f'bytes={first[0]}-') for r in requested)
+    assert not state_path.exists()
+
+
+def test_retry_after_dropped_connection(server, manager, tmp_path):
+    server.data = _payload(200 * 1024)
+    segments = manager._plan_segments(len(server.data))
+    server.drop_once = {segments[2][0]: 10 * 1024}
+    started = time.perf_counter()
+    target = tmp_path / 'out.bin'
+    manager._download_to_file(server.url, target)
+    assert target.read_bytes() == server.data
+    # The dropped segment was requested again, from where its flushed progress ended
+    retried = [r for r in _segment_requests(server) if int(RANGE_RE.match(r).group(2)) == segments[2][1]]
+    assert len(retried) == 2
+    assert time.perf_counter() - started >= download_module.BACKOFF_BASE_SECONDS * 0.5
+
+
+def test_server_without_range_support(server, manager, tmp_path):
+    server.data = _payload(100 * 1024)
+    server.ranges = False
+    target = tmp_path / 'out.bin'
+    assert manager._download_to_file(server.url, target) == (len(server.data), 1, False)
+    assert target.read_bytes() == server.data
+    assert server.requests == ['bytes=0-0', None]
+
+
+def test_zero_byte_file(server, manager, tmp_path):
+    target = tmp_path / 'empty.bin'
+    assert manager._download_to_file(server.url, target) == (0, 1, False)
+    assert target.exists() and target.read_bytes() == b''
+
+
+def test_download_async_reports_hash(server, manager):
+    server.data = _payload(100 * 1024)
+    expected = xxhash.xxh64(server.data).hexdigest()
+    manager.download_file_async(server.url, 'async.bin', expected_hash=expected)
+    deadline = time.monotonic() + 10
+    completed = []
+    while not completed and time.monotonic() < deadline:
+        completed = manager.process_completed_operations()
+        time.sleep(0.01)
+    operation, = completed
+    assert operation['success'] and operation['hash_valid'] and operation['size'] == len(server.data)
+
+
+def test_multipart_upload(server, manager, tmp_path):
+    source = tmp_path / 'upload.bin'
+    data = _payload(100 * 1024)
+    source.write_bytes(data)
+    base = server.url.rsplit('/', 1)[0]
+    part_urls = [f'{base}/part{i}' for i in range(1, 4)]
+    manager.upload_file_async(source, part_urls[0], metadata={'part_urls': part_urls})
+    deadline = time.monotonic() + 10
+    result = None
+    while result is None and time.monotonic() < deadline:
+        for operation in manager.process_completed_operations():
+            if operation['type'] == 'upload':
+                result = operation
+        time.sleep(0.01)
+    assert result['success'] and result['hash'] == xxhash.xxh64(data).hexdigest()
+    assert b''.join(body for _, body in sorted(server.uploads)) == data
+    assert [part['part_number'] for part in result['parts']] == [1, 2, 3]
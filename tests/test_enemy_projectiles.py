@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+
+import pytest
+
+import core.Enemies.Mage_1 as mage_module
+from core.Enemies.Mage_1 import Mage_1
+from core.EnemyManager import EnemyManager
+
+
+@pytest.fixture(autouse=True)
+def no_sounds(monkeypatch):
+    # SDL_mixer is not loaded in tests
+    monkeypatch.setattr(mage_module.sdl3, 'Mix_LoadWAV', lambda path: None, raising=False)
+
+
+class RecordingProjectileManager:
+    def __init__(self):
+        self.types = {}
+        self.spawned = []
+
+    def register_type(self, name, sprite_path, atlas_path, **kwargs):
+        self.types.setdefault(name, (sprite_path, atlas_path, kwargs))
+
+    def spawn(self, type_name, x, y, dir_x, dir_y, rotation=0.0, owner_is_player=False):
+        assert type_name in self.types
+        self.spawned.append((type_name, x, y, dir_x, dir_y, owner_is_player))
+        return len(self.spawned) - 1
+
+
+def test_mage_projectiles_spawn_into_the_pool():
+    projectile_manager = RecordingProjectileManager()
+    manager = EnemyManager()
+    manager.context = SimpleNamespace(ProjectileManager=None)
+    mage = Mage_1(coord_x=0.0, coord_y=0.0)
+    manager.enemies.append(mage)
+    manager.register_projectiles(projectile_manager)
+    assert set(projectile_manager.types) == {'Mage_1_electro', 'Mage_1_fireball'}
+    assert projectile_manager.types['Mage_1_fireball'][2]['lifetime'] == mage_module.PROJECTILE_LIFETIME
+
+    mage.context = SimpleNamespace(ProjectileManager=projectile_manager, player=SimpleNamespace(
+        coord_x=SimpleNamespace(value=30.0), coord_y=SimpleNamespace(value=40.0)))
+    mage.create_projectile('fireball')
+    assert projectile_manager.spawned == [('Mage_1_fireball', 0.0, 0.0, 0.6, 0.8, False)]
+
+
+def test_mage_without_projectile_manager_does_not_shoot():
+    mage = Mage_1(coord_x=0.0, coord_y=0.0)
+    mage.context = SimpleNamespace(player=SimpleNamespace(
+        coord_x=SimpleNamespace(value=30.0), coord_y=SimpleNamespace(value=40.0)))
+    mage.create_projectile('fireball')  # Must not raise
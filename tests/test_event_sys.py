@@ -0,0 +1,42 @@
+import core.event_sys as event_sys
+from core.Context import Context
+from core.Sprite import Sprite
+
+
+def test_drag_end_records_one_undoable_move():
+    context = Context(None, None, 800, 600)
+    table = context.add_table('drag', 100, 100)
+    sprite = Sprite(None, 'token.png', coord_x=10.0, coord_y=20.0, sprite_id='token')
+    table.add_sprite_to_layer(sprite, 'tokens')
+    context.current_table = table
+
+    sprite._drag_start_x, sprite._drag_start_y = 10.0, 20.0
+    for step in range(1, 6):  # Motion events move the sprite directly
+        sprite.coord_x.value = 10.0 + step * 3
+        sprite.coord_y.value = 20.0 + step
+    event_sys.handle_drag_end(context, sprite)
+
+    assert (sprite.coord_x.value, sprite.coord_y.value) == (25.0, 25.0)
+    history = context.Actions.history
+    assert len(history.undo_stack) == 1
+    command = history.undo_stack[-1]
+    assert command.type == 'move_sprite'
+    assert command.old == (10.0, 20.0) and command.new == (25.0, 25.0)
+
+    assert context.Actions.undo_action().success
+    assert (sprite.coord_x.value, sprite.coord_y.value) == (10.0, 20.0)
+    assert context.Actions.redo_action().success
+    assert (sprite.coord_x.value, sprite.coord_y.value) == (25.0, 25.0)
+
+
+def test_click_without_drag_records_nothing():
+    context = Context(None, None, 800, 600)
+    table = context.add_table('click', 100, 100)
+    sprite = Sprite(None, 'token.png', coord_x=10.0, coord_y=20.0, sprite_id='token')
+    table.add_sprite_to_layer(sprite, 'tokens')
+    context.current_table = table
+
+    event_sys.handle_drag_end(context, sprite)
+    sprite._drag_start_x, sprite._drag_start_y = 10.0, 20.0
+    event_sys.handle_drag_end(context, sprite)
+    assert not context.Actions.history.undo_stack
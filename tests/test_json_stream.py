@@ -0,0 +1,72 @@
+import io
+import json
+
+import pytest
+
+from storage.json_stream import JsonStreamReader, iter_json_file
+
+CHUNK_SIZES = list(range(1, 20)) + [31, 64, 257]
+
+DOCUMENTS = [
+    {"layers": {"tokens": [{"coord_x": 123.5}, 1.25]}},
+    {
+        "table_name": "Crypt é \"quoted\"",
+        "width": 1920,
+        "scale": 1.0e-3,
+        "layers": {
+            "map": [{"texture_path": "a.png", "coord_x": -12.75, "coord_y": 3e5, "visible": True}],
+            "tokens": {"id-1": {"texture_path": "b.png", "rotation": -0.0, "tags": [None, False, 10, -7]}},
+            "light": [],
+            "fog_of_war": {},
+        },
+        "player": {"name": "p", "speed_x": 1.5E+2},
+    },
+    {"grid_size": 32, "tiles": {"0,0": {"x": 0, "y": 0}, "1,0": {"x": 1, "y": 0.5}}, "width": 64},
+]
+
+
+def _rebuild(path, container_key, nested, chunk_size):
+    data = {}
+    container = {}
+    for event in iter_json_file(path, container_key, nested=nested, chunk_size=chunk_size):
+        if event[0] == 'header':
+            data.update(event[1])
+            data.setdefault(container_key, container)
+            continue
+        _, group, key, value = event
+        target = container.setdefault(group, {}) if nested else container
+        target[key] = value
+    return data
+
+
+def _normalized(document, container_key, nested):
+    """Arrays in the container come back as index -> value dicts"""
+    container = document[container_key]
+
+    def as_dict(entries):
+        return dict(enumerate(entries)) if isinstance(entries, list) else dict(entries)
+
+    if nested:
+        container = {group: as_dict(entries) for group, entries in container.items() if entries}
+    else:
+        container = as_dict(container)
+    return {**document, container_key: container}
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("index", range(len(DOCUMENTS)))
+def test_iter_json_file_matches_json_load(tmp_path, chunk_size, index):
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps(DOCUMENTS[index]), encoding='utf-8')
+    with open(path, encoding='utf-8') as f:
+        expected = json.load(f)
+    container_key, nested = ('tiles', False) if 'tiles' in expected else ('layers', True)
+    assert _rebuild(path, container_key, nested, chunk_size) == _normalized(expected, container_key, nested)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_read_value_numbers_across_chunks(chunk_size):
+    values = [0, -1, 1.25, 123.5, -0.5e-3, 1e10, 12345678901234567890, 2.5E+2]
+    text = json.dumps(values, indent=1)
+    reader = JsonStreamReader(io.StringIO(text), chunk_size)
+    assert list(reader.iter_array()) == json.loads(text)
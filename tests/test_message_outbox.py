@@ -0,0 +1,89 @@
+import pytest
+
+from core.Context import Context
+from core.MessageOutbox import MessageOutbox
+from core.actions_protocol import Position
+from core.Sprite import Sprite
+
+
+class FakeProtocol:
+    """Records protocol calls in order"""
+    is_connected = True
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, method):
+        return lambda *args, **kwargs: self.calls.append((method, args))
+
+
+@pytest.fixture
+def context():
+    context = Context(None, None, 800, 600)
+    context.protocol = FakeProtocol()
+    context.MessageOutbox = MessageOutbox(context, flush_hz=10)
+    return context
+
+
+@pytest.fixture
+def table(context):
+    table = context.add_table('outbox', 100, 100)
+    for sprite_id in ('a', 'b'):
+        table.add_sprite_to_layer(Sprite(None, f'{sprite_id}.png', coord_x=0.0, coord_y=0.0, sprite_id=sprite_id), 'tokens')
+    return table
+
+
+def test_moves_coalesce_to_first_start_and_last_target(context, table):
+    actions = context.Actions
+    for step in range(1, 11):
+        actions.move_sprite(table.table_id, 'a', Position(float(step), 0.0))
+    assert context.protocol.calls == []
+    outbox = context.MessageOutbox
+    assert outbox.stats['queued'] == 10 and outbox.stats['suppressed'] == 9
+
+    assert outbox.flush() == 1
+    assert context.protocol.calls == [('sprite_move', (table.table_id, 'a', {'x': 0.0, 'y': 0.0}, {'x': 10.0, 'y': 0.0}))]
+
+
+def test_one_slot_per_sprite_and_method(context, table):
+    actions = context.Actions
+    actions.move_sprite(table.table_id, 'a', Position(1.0, 0.0))
+    actions.move_sprite(table.table_id, 'b', Position(2.0, 0.0))
+    actions.scale_sprite(table.table_id, 'a', 2.0, 2.0)
+    actions.scale_sprite(table.table_id, 'a', 3.0, 3.0)
+    actions.rotate_sprite(table.table_id, 'a', 90.0)
+    context.MessageOutbox.flush()
+    calls = context.protocol.calls
+    assert [(method, args[1]) for method, args in calls] == [
+        ('sprite_move', 'a'), ('sprite_move', 'b'), ('sprite_scale', 'a'), ('sprite_rotate', 'a')]
+    assert calls[2][1][2:] == (3.0, 3.0)
+
+
+def test_other_sends_flush_pending_first(context, table):
+    actions = context.Actions
+    actions.move_sprite(table.table_id, 'a', Position(1.0, 0.0))
+    actions.delete_sprite(table.table_id, 'b')
+    assert [method for method, _ in context.protocol.calls] == ['sprite_move', 'sprite_delete']
+    assert not context.MessageOutbox.has_pending()
+
+
+def test_update_flushes_at_interval():
+    context = Context(None, None, 800, 600)
+    context.protocol = FakeProtocol()
+    outbox = MessageOutbox(context, flush_hz=10)
+    outbox.put('sprite_move', 't', 'a', {'x': 0}, {'x': 1})
+    start = outbox._last_flush
+    outbox.update(now=start + 0.05)
+    assert context.protocol.calls == []
+    outbox.update(now=start + 0.11)
+    assert len(context.protocol.calls) == 1
+    outbox.update(now=start + 0.3)
+    assert len(context.protocol.calls) == 1
+
+
+def test_flush_without_protocol_drops_messages():
+    context = Context(None, None, 800, 600)
+    outbox = MessageOutbox(context)
+    outbox.put('sprite_move', 't', 'a', {'x': 0}, {'x': 1})
+    assert outbox.flush() == 0
+    assert not outbox.has_pending()
@@ -0,0 +1,46 @@
+import numpy as np
+
+import core.PathfindingManager as pathfinding
+from core.PathfindingManager import PathfindingManager
+
+
+def _manager(rows=120, cols=120):
+    manager = PathfindingManager()
+    manager.rows, manager.cols = rows, cols
+    manager.coverage = np.zeros((rows, cols), dtype=np.int16)
+    manager.blocked = np.zeros((rows, cols), dtype=bool)
+    manager.blocked[40:80, 60] = True  # Wall between the goal and the west side
+    return manager
+
+
+def test_flow_field_is_built_over_frames():
+    manager = _manager()
+    goal = (60, 70)
+    assert manager.get_flow_field(goal) is None
+    frames = 0
+    while manager.get_flow_field(goal) is None:
+        manager.update(budget_ms=0.0)  # One relaxation pass per frame
+        frames += 1
+    field = manager.get_flow_field(goal)
+    expected = manager._build_flow_field(goal)
+    assert frames > 1
+    np.testing.assert_array_equal(field.distance, expected.distance)
+    np.testing.assert_array_equal(field.dir_x, expected.dir_x)
+    np.testing.assert_array_equal(field.dir_y, expected.dir_y)
+    assert manager.stats['flow_misses'] == 1
+
+
+def test_only_latest_goals_stay_pending():
+    manager = _manager()
+    for col in range(10, 10 + pathfinding.FLOW_FIELD_PENDING + 3):
+        manager.get_flow_field((60, col))
+    assert len(manager._flow_builds) == pathfinding.FLOW_FIELD_PENDING
+    assert next(reversed(manager._flow_builds)) == (60, 10 + pathfinding.FLOW_FIELD_PENDING + 2)
+
+
+def test_obstacle_change_drops_pending_builds():
+    manager = _manager()
+    manager.get_flow_field((60, 70))
+    manager.obstacle_version += 1
+    manager.update()
+    assert not manager._flow_builds and not manager._flow_cache
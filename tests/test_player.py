@@ -0,0 +1,25 @@
+from types import SimpleNamespace
+
+from core.Context import Context
+from core.Player import Player
+
+
+def test_create_bullet_without_projectile_manager():
+    context = Context(None, None, 800, 600)
+    assert getattr(context, 'ProjectileManager', None) is None
+    player = Player('p', context=context)
+    player.create_bullet()  # Nothing to spawn into, must not raise
+
+
+def test_create_bullet_spawns_toward_mouse(monkeypatch):
+    import core.Player as player_module
+    context = Context(None, None, 800, 600)
+    context.current_table = SimpleNamespace(screen_to_table=lambda x, y: (30.0, 40.0))
+    spawned = []
+    context.ProjectileManager = SimpleNamespace(spawn=lambda *args, **kwargs: spawned.append((args, kwargs)))
+    monkeypatch.setattr(player_module.sdl3, 'SDL_GetMouseState', lambda x, y: 0)
+    player = Player('p', context=context)
+    player.coord_x.value, player.coord_y.value = 0.0, 0.0
+    player.create_bullet()
+    (args, kwargs), = spawned
+    assert args[3:5] == (0.6, 0.8) and kwargs['owner_is_player']
@@ -0,0 +1,96 @@
+"""Benchmark: a large table file streamed through StreamingTableLoader against json.load and create_table_from_dict"""
+
+import json
+import time
+import tracemalloc
+
+from core.Context import Context
+from core.StreamingTableLoader import StreamingTableLoader
+
+SPRITES = 10_000
+ASSETS = 50
+
+
+class CountingAssetManager:
+    """Counts texture loads instead of loading them"""
+
+    def __init__(self):
+        self.loads = 0
+
+    def load_asset_for_sprites(self, sprites, texture_path, asset_id=None):
+        self.loads += 1
+        return 1
+
+
+def _write_table(path):
+    tokens = [{
+        'sprite_id': f'sprite_{i}',
+        'texture_path': f'resources/asset_{i % ASSETS}.png',
+        'asset_id': f'asset_{i % ASSETS}',
+        'coord_x': float(i % 100) * 20.0,
+        'coord_y': float(i // 100) * 20.0,
+        'scale_x': 1.0,
+        'scale_y': 1.0,
+        'layer': 'tokens',
+    } for i in range(SPRITES)]
+    data = {'table_name': 'bench', 'width': 2000, 'height': 2000, 'layers': {'tokens': tokens}}
+    path.write_text(json.dumps(data), encoding='utf-8')
+
+
+def _context():
+    context = Context(None, None, 800, 600)
+    context.AssetManager = CountingAssetManager()
+    return context
+
+
+def _load_whole(path):
+    """Baseline: the first sprite exists once the whole file is decoded and built"""
+    context = _context()
+    started = time.perf_counter()
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    table = context.create_table_from_dict(data)
+    return table, (time.perf_counter() - started) * 1000
+
+
+def _stream(path):
+    context = _context()
+    loader = StreamingTableLoader(context)
+    try:
+        loader.load(path)
+        deadline = time.monotonic() + 60
+        while loader.is_loading():
+            assert time.monotonic() < deadline, "Loader did not progress"
+            loader.update()
+            time.sleep(0)
+    finally:
+        loader.close()
+    return context.current_table, loader.last_load
+
+
+def _peak_bytes(load, path):
+    tracemalloc.start()
+    try:
+        load(path)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_stream_shows_first_sprite_early_with_lower_peak_memory(tmp_path):
+    path = tmp_path / 'big.json'
+    _write_table(path)
+
+    table, whole_ms = _load_whole(path)
+    assert len(table.sprite_index) == SPRITES
+    table, stats = _stream(path)
+    assert len(table.sprite_index) == stats['sprites'] == SPRITES
+
+    whole_peak = _peak_bytes(_load_whole, path)
+    stream_peak = _peak_bytes(_stream, path)
+
+    print(f"\n{SPRITES} sprites, {path.stat().st_size / 1e6:.1f} MB: json.load first sprite {whole_ms:.1f} ms, "
+          f"peak {whole_peak / 1e6:.1f} MB; streamed first sprite {stats['first_sprite_ms']:.1f} ms, "
+          f"all in {stats['total_ms']:.1f} ms, peak {stream_peak / 1e6:.1f} MB")
+    assert stats['first_sprite_ms'] < whole_ms
+    assert stream_peak < whole_peak
@@ -0,0 +1,115 @@
+import json
+import time
+
+from core.StreamingTableLoader import StreamingTableLoader
+from core.TableAutosave import TableAutosave
+from core.actions_protocol import ActionResult
+
+
+class FakeTable:
+    layers = ['map', 'tokens']
+
+    def __init__(self, header):
+        self.table_id = header.get('table_id', 'table-1')
+        self.name = header.get('table_name')
+        self.sprites = []
+        self.revision = 0
+
+
+class FakeSprite:
+    is_player = False
+    asset_id = None
+
+
+class FakeActions:
+    def __init__(self):
+        self.saved = []
+
+    def save_table(self, table_id, table_name):
+        self.saved.append(table_id)
+        return ActionResult(True)
+
+
+class FakeContext:
+    """The Context helpers StreamingTableLoader builds tables with"""
+
+    def __init__(self):
+        self.list_of_tables = []
+        self.current_table = None
+        self.Actions = FakeActions()
+
+    def _table_from_header(self, header):
+        return FakeTable(header)
+
+    def _register_table(self, table):
+        self.list_of_tables.append(table)
+
+    def _sprite_layer(self, table, layer, sprite_data):
+        return layer if isinstance(sprite_data, dict) and sprite_data.get('texture_path') else None
+
+    def _add_sprite_from_dict(self, table, layer, sprite_data):
+        table.sprites.append(sprite_data)
+        table.revision += 1
+        return FakeSprite()
+
+    def _bind_sprite_textures(self, groups):
+        return len(groups)
+
+    def _attach_player(self, table, player_data, player_sprites):
+        table.player = player_data
+
+
+def _write_table(path, count):
+    data = {
+        'table_id': 'big', 'table_name': 'big',
+        'layers': {'map': [{'texture_path': f'{i % 7}.png', 'coord_x': i} for i in range(count)],
+                   'tokens': [{'texture_path': 'token.png'}, 5]},
+        'player': {'name': 'p'},
+    }
+    path.write_text(json.dumps(data), encoding='utf-8')
+
+
+def _run(loader, condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Loader did not progress"
+        loader.update()
+        time.sleep(0.001)
+
+
+def test_streams_all_sprites_and_attaches_player(tmp_path):
+    path = tmp_path / 'table.json'
+    _write_table(path, 3000)
+    context = FakeContext()
+    loader = StreamingTableLoader(context, budget_ms=1.0)
+    loader.load(path)
+    _run(loader, lambda: not loader.is_loading())
+    table = context.current_table
+    assert len(table.sprites) == 3001
+    assert loader.last_load['skipped'] == 1
+    assert table.player == {'name': 'p'}
+    assert not loader.is_incomplete(table)
+
+
+def test_autosave_skips_table_while_streaming(tmp_path):
+    path = tmp_path / 'table.json'
+    _write_table(path, 20000)
+    context = FakeContext()
+    loader = StreamingTableLoader(context, budget_ms=0.05)
+    context.StreamingTableLoader = loader
+    context.TableAutosave = autosave = TableAutosave(context, interval_seconds=1.0)
+    loader.load(path)
+    _run(loader, lambda: context.current_table is not None and context.current_table.sprites)
+
+    assert loader.is_loading()
+    assert loader.is_incomplete(context.current_table)
+    autosave.update(now=time.monotonic() + 10)
+    assert context.Actions.saved == []
+
+    _run(loader, lambda: not loader.is_loading())
+    # Loaded table matches its file
+    autosave.update(now=time.monotonic() + 20)
+    assert context.Actions.saved == []
+    context.current_table.revision += 1
+    autosave.update(now=time.monotonic() + 30)
+    assert context.Actions.saved == ['big']
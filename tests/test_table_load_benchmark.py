@@ -0,0 +1,64 @@
+"""Benchmark: bulk construction of a synthetic 10k sprite table through Context.create_table_from_dict"""
+
+import time
+
+from core.Context import Context
+
+SPRITES = 10_000
+ASSETS = 50
+
+
+class CountingAssetManager:
+    """Counts texture loads, one call per unique asset"""
+
+    def __init__(self):
+        self.loads = []
+
+    def load_asset_for_sprites(self, sprites, texture_path, asset_id=None):
+        self.loads.append((texture_path, asset_id, len(sprites)))
+        return 1
+
+
+def _table_dict(sprites=SPRITES, assets=ASSETS):
+    tokens = [{
+        'sprite_id': f'sprite_{i}',
+        'texture_path': f'resources/asset_{i % assets}.png',
+        'asset_id': f'asset_{i % assets}',
+        'coord_x': float(i % 100) * 20.0,
+        'coord_y': float(i // 100) * 20.0,
+        'scale_x': 1.0,
+        'scale_y': 1.0,
+        'layer': 'tokens',
+    } for i in range(sprites)]
+    return {'table_name': 'bench', 'width': 2000, 'height': 4000, 'layers': {'tokens': tokens}}
+
+
+def test_bulk_load_issues_one_texture_load_per_asset():
+    context = Context(None, None, 800, 600)
+    context.AssetManager = CountingAssetManager()
+    data = _table_dict()
+
+    started = time.perf_counter()
+    table = context.create_table_from_dict(data)
+    total_ms = (time.perf_counter() - started) * 1000
+
+    stats = context.last_table_load
+    print(f"\n{SPRITES} sprites, {ASSETS} assets in {total_ms:.1f} ms: parse {stats['parse_ms']:.1f} ms, "
+          f"build {stats['build_ms']:.1f} ms, bind {stats['bind_ms']:.1f} ms")
+    assert stats['sprites'] == len(table.sprite_index) == SPRITES
+    assert stats['texture_loads'] == stats['unique_assets'] == ASSETS
+    loads = context.AssetManager.loads
+    assert len(loads) == ASSETS
+    assert sorted(asset_id for _, asset_id, _ in loads) == sorted(f'asset_{i}' for i in range(ASSETS))
+    assert all(count == SPRITES // ASSETS for _, _, count in loads)
+
+
+def test_invalid_sprites_are_skipped_without_loads():
+    context = Context(None, None, 800, 600)
+    context.AssetManager = CountingAssetManager()
+    data = _table_dict(sprites=10, assets=2)
+    data['layers']['tokens'] += [{'sprite_id': 'broken'}, 'not a sprite']
+    context.create_table_from_dict(data)
+    assert context.last_table_load['sprites'] == 10
+    assert context.last_table_load['skipped'] == 2
+    assert len(context.AssetManager.loads) == 2
@@ -0,0 +1,67 @@
+import copy
+import json
+import threading
+
+from core.Context import Context
+from core.ContextTable import table_dict_from_snapshot
+from core.Sprite import Sprite
+
+
+def _table():
+    context = Context(None, None, 800, 600)
+    table = context.add_table('snapshot', 100, 100)
+    for i in range(20):
+        table.add_sprite_to_layer(Sprite(None, f'{i}.png', coord_x=float(i), coord_y=1.0, sprite_id=f's{i}'), 'tokens')
+    return table
+
+
+def _mutate(table, step=0):
+    sprites = list(table.dict_of_sprites_list['tokens'])
+    for sprite in sprites[:10]:
+        sprite.coord_x.value += 100.0 + step
+        sprite.scale_x = 3.0
+        sprite.rotation = 45.0
+        table.mark_sprite_changed(sprite)
+    table.remove_sprite_from_layer(sprites[-1])
+    table.add_sprite_to_layer(Sprite(None, 'new.png', coord_x=5.0, coord_y=5.0, sprite_id=f'new{step}'), 'tokens')
+    table.width = 999 + step
+    table.name = f'renamed{step}'
+
+
+def test_save_dict_of_snapshot_ignores_later_changes():
+    table = _table()
+    expected = copy.deepcopy(table.save_to_dict())
+    snapshot = table.snapshot()
+    _mutate(table)
+    assert table_dict_from_snapshot(snapshot) == expected
+    assert table.save_to_dict() != expected
+
+
+def test_snapshot_serializes_while_main_thread_mutates():
+    table = _table()
+    expected = json.dumps(table.save_to_dict(), sort_keys=True)
+    snapshot = table.snapshot()
+    results = []
+    stop = threading.Event()
+
+    def worker():  # Storage thread
+        while not stop.is_set() or not results:
+            results.append(json.dumps(table_dict_from_snapshot(snapshot), sort_keys=True))
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    for step in range(50):
+        _mutate(table, step)
+    stop.set()
+    thread.join()
+    assert set(results) == {expected}
+
+
+def test_snapshot_holds_no_live_sprite_state():
+    table = _table()
+    snapshot = table.snapshot()
+    for sprites in snapshot['layers'].values():
+        for fields, values in sprites:
+            assert isinstance(values, tuple) and len(fields) == len(values)
+            # Plain values only, nothing the main thread keeps mutating (c_float coords, sprites)
+            assert all(type(value).__module__ == 'builtins' for value in values)
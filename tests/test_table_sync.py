@@ -0,0 +1,92 @@
+import pytest
+
+import core.ContextTable as context_table
+from core.Context import Context
+from core.Sprite import Sprite
+
+
+class LoopbackProtocol:
+    """Peer that applies every table_sync to a mirror and acks it straight back"""
+    is_connected = True
+
+    def __init__(self, context):
+        self.context = context
+        self.mirror = {}
+        self.syncs = []
+
+    def send_update(self, update_type, data):
+        assert update_type == 'table_sync'
+        self.syncs.append(data)
+        if data['full']:
+            self.mirror = {}
+        self.mirror.update(data['sprites'])
+        for sprite_id in data['removed']:
+            self.mirror.pop(sprite_id, None)
+        self.context.Actions.handle_table_sync_ack({'table_id': data['table_id'], 'revision': data['revision']})
+
+
+@pytest.fixture
+def context():
+    context = Context(None, None, 800, 600)
+    context.protocol = LoopbackProtocol(context)
+    return context
+
+
+def _add_sprites(table, count):
+    sprites = [Sprite(None, f'{i}.png', coord_x=float(i), coord_y=0.0, sprite_id=f's{i}') for i in range(count)]
+    for sprite in sprites:
+        table.add_sprite_to_layer(sprite, 'tokens')
+    return sprites
+
+
+def _expected_mirror(table):
+    return {sprite_id: table._sprite_sync_data(layer, sprite) for sprite_id, (layer, sprite) in table.sprite_index.items()}
+
+
+def test_sync_sends_deltas_after_ack(context):
+    table = context.add_table('sync', 100, 100)
+    sprites = _add_sprites(table, 5)
+    protocol = context.protocol
+
+    context.sync_table_with_network(table.table_id)
+    assert protocol.syncs[-1]['full'] and len(protocol.syncs[-1]['sprites']) == 5
+    assert context.table_sync_acks[table.table_id] == table.revision
+
+    sprites[1].coord_x.value = 50.0
+    table.mark_sprite_changed(sprites[1])
+    table.remove_sprite_from_layer(sprites[2])
+    context.sync_table_with_network(table.table_id)
+    delta = protocol.syncs[-1]
+    assert not delta['full']
+    assert list(delta['sprites']) == ['s1']
+    assert delta['removed'] == ['s2']
+    assert protocol.mirror == _expected_mirror(table)
+    # Acked removals are no longer kept
+    assert table.removed_sprites == {}
+
+
+def test_resync_request_sends_full_snapshot(context):
+    table = context.add_table('resync', 100, 100)
+    _add_sprites(table, 3)
+    context.sync_table_with_network(table.table_id)
+    context.protocol.mirror = {}
+
+    context.Actions.handle_table_resync_request({'table_id': table.table_id})
+    assert context.protocol.syncs[-1]['full']
+    assert context.protocol.mirror == _expected_mirror(table)
+
+
+def test_removed_sprites_are_capped(context, monkeypatch):
+    monkeypatch.setattr(context_table, 'MAX_REMOVED_SPRITES', 4)
+    table = context.add_table('capped', 100, 100)
+    sprites = _add_sprites(table, 10)
+    context.sync_table_with_network(table.table_id)
+    acked = table.revision
+    context.protocol.is_connected = False  # Peer misses the removals
+
+    for sprite in sprites[:8]:
+        table.remove_sprite_from_layer(sprite)
+    assert len(table.removed_sprites) == 4
+    # Removals of s0..s3 were dropped, a peer at the acked revision needs a full snapshot
+    assert table.sync_payload(acked)['full']
+    assert not table.sync_payload(table.removed_floor)['full']
@@ -0,0 +1,51 @@
+import ctypes
+
+import pytest
+
+import core.TextureCache as texture_cache_module
+from core.TextureCache import BYTES_PER_PIXEL, TextureCache
+
+
+@pytest.fixture
+def destroyed(monkeypatch):
+    destroyed = []
+    monkeypatch.setattr(texture_cache_module.sdl3, 'SDL_DestroyTexture',
+                        lambda texture: destroyed.append(ctypes.cast(texture, ctypes.c_void_p).value))
+    return destroyed
+
+
+def _texture(address):
+    return ctypes.c_void_p(address)
+
+
+def test_add_never_destroys_the_new_texture(destroyed):
+    cache = TextureCache(budget_bytes=2 * 10 * 10 * BYTES_PER_PIXEL)
+    for address in (1000, 1001):
+        cache.retain(cache.add(f'k{address}', _texture(address), 10, 10))
+    # Over budget with every older entry in use
+    texture = cache.add('new', _texture(2000), 10, 10)
+    assert texture.value == 2000
+    assert destroyed == []
+    assert cache.get('new') is texture
+
+    cache.retain(texture)
+    cache.release(_texture(1000))  # Now the oldest unused one goes
+    assert destroyed == [1000]
+
+
+def test_texture_larger_than_budget_survives_add(destroyed):
+    cache = TextureCache(budget_bytes=100)
+    texture = cache.add('huge', _texture(3000), 100, 100)
+    assert texture.value == 3000 and destroyed == []
+    cache.retain(texture)
+    cache.release(texture)  # Unused and over budget, evicted only now
+    assert destroyed == [3000]
+    assert cache.get('huge') is None
+
+
+def test_add_evicts_unused_older_entries(destroyed):
+    cache = TextureCache(budget_bytes=10 * 10 * BYTES_PER_PIXEL)
+    cache.add('old', _texture(1000), 10, 10)
+    cache.add('new', _texture(2000), 10, 10)
+    assert destroyed == [1000]
+    assert cache.get_stats()['textures'] == 1
@@ -47,6 +47,11 @@ OTHER_FOLDER = "other"
 SAVES_FOLDER = "saves"
 CACHE_FOLDER = "cache"
 COMPENDIUMS_FOLDER = "compendiums"
+# Import external files as hardlinks when on the same filesystem (no copy, shares the file).
+# Off by default: an edit of the original file would also change the imported asset
+IMPORT_ALLOW_HARDLINK = False
+# Changed tables are saved in the background this often, 0 disables autosave
+AUTOSAVE_INTERVAL_SECONDS = 60.0
 
 # ============================================================================
 # R2 CLOUD STORAGE SETTINGS
@@ -69,18 +74,30 @@ AUTO_CLEANUP_CACHE = True
 # Asset cache paths
 ASSET_CACHE_DIR = os.path.join(DEFAULT_STORAGE_PATH, CACHE_FOLDER, "assets")
 TEXTURE_CACHE_DIR = os.path.join(DEFAULT_STORAGE_PATH, CACHE_FOLDER, "textures")
-ASSET_REGISTRY_FILE = os.path.join(ASSET_CACHE_DIR, "registry.json")
+ASSET_REGISTRY_FILE = os.path.join(ASSET_CACHE_DIR, "registry.json")  # Old JSON registry, imported once
+ASSET_REGISTRY_DB = os.path.join(ASSET_CACHE_DIR, "registry.db")
 
 # Cache size limits
 MAX_ASSET_CACHE_SIZE_MB = 500  # 500MB for R2 assets
 MAX_TEXTURE_CACHE_SIZE_MB = 200  # 200MB for texture cache
 CACHE_CLEANUP_AGE_DAYS = 30  # Delete files older than 30 days
+CACHE_EVICTION_POLICY = 'gdsf'  # 'lru' or 'gdsf' (size aware, keeps small often used files)
+CACHE_HIGH_WATERMARK = 0.9  # Start evicting above this fraction of MAX_ASSET_CACHE_SIZE_MB
+CACHE_LOW_WATERMARK = 0.75  # Evict down to this fraction
 
 # ============================================================================
 # NETWORK SETTINGS
 # ============================================================================
 DEFAULT_SERVER_PORT = 8000
 WEBSOCKET_PORT = 8765
+# Parallel asset downloads, tuned between these bounds from measured throughput
+MIN_DOWNLOAD_CONCURRENCY = 2
+MAX_DOWNLOAD_CONCURRENCY = 8
+# Sprite move/scale/rotate messages are coalesced per sprite and sent at this rate
+OUTBOX_FLUSH_HZ = 20
+# Wire codecs offered at handshake, most preferred first, JSON is always the fallback
+WIRE_CODECS = ['packed', 'json']
+WIRE_COMPRESS_THRESHOLD = 1024  # Packed payloads at least this many bytes are zlib compressed
 
 
 # ============================================================================
@@ -130,6 +147,16 @@ ASYNC_POOL_SIZE = 10
 MAX_CONCURRENT_UPLOADS = 3
 MAX_CONCURRENT_DOWNLOADS = 5
 REFRESH_THROTTLE_MS = 100
+# Decoded images uploaded to GPU per frame, at least one texture is always uploaded
+TEXTURE_UPLOAD_BUDGET_BYTES = 16 * 1024 * 1024  # 16MB
+# Main thread time for handling completed I/O per frame, the rest waits for next frame
+COMPLETION_BUDGET_MS = 4.0
+# Decoded images kept for tables not shown yet, oldest dropped first
+PREFETCH_SURFACE_BUDGET_BYTES = 64 * 1024 * 1024  # 64MB
+# Main thread time for adding sprites of a streamed table file per frame
+STREAM_LOAD_BUDGET_MS = 4.0
+# Table files larger than this are streamed over several frames instead of loaded at once
+STREAM_LOAD_MIN_BYTES = 4 * 1024 * 1024  # 4MB
 
 # ============================================================================
 # HELPER FUNCTIONS (minimal)